@@ -1,5 +1,9 @@
 import sys
 import json
+import time
+import argparse
+from collections import Counter, deque
+from typing import Dict, List, Optional, Sequence
 from shovels_engine.models import setup_game, Suit
 from shovels_engine.engine import (
     draw_cards, discard_card, play_card, 
@@ -7,8 +11,11 @@ from shovels_engine.engine import (
     tap_hero_power, resolve_gravedig, buy_card,
     get_current_player, end_turn
 )
-from shovels_engine.cli_utils import print_state, print_banner, print_bot_summary
-from shovels_engine.agents import RandomAgent
+from shovels_engine.cli_utils import print_state, print_banner, print_bot_summary, BoardRenderer
+from shovels_engine.agents import RandomAgent, closing_agents
+from shovels_engine.events import EventBus, EventSink
+from shovels_engine.simulation import new_game, DEFAULT_MAX_STEPS
+from shovels_engine.tournament import AGENT_REGISTRY
 
 def get_input(prompt="> "):
     return input(prompt).strip().lower()
@@ -125,7 +132,7 @@ def play_cli():
                     char = current_player.characters[c_idx]
                     target_info = None
                     if char.suit == Suit.CLUBS:
-                        limit = {"J": 1, "Q": 2, "K": 3}[char.rank]
+                        limit = state.rules.compiled().power[char.rank]
                         print(f"Clubs Burst! Choose up to {limit} targets.")
                         targets = []
                         for _ in range(limit):
@@ -164,5 +171,121 @@ def play_cli():
     print_state(state)
     print(f"\nGAME OVER! Winner: {state.winner_id}")
 
+class EventPrinter(EventSink):
+    """
+    Prints one line per event whose type is in event_types (all events if empty).
+    With keep > 0 the last `keep` lines are collected in `recent` instead, for
+    the watch view.
+    """
+    def __init__(self, event_types: Sequence[str] = (), keep: int = 0):
+        self.event_types = {t.upper() for t in event_types}
+        self.recent = deque(maxlen=keep) if keep else None
+
+    def write(self, record):
+        if self.event_types and record["event_type"] not in self.event_types:
+            return
+        line = (f"[game {record['game_id']} turn {record['turn_count']}] "
+                f"{record['player_id']} {record['event_type']}: {record['data']}")
+        if self.recent is not None:
+            self.recent.append(line)
+        else:
+            print(line)
+
+def play_headless(games: int = 1, players: int = 2, agents: Sequence[str] = ("random",), seed: int = 0,
+                  render_every: int = 0, events: Optional[Sequence[str]] = None,
+                  max_steps: int = DEFAULT_MAX_STEPS, watch: Optional[float] = None) -> Dict:
+    """
+    Plays `games` bot-only games (seeds seed, seed+1, ...) without prompting.
+    Seats cycle through `agents`. The board is printed every `render_every`
+    turns (0 = never) and matching events as they happen (events=[] for all,
+    None for none). Events are streamed rather than kept in state.events.
+    With `watch` (seconds between moves) a full-screen board is redrawn in
+    place after every move instead, with recent events underneath.
+    """
+    if not 2 <= players <= 4:
+        raise ValueError("Headless games need 2-4 players")
+    renderer = printer = None
+    if watch is not None:
+        renderer = BoardRenderer()
+        printer = EventPrinter(events or (), keep=8)
+    elif events is not None:
+        printer = EventPrinter(events)
+    bus = EventBus([printer] if printer else [], retain=False)
+    seats = {f"p{n + 1}": agents[n % len(agents)] for n in range(players)}
+    wins: Counter = Counter()
+    turns: List[int] = []
+    moves = unfinished = 0
+    started = time.perf_counter()
+    for i in range(games):
+        with closing_agents({pid: AGENT_REGISTRY[name]() for pid, name in seats.items()}) as bots:
+            state = new_game(list(bots), seed + i, bus=bus)
+            steps, last_turn, last_phase = 0, state.turn_count, state.phase
+            while not state.is_over and steps < max_steps:
+                player_id = get_current_player(state).id
+                bots[player_id].act(state, player_id)
+                steps += 1
+                if renderer is not None:
+                    renderer.draw(state, printer.recent)
+                    time.sleep(watch)
+                elif render_every and state.turn_count != last_turn:
+                    last_turn = state.turn_count
+                    if state.phase != last_phase:
+                        last_phase = state.phase
+                        print_banner(f"GAME {seed + i} PHASE {state.phase}")
+                    if state.turn_count % render_every == 0:
+                        print_state(state)
+        moves += steps
+        turns.append(state.turn_count)
+        if not state.is_over:
+            unfinished += 1
+        elif state.winner_id:
+            wins[state.winner_id] += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "games": games,
+        "seats": seats,
+        "wins": {pid: wins[pid] for pid in seats},
+        "draws": games - unfinished - sum(wins.values()),
+        "unfinished": unfinished,
+        "mean_turns": sum(turns) / games if games else 0.0,
+        "moves": moves,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+        "moves_per_second": moves / elapsed if elapsed else 0.0,
+    }
+
+def print_summary(summary: Dict):
+    print_banner("HEADLESS SUMMARY")
+    print(f"Games: {summary['games']} ({summary['unfinished']} unfinished, {summary['draws']} without a winner)")
+    for pid, name in summary["seats"].items():
+        wins = summary["wins"][pid]
+        share = 100 * wins / summary["games"] if summary["games"] else 0.0
+        print(f"  {pid} ({name}): {wins} wins ({share:.1f}%)")
+    print(f"Mean turns per game: {summary['mean_turns']:.1f}")
+    print(f"Moves: {summary['moves']} in {summary['seconds']:.2f}s "
+          f"({summary['games_per_second']:.1f} games/s, {summary['moves_per_second']:.0f} moves/s)")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Play SHOVELS in the terminal, or run bot-only games headless.")
+    parser.add_argument("--headless", action="store_true", help="Play bot-only games without prompts")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--agents", nargs="+", default=["random"], choices=sorted(AGENT_REGISTRY),
+                        help="Bot per seat, cycled over the seats")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--render-every", type=int, default=0, help="Print the board every N turns (0 = never)")
+    parser.add_argument("--events", nargs="*", help="Print events of these types as they happen (no types = all)")
+    parser.add_argument("--watch", type=float, nargs="?", const=0.05, metavar="SECONDS",
+                        help="Redraw a full-screen board after every move, pausing SECONDS (default 0.05)")
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    args = parser.parse_args(argv)
+
+    if not args.headless:
+        play_cli()
+        return
+    summary = play_headless(args.games, args.players, args.agents, args.seed,
+                            args.render_every, args.events, args.max_steps, args.watch)
+    print_summary(summary)
+
 if __name__ == "__main__":
-    play_cli()
+    main()
@@ -1,12 +1,14 @@
-import os
+"""
+JWT sessions and Google sign-in. jose and authlib (and the cryptography stack
+under them) are imported on first use rather than with the backend: workers,
+tests and CLI tools that never sign anyone in don't pay for them, and the OAuth
+client is only registered when the login routes first need it (get_oauth()).
+"""
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from authlib.integrations.starlette_client import OAuth
-from starlette.requests import Request
-from dotenv import load_dotenv
 
 from .config import settings
 
@@ -18,20 +20,34 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 GOOGLE_CLIENT_ID = settings.GOOGLE_CLIENT_ID
 GOOGLE_CLIENT_SECRET = settings.GOOGLE_CLIENT_SECRET
 
-oauth = OAuth()
-oauth.register(
-    name='google',
-    client_id=GOOGLE_CLIENT_ID,
-    client_secret=GOOGLE_CLIENT_SECRET,
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile'
-    }
-)
+@lru_cache(maxsize=None)
+def get_oauth():
+    """The authlib OAuth registry with the Google client, created on first call."""
+    from authlib.integrations.starlette_client import OAuth
+
+    oauth = OAuth()
+    oauth.register(
+        name='google',
+        client_id=GOOGLE_CLIENT_ID,
+        client_secret=GOOGLE_CLIENT_SECRET,
+        server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+        client_kwargs={
+            'scope': 'openid email profile'
+        }
+    )
+    return oauth
+
+def __getattr__(name: str):
+    # `from shovels_backend.auth import oauth` keeps working, registering on access
+    if name == "oauth":
+        return get_oauth()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -42,6 +58,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    from jose import JWTError, jwt
+
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,6 +76,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
 
 def decode_access_token(token: str) -> dict:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -6,6 +6,27 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "secret"
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
+    # Optional JSON RuleSet used for rooms that don't pick their own rules
+    RULES_FILE: str = ""
+    # Optional JSONL file every game's events are streamed to
+    EVENT_LOG_PATH: str = ""
+    # Optional game record file (see shovels_engine.records) finished games are appended to
+    RECORD_PATH: str = ""
+    # Spectator stream: seconds it runs behind the game, and minimum seconds between frames
+    SPECTATOR_DELAY: float = 0.0
+    SPECTATOR_INTERVAL: float = 0.0
+    # Room lifecycle: seconds between sweeps, unattended room timeout, finished game
+    # lifetime, and the size above which idle rooms are hibernated (0 for no limit)
+    ROOM_SWEEP_INTERVAL: float = 30.0
+    ROOM_IDLE_TIMEOUT: float = 1800.0
+    ROOM_FINISHED_TTL: float = 300.0
+    ROOM_MEMORY_BUDGET_MB: int = 512
+    # Structured logs: level, and the share of high-volume records (per action) kept
+    LOG_LEVEL: str = "INFO"
+    LOG_SAMPLE_RATE: float = 1.0
+    # Tracing (off unless one is set): OTLP/JSON lines file, or an OTLP/HTTP collector URL
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_OTLP_ENDPOINT: str = ""
 
     class Config:
         env_file = os.path.join(os.path.dirname(__file__), ".env")
@@ -0,0 +1,105 @@
+"""
+Versioned state history for resuming clients.
+
+Every game state a room broadcasts gets the next version number, and the room
+keeps the deltas between consecutive versions for a while. A client that
+reconnects with the last version it saw is sent the missed deltas instead of
+the whole state.
+
+A delta is a list of ops on the JSON-like state dict, each [op, path, value]
+where path is a list of dict keys and list indices:
+    ["set", path, value]      replace (or add) the value at path
+    ["del", path, None]       remove a dict key
+    ["extend", path, items]   append items to the list at path
+    ["truncate", path, n]     cut the list at path down to n items
+"""
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+Op = List[Any]
+
+def _diff(old: Any, new: Any, path: List[Any], ops: List[Op]):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["set", path + [key], value])
+            elif old[key] != value:
+                _diff(old[key], value, path + [key], ops)
+        for key in old:
+            if key not in new:
+                ops.append(["del", path + [key], None])
+    elif isinstance(old, list) and isinstance(new, list):
+        n, m = len(old), len(new)
+        if n == m:
+            for i in range(n):
+                if old[i] != new[i]:
+                    _diff(old[i], new[i], path + [i], ops)
+        # Piles mostly grow (events, discards) or shrink (draws) at the end
+        elif n < m and new[:n] == old:
+            ops.append(["extend", path, new[n:]])
+        elif m < n and old[:m] == new:
+            ops.append(["truncate", path, m])
+        else:
+            ops.append(["set", path, new])
+    else:
+        ops.append(["set", path, new])
+
+def diff(old: Any, new: Any) -> List[Op]:
+    """Ops that turn old into new. Neither value is modified or copied."""
+    ops: List[Op] = []
+    if old != new:
+        _diff(old, new, [], ops)
+    return ops
+
+def apply_delta(state: Any, ops: List[Op]) -> Any:
+    """Applies ops to state in place and returns it (a new value when the root is replaced)."""
+    for op, path, value in ops:
+        if not path:
+            state = value
+            continue
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        if op == "set":
+            parent[key] = value
+        elif op == "del":
+            del parent[key]
+        elif op == "extend":
+            parent[key].extend(value)
+        elif op == "truncate":
+            del parent[key][value:]
+        else:
+            raise ValueError(f"Unknown delta op: {op}")
+    return state
+
+class StateHistory:
+    """
+    The latest broadcast snapshot and the deltas of the last `maxlen` versions.
+    Snapshots are stored as given, so they must not be mutated afterwards.
+    """
+    def __init__(self, maxlen: int = 100):
+        self.version = 0
+        self.snapshot: Optional[Any] = None
+        self.deltas: Deque[Tuple[int, List[Op]]] = deque(maxlen=maxlen)
+
+    def record(self, snapshot: Any) -> int:
+        """Stores the next version and returns its number."""
+        if self.snapshot is not None:
+            self.deltas.append((self.version + 1, diff(self.snapshot, snapshot)))
+        self.snapshot = snapshot
+        self.version += 1
+        return self.version
+
+    def compact(self):
+        """Drops the stored states but keeps counting, so old versions fall back to a full resend."""
+        self.snapshot = None
+        self.deltas.clear()
+
+    def since(self, version: int) -> Optional[List[Op]]:
+        """Ops from `version` to the latest, or None if that version is unknown or too old."""
+        if version == self.version:
+            return []
+        if version < 1 or version > self.version or not self.deltas or self.deltas[0][0] > version + 1:
+            return None
+        return [op for v, ops in self.deltas if v > version for op in ops]
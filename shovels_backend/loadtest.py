@@ -0,0 +1,281 @@
+"""
+End-to-end load generator: simulated clients play full games against the FastAPI
+app over real HTTP and WebSocket connections.
+
+Everything runs locally. Tokens are minted with create_access_token, so Google
+OAuth is never involved. By default the server is started as a uvicorn
+subprocess, which lets its CPU time and memory be read from /proc. With --url,
+an already running server is targeted instead; it must share JWT_SECRET_KEY
+with this process.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+import websockets
+from shovels_backend.auth import create_access_token
+from shovels_engine.models import GameState
+from shovels_backend.state_schemas import GameStateSchema
+from shovels_engine.actions import Action, legal_actions
+from shovels_engine.agents import HeuristicAgent
+from shovels_engine.mcts import MCTSAgent
+
+Policy = Callable[[GameState, str], Action]
+
+def _random_policy(state: GameState, player_id: str) -> Action:
+    return random.choice(legal_actions(state, player_id))
+
+# Client-side move choosers (they only pick the move; the server applies it)
+POLICIES: Dict[str, Callable[[], Policy]] = {
+    "random": lambda: _random_policy,
+    "heuristic": lambda: HeuristicAgent().choose_action,
+    "mcts": lambda: partial(MCTSAgent, iterations=50)().choose_action,
+}
+
+def mint_token(user_id: str, name: str) -> str:
+    return create_access_token({"sub": user_id, "email": f"{user_id}@loadtest.local", "name": name},
+                               expires_delta=timedelta(hours=1))
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, Optional[float]]:
+    """Nearest-rank percentiles in milliseconds (samples are seconds)."""
+    ordered = sorted(samples)
+    out: Dict[str, Optional[float]] = {}
+    for p in points:
+        if not ordered:
+            out[f"p{p}"] = None
+            continue
+        rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        out[f"p{p}"] = round(ordered[rank] * 1000, 3)
+    out["max"] = round(ordered[-1] * 1000, 3) if ordered else None
+    return out
+
+def fan_out_times(receipts: List[List[float]]) -> List[float]:
+    """
+    receipts[c][k] is when client c received the k-th game broadcast of its room.
+    Every client sees a room's broadcasts in the same order, so the fan-out of
+    broadcast k is the spread of its receive times.
+    """
+    depth = min((len(r) for r in receipts), default=0)
+    return [max(r[k] for r in receipts) - min(r[k] for r in receipts) for k in range(depth)]
+
+class ProcessSampler:
+    """Reads a process's CPU seconds and resident memory from /proc (Linux only)."""
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            return None
+        # utime and stime are fields 14 and 15 of stat; fields[0] here is field 3
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def memory_kb(self) -> Dict[str, Optional[int]]:
+        mem: Dict[str, Optional[int]] = {"rss_kb": None, "peak_rss_kb": None}
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        mem["rss_kb"] = int(line.split()[1])
+                    elif line.startswith("VmHWM:"):
+                        mem["peak_rss_kb"] = int(line.split()[1])
+        except OSError:
+            pass
+        return mem
+
+class Client:
+    """One simulated player: a WebSocket connection plus a move chooser."""
+    def __init__(self, ws_url: str, room_id: str, user_id: str, token: str, policy: Policy, max_actions: int):
+        self.url = f"{ws_url}/ws/room/{room_id}?token={token}"
+        self.user_id = user_id
+        self.policy = policy
+        self.max_actions = max_actions
+        self.receipts: List[float] = []  # receive time of each game broadcast
+        self.latencies: List[float] = []  # action sent -> next state received
+        self.errors = 0
+        self.actions = 0
+        self.finished = False
+
+    async def play(self, connected: asyncio.Event, all_connected: asyncio.Event, is_host: bool):
+        async with websockets.connect(self.url, max_size=None) as ws:
+            connected.set()
+            if is_host:
+                await all_connected.wait()
+                await ws.send(json.dumps({"type": "start_game"}))
+            sent_at: Optional[float] = None
+            last: Optional[GameState] = None  # the state the last move was chosen from
+            async for raw in ws:
+                received = time.perf_counter()
+                message = json.loads(raw)
+                if message["type"] == "error":
+                    self.errors += 1
+                    if sent_at is not None and last is not None and self.actions < self.max_actions:
+                        # Keep the game moving: try another legal move instead of stalling
+                        action_type, params = _random_policy(last, self.user_id)
+                        sent_at = time.perf_counter()
+                        self.actions += 1
+                        await ws.send(json.dumps({"type": "action", "data": {"action_type": action_type, "params": params}}))
+                    continue
+                state = message.get("state", {})
+                if message["type"] != "state_update" or state.get("phase") == "LOBBY":
+                    continue
+                self.receipts.append(received)
+                if sent_at is not None:
+                    self.latencies.append(received - sent_at)
+                    sent_at = None
+                if state["is_over"]:
+                    self.finished = True
+                    return
+                if self.actions >= self.max_actions:
+                    return  # stalemated game (e.g. two HeuristicAgents); leave it unfinished
+                if state["players"][state["current_turn_index"]]["id"] == self.user_id:
+                    last = GameStateSchema.model_validate(state).to_engine()
+                    action_type, params = self.policy(last, self.user_id)
+                    sent_at = time.perf_counter()
+                    self.actions += 1
+                    await ws.send(json.dumps({"type": "action", "data": {"action_type": action_type, "params": params}}))
+
+async def run_room(http: httpx.AsyncClient, ws_url: str, players: int, policy_name: str,
+                   max_actions: int = 1000) -> Dict[str, Any]:
+    run_id = uuid.uuid4().hex[:6]
+    users = [(f"load_{run_id}_{i}", f"Load {i}") for i in range(players)]
+    tokens = [mint_token(uid, name) for uid, name in users]
+
+    response = await http.post("/rooms", json={"name": f"load-{run_id}"},
+                               headers={"Authorization": f"Bearer {tokens[0]}"})
+    response.raise_for_status()
+    room_id = response.json()["room_id"]
+    for (uid, _), token in zip(users[1:], tokens[1:]):
+        response = await http.post(f"/rooms/{room_id}/join", params={"player_id": uid},
+                                   headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+
+    clients = [Client(ws_url, room_id, uid, token, POLICIES[policy_name](), max_actions)
+               for (uid, _), token in zip(users, tokens)]
+    connected = [asyncio.Event() for _ in clients]
+    all_connected = asyncio.Event()
+
+    async def gate():
+        await asyncio.gather(*(e.wait() for e in connected))
+        all_connected.set()
+
+    started = time.perf_counter()
+    await asyncio.gather(gate(), *(c.play(connected[i], all_connected, i == 0) for i, c in enumerate(clients)))
+    return {
+        "room_id": room_id,
+        "duration": time.perf_counter() - started,
+        "finished": all(c.finished for c in clients),
+        "actions": sum(c.actions for c in clients),
+        "errors": sum(c.errors for c in clients),
+        "latencies": [t for c in clients for t in c.latencies],
+        "fan_out": fan_out_times([c.receipts for c in clients]),
+    }
+
+async def run_load(base_url: str, rooms: int = 4, players: int = 2, policy: str = "random",
+                   concurrency: int = 4, max_actions: int = 1000, timeout: float = 300.0,
+                   sampler: Optional[ProcessSampler] = None) -> Dict[str, Any]:
+    """Plays `rooms` games, at most `concurrency` at a time, and summarises the run."""
+    ws_url = "ws" + base_url[len("http"):]
+    limit = asyncio.Semaphore(concurrency)
+
+    async def limited(http):
+        async with limit:
+            return await run_room(http, ws_url, players, policy, max_actions)
+
+    cpu_before = sampler.cpu_seconds() if sampler else None
+    mem_before = sampler.memory_kb() if sampler else {}
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as http:
+        results = await asyncio.wait_for(asyncio.gather(*(limited(http) for _ in range(rooms))), timeout)
+    wall = time.perf_counter() - started
+
+    actions = sum(r["actions"] for r in results)
+    report: Dict[str, Any] = {
+        "rooms": rooms,
+        "players_per_room": players,
+        "policy": policy,
+        "concurrency": concurrency,
+        "finished_games": sum(r["finished"] for r in results),
+        "actions": actions,
+        "errors": sum(r["errors"] for r in results),
+        "wall_seconds": round(wall, 3),
+        "actions_per_second": round(actions / wall, 1) if wall else None,
+        "action_rtt_ms": percentiles([t for r in results for t in r["latencies"]]),
+        "broadcast_fan_out_ms": percentiles([t for r in results for t in r["fan_out"]]),
+    }
+    if sampler:
+        cpu_after = sampler.cpu_seconds()
+        mem_after = sampler.memory_kb()
+        if cpu_before is not None and cpu_after is not None:
+            report["server_cpu_seconds"] = round(cpu_after - cpu_before, 3)
+            report["server_cpu_seconds_per_room"] = round((cpu_after - cpu_before) / rooms, 4)
+        if mem_before.get("rss_kb") is not None and mem_after.get("rss_kb") is not None:
+            report["server_rss_kb"] = mem_after["rss_kb"]
+            report["server_peak_rss_kb"] = mem_after["peak_rss_kb"]
+            report["server_rss_growth_kb_per_room"] = round((mem_after["rss_kb"] - mem_before["rss_kb"]) / rooms, 1)
+    return report
+
+def start_server(port: int, startup_timeout: float = 15.0) -> subprocess.Popen:
+    """Starts the app under uvicorn in a subprocess and waits for /health."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "shovels_backend.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Server did not become healthy in time")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="WebSocket load test: simulated clients play full games.")
+    parser.add_argument("--rooms", type=int, default=8, help="Games to play")
+    parser.add_argument("--players", type=int, default=2, help="Simulated clients per room")
+    parser.add_argument("--concurrency", type=int, default=4, help="Games in flight at once")
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES), help="How clients pick moves")
+    parser.add_argument("--max-actions", type=int, default=1000, help="Moves per client before a game is abandoned")
+    parser.add_argument("--url", help="Target a running server instead of starting one (e.g. http://localhost:8000)")
+    parser.add_argument("--server-pid", type=int, help="With --url: pid to sample CPU/memory from")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the locally started server")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        sampler = ProcessSampler(args.server_pid) if args.server_pid else None
+    else:
+        server = start_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        sampler = ProcessSampler(server.pid)
+    try:
+        report = asyncio.run(run_load(base_url, args.rooms, args.players, args.policy,
+                                      args.concurrency, args.max_actions, args.timeout, sampler))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
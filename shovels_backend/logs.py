@@ -0,0 +1,104 @@
+"""
+Structured logging that stays off the event loop.
+
+Records are JSON lines with any `extra` fields (room_id, user_id, action_type,
+latency_ms, ...) as top-level keys. The event loop only filters a record and
+puts it on a bounded queue; formatting and the actual write happen on a
+QueueListener thread. If that thread falls behind, records are dropped and
+counted instead of blocking. High-volume records logged with
+extra={"sampled": True} are kept with probability sample_rate.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from typing import IO, Optional
+
+LOGGER_NAME = "shovels"
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sampled"}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keeps records marked sampled=True with probability rate; everything else passes."""
+    def __init__(self, rate: float = 1.0, seed: Optional[int] = None):
+        super().__init__()
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("Log sample rate must be between 0 and 1")
+        self.rate = rate
+        # Own generator, so logging never shifts the global random stream games use
+        self.rng = random.Random(seed)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or not getattr(record, "sampled", False):
+            return True
+        return self.rng.random() < self.rate
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that never blocks: when the queue is full the record is dropped."""
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what can't cross threads (args, tracebacks); the listener formats
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_logging(level: str = "INFO", sample_rate: float = 1.0, stream: Optional[IO[str]] = None,
+                  max_pending: int = 10000) -> logging.handlers.QueueListener:
+    """
+    Routes the "shovels" loggers through a queue to a JSON stream handler
+    (stderr by default). Returns the started listener; stop() it on shutdown
+    to flush. Calling it again replaces the previous setup.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            logger.removeHandler(handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    log_queue: queue.Queue = queue.Queue(max_pending)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rate))
+    logger.addHandler(handler)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
@@ -1,16 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from shovels_backend.manager import GameRoomManager
 from shovels_backend.schemas import RoomCreateRequest, RoomInfoResponse
-from shovels_backend.auth import oauth, create_access_token, get_current_user, SECRET_KEY, decode_access_token
+from shovels_backend.state_schemas import RuleSetSchema
+from shovels_backend.auth import get_oauth, create_access_token, get_current_user, SECRET_KEY, decode_access_token
 from shovels_backend.ws_schemas import WsMessage
 from shovels_backend.config import settings
-from shovels_engine import engine
-from typing import List
+from shovels_backend import metrics
+from shovels_backend.logs import LOGGER_NAME, elapsed_ms, setup_logging
+from shovels_backend.tracing import TRACER, FileSpanExporter, OtlpHttpExporter, span
+from shovels_engine.rules import RuleSet
+from shovels_engine.events import EventBus, BackgroundSink, JsonlSink
+from shovels_engine.records import RecordWriter
+from typing import List, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import json
+import logging
+import time
 
-app = FastAPI(title="Shovels API")
+log = logging.getLogger(f"{LOGGER_NAME}.ws")
+room_log = logging.getLogger(f"{LOGGER_NAME}.rooms")
+
+async def sweep_rooms():
+    while True:
+        await asyncio.sleep(settings.ROOM_SWEEP_INTERVAL)
+        swept = room_manager.sweep()
+        if any(swept.values()):
+            room_log.info("rooms_swept", extra=swept)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Log writes happen on the listener thread, never on the event loop
+    listener = setup_logging(settings.LOG_LEVEL, settings.LOG_SAMPLE_RATE)
+    if settings.TRACE_OTLP_ENDPOINT:
+        TRACER.configure(OtlpHttpExporter(settings.TRACE_OTLP_ENDPOINT))
+    elif settings.TRACE_EXPORT_PATH:
+        TRACER.configure(FileSpanExporter(settings.TRACE_EXPORT_PATH))
+    background = [asyncio.create_task(sweep_rooms()), asyncio.create_task(metrics.probe_loop_lag())]
+    yield
+    for task in background:
+        task.cancel()
+    TRACER.shutdown()
+    listener.stop()
+    # Flush buffered event records on shutdown
+    event_bus.close()
+    if game_records:
+        game_records.close()
+
+app = FastAPI(title="Shovels API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -24,22 +63,71 @@ app.add_middleware(
 # Session middleware required for OAuth state
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
-room_manager = GameRoomManager()
+# Event log writes happen on a background thread and never stall the event loop
+event_bus = EventBus(
+    [BackgroundSink(JsonlSink(settings.EVENT_LOG_PATH), block=False)] if settings.EVENT_LOG_PATH else []
+)
+
+game_records = RecordWriter(settings.RECORD_PATH) if settings.RECORD_PATH else None
+
+room_manager = GameRoomManager(
+    default_rules=RuleSet.from_file(settings.RULES_FILE) if settings.RULES_FILE else None,
+    event_bus=event_bus,
+    spectator_delay=settings.SPECTATOR_DELAY,
+    spectator_interval=settings.SPECTATOR_INTERVAL,
+    idle_timeout=settings.ROOM_IDLE_TIMEOUT,
+    finished_ttl=settings.ROOM_FINISHED_TTL,
+    memory_budget=settings.ROOM_MEMORY_BUDGET_MB * 1024 * 1024,
+    records=game_records,
+)
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
 
+def _connection_counts():
+    rooms = room_manager.list_rooms()
+    return {
+        ("player",): sum(len(r.connections) for r in rooms),
+        ("spectator",): sum(len(r.spectators.watchers) for r in rooms),
+    }
+
+def _room_counts():
+    counts = {("lobby",): 0, ("playing",): 0, ("finished",): 0, ("hibernated",): 0}
+    for room in room_manager.list_rooms():
+        if room.is_hibernated:
+            counts[("hibernated",)] += 1
+        elif not room.is_started:
+            counts[("lobby",)] += 1
+        elif room.finished_at is not None:
+            counts[("finished",)] += 1
+        else:
+            counts[("playing",)] += 1
+    return counts
+
+# Read when scraped, so keeping them current costs nothing per action
+metrics.WS_CONNECTIONS.set_function(_connection_counts)
+metrics.ROOMS.set_function(_room_counts)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/rooms/stats")
+def room_stats():
+    """Live/hibernated room counts and lifecycle totals."""
+    return room_manager.metrics()
+
 # Auth Endpoints
 @app.get("/auth/login")
 async def login(request: Request):
     redirect_uri = request.url_for('auth_callback')
-    return await oauth.google.authorize_redirect(request, str(redirect_uri))
+    return await get_oauth().google.authorize_redirect(request, str(redirect_uri))
 
 @app.get("/auth/callback")
 async def auth_callback(request: Request):
     try:
-        token = await oauth.google.authorize_access_token(request)
+        token = await get_oauth().google.authorize_access_token(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Authentication failed: {str(e)}")
     
@@ -69,20 +157,25 @@ def list_rooms(user: dict = Depends(get_current_user)):
             room_id=r.room_id,
             name=r.name,
             player_count=len(r.player_ids),
-            is_started=r.state is not None
+            is_started=r.is_started,
+            spectator_count=len(r.spectators.watchers)
         ) for r in rooms
     ]
 
 @app.post("/rooms", response_model=RoomInfoResponse)
 def create_room(request: RoomCreateRequest, user: dict = Depends(get_current_user)):
     player_name = user.get("name") or "Unknown"
-    room = room_manager.create_room(request.name)
+    try:
+        rules = RuleSetSchema.model_validate(request.rules).to_engine() if request.rules else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rules: {e}")
+    room = room_manager.create_room(request.name, rules)
     room_manager.join_room(room.room_id, user["id"], player_name)
     return RoomInfoResponse(
         room_id=room.room_id,
         name=room.name,
         player_count=len(room.player_ids),
-        is_started=room.state is not None
+        is_started=room.is_started
     )
 
 @app.post("/rooms/{room_id}/join")
@@ -94,86 +187,114 @@ def join_room(room_id: str, player_id: str, user: dict = Depends(get_current_use
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@app.websocket("/ws/room/{room_id}/spectate")
+async def spectate_endpoint(websocket: WebSocket, room_id: str, token: str):
+    """Read-only view of a room: the redacted public stream, shared by every watcher."""
+    try:
+        if not decode_access_token(token).get("sub"):
+            await websocket.close(code=4001)
+            return
+    except Exception:
+        await websocket.close(code=4001)
+        return
+
+    room = room_manager.get_room(room_id)
+    if not room:
+        await websocket.close(code=4004)
+        return
+
+    # Spectators can arrive by the hundred, so these records are sampled
+    log.info("spectator_connected", extra={"room_id": room_id, "sampled": True})
+    await room.connect_spectator(websocket)
+    try:
+        while True:
+            # Spectators can't act; anything they send is ignored
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        log.info("spectator_disconnected", extra={"room_id": room_id, "sampled": True})
+        room.disconnect_spectator(websocket)
+
 @app.websocket("/ws/room/{room_id}")
-async def websocket_endpoint(websocket: WebSocket, room_id: str, token: str):
+async def websocket_endpoint(websocket: WebSocket, room_id: str, token: str, version: Optional[int] = None):
     # Verify JWT from query param
     try:
-        print(f"WS Connect: room={room_id}, token={token[:10]}...")
         payload = decode_access_token(token)
         user_id = payload.get("sub")
         if not user_id:
-            print("WS Error: No user_id in token")
+            log.warning("ws_rejected", extra={"room_id": room_id, "reason": "no user id in token"})
             await websocket.close(code=4001)
             return
         user_data = {"id": user_id, "email": payload.get("email"), "name": payload.get("name")}
     except Exception as e:
-        print(f"WS Error: Token validation failed - {str(e)}")
+        log.warning("ws_rejected", extra={"room_id": room_id, "reason": f"invalid token: {e}"})
         await websocket.close(code=4001)
         return
 
     room = room_manager.get_room(room_id)
     if not room:
-        print(f"WS Error: Room {room_id} not found")
+        log.warning("ws_rejected", extra={"room_id": room_id, "user_id": user_id, "reason": "room not found"})
         await websocket.close(code=4004)
         return
 
-    print(f"WS Accepted: User {user_id} joining room {room_id}")
-    await room.connect(websocket, user_id)
+    log.info("ws_connected", extra={"room_id": room_id, "user_id": user_id, "resume_version": version})
+    # A reconnecting client passes the last state version it saw to get only what it missed
+    await room.connect(websocket, user_id, version)
     try:
         while True:
             data = await websocket.receive_text()
-            message_dict = json.loads(data)
-            msg = WsMessage(**message_dict)
-            
-            if msg.type == "start_game":
-                try:
-                    await room.start_game()
-                except Exception as e:
-                    await websocket.send_json({"type": "error", "message": f"Could not start game: {str(e)}"})
-            
-            elif msg.type == "action":
-                if not room.state:
-                    await websocket.send_json({"type": "error", "message": "Game not started"})
-                    continue
-                
-                action_data = msg.data
-                action_type = action_data.get("action_type")
-                params = action_data.get("params", {})
-                
-                try:
-                    # Map action types to engine functions
-                    if action_type == "draw":
-                        engine.draw_cards(room.state, user_data["id"], **params)
-                    elif action_type == "discard":
-                        engine.discard_card(room.state, user_data["id"], **params)
-                    elif action_type == "play":
-                        engine.play_card(room.state, user_data["id"], **params)
-                    elif action_type == "buy":
-                        engine.buy_card(room.state, user_data["id"], **params)
-                    elif action_type == "refresh":
-                        engine.refresh_shop(room.state, user_data["id"])
-                    elif action_type == "tap":
-                        engine.tap_hero_power(room.state, user_data["id"], **params)
-                    elif action_type == "gravedig":
-                        engine.resolve_gravedig(room.state, user_data["id"], **params)
-                    elif action_type == "action":
-                        engine.perform_action(room.state, user_data["id"], **params)
-                    elif action_type == "strike":
-                        engine.apply_face_strike(room.state, user_data["id"], **params)
-                    else:
-                        await websocket.send_json({"type": "error", "message": f"Unknown action: {action_type}"})
+            # One trace per frame: parse, validation, engine call, state dump and each send
+            with span("ws.frame", room_id=room_id, user_id=user_id) as frame:
+                with span("ws.parse"):
+                    message_dict = json.loads(data)
+                with span("ws.validate"):
+                    msg = WsMessage(**message_dict)
+                frame.set_attribute("message.type", msg.type)
+
+                if msg.type == "start_game":
+                    try:
+                        await room.start_game()
+                    except Exception as e:
+                        await websocket.send_json({"type": "error", "message": f"Could not start game: {str(e)}"})
+
+                elif msg.type == "add_bot":
+                    try:
+                        room.add_bot(requested_by=user_id)
+                        await room.broadcast_lobby_state()
+                    except Exception as e:
+                        await websocket.send_json({"type": "error", "message": f"Could not add bot: {str(e)}"})
+
+                elif msg.type == "action":
+                    if not room.state:
+                        await websocket.send_json({"type": "error", "message": "Game not started"})
                         continue
-                        
-                    # Broadcast update
-                    await room.broadcast_state()
-                except Exception as e:
-                    await websocket.send_json({"type": "error", "message": str(e)})
+
+                    action_data = msg.data
+                    action_type = action_data.get("action_type")
+                    params = action_data.get("params", {})
+                    frame.set_attribute("action_type", str(action_type))
+
+                    started = time.perf_counter()
+                    try:
+                        # Engine dispatch, broadcast and bot replies all happen in the room
+                        await room.apply_action(user_data["id"], action_type, params)
+                    except Exception as e:
+                        log.info("action_rejected", extra={"room_id": room_id, "user_id": user_id, "action_type": action_type,
+                                                           "error": str(e), "sampled": True})
+                        await websocket.send_json({"type": "error", "message": str(e)})
+                    else:
+                        if log.isEnabledFor(logging.DEBUG):
+                            log.debug("action", extra={"room_id": room_id, "user_id": user_id, "action_type": action_type,
+                                                       "latency_ms": elapsed_ms(started), "sampled": True})
 
     except WebSocketDisconnect:
-        print(f"WS Disconnect: User {user_id} left room {room_id}")
+        log.info("ws_disconnected", extra={"room_id": room_id, "user_id": user_id})
         room.disconnect(user_id)
+        # Mid-game the seat is kept for the player to reconnect and resume;
+        # abandoned games are left to the room sweeper
+        if room.is_started:
+            return
         if room.is_empty():
-            print(f"Room {room_id} is empty. Deleting.")
+            room_log.info("room_deleted", extra={"room_id": room_id, "reason": "empty"})
             room_manager.delete_room(room_id)
         else:
             # Broadcast updated player list to remaining clients
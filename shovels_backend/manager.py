@@ -1,72 +1,299 @@
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import time
 import uuid
 import json
+import zlib
 from fastapi import WebSocket
 from shovels_engine.models import GameState, setup_game
+from shovels_engine.rules import MAX_PLAYERS, RuleSet
+from shovels_engine.events import EventBus, attach_bus
+from shovels_engine.engine import get_current_player
+from shovels_engine.actions import ACTION_HANDLERS, apply_action, legal_actions
+from shovels_engine.agents import Agent, RandomAgent
+from shovels_engine.records import GameRecorder, RecordWriter
+from shovels_backend.spectators import SpectatorChannel
+from shovels_backend.deltas import StateHistory
+from shovels_backend.state_schemas import GameStateSchema
+from shovels_backend.tracing import span
+from shovels_backend.metrics import (ACTION_ERRORS, ACTION_SECONDS, BROADCAST_BYTES,
+                                     BROADCAST_SERIALIZE_SECONDS, WS_SEND_SECONDS, timer)
+
+# Upper bound on consecutive bot moves per drive, so a misbehaving agent can't spin forever.
+MAX_BOT_STEPS = 10000
+# Consecutive bot moves that leave the state unchanged before the seat plays a legal
+# move for the agent. RandomAgent sometimes picks a move the engine rejects and
+# tries again on its next call.
+MAX_IDLE_BOT_MOVES = 50
+# State versions a reconnecting client can resume from before it gets the full state again
+HISTORY_LENGTH = 100
+# Rough in-memory size of a room (tracemalloc on 3-player bot games, resume history included)
+ROOM_BASE_BYTES = 4_000
+GAME_BASE_BYTES = 45_000
+GAME_BYTES_PER_EVENT = 2_700
+
+class BotSeat:
+    """
+    A player seat driven in-process by an engine Agent.
+    The room calls on_state_change after every update instead of round-tripping
+    the state over a WebSocket; the agent mutates the room's state directly through
+    the same apply_action path human actions use.
+    """
+    def __init__(self, player_id: str, agent: Agent):
+        self.player_id = player_id
+        self.agent = agent
+
+    def on_state_change(self, state: GameState) -> bool:
+        """
+        Takes one move if it's this seat's turn. Returns True only if the move
+        went through, so the room neither broadcasts a move that changed nothing
+        nor keeps driving an agent that can't find one (see MAX_IDLE_BOT_MOVES).
+        """
+        if state.is_over or get_current_player(state).id != self.player_id:
+            return False
+        before = state._applied
+        self.agent.act(state, self.player_id)
+        return state._applied != before
+
+    def play_fallback(self, state: GameState) -> bool:
+        """
+        Plays for an agent that is stuck: "end" when it is offered, else the first
+        legal move the engine accepts. Returns False if none is.
+        """
+        actions = legal_actions(state, self.player_id)
+        if ("end", {}) in actions:
+            actions = [("end", {})]
+        for action_type, params in actions:
+            try:
+                apply_action(state, self.player_id, action_type, params)
+                return True
+            except ValueError:
+                continue
+        return False
 
 class GameRoom:
-    def __init__(self, room_id: str, name: str):
+    def __init__(self, room_id: str, name: str, rules: Optional[RuleSet] = None,
+                 event_bus: Optional[EventBus] = None, spectator_delay: float = 0.0,
+                 spectator_interval: float = 0.0, records: Optional[RecordWriter] = None):
         self.room_id = room_id
         self.name = name
-        self.state: Optional[GameState] = None
+        self.rules = rules
+        self.event_bus = event_bus
+        # Finished games are appended here; the recorder follows the game in progress
+        self.records = records
+        self.recorder: Optional[GameRecorder] = None
+        self._state: Optional[GameState] = None
+        # zlib-compressed state JSON while the room is hibernated
+        self._frozen: Optional[bytes] = None
+        self.restores = 0
+        self.last_active = time.monotonic()
+        self.finished_at: Optional[float] = None
         self.player_ids: List[str] = []
         self.player_names: Dict[str, str] = {}
         self.connections: Dict[str, WebSocket] = {}
+        self.bots: Dict[str, BotSeat] = {}
+        # Versions of the broadcast game state, for clients resuming after a drop
+        self.history = StateHistory(HISTORY_LENGTH)
+        # Read-only watchers share one redacted stream
+        self.spectators = SpectatorChannel(spectator_delay, spectator_interval)
+
+    @property
+    def state(self) -> Optional[GameState]:
+        # A hibernated room wakes up on first use
+        if self._frozen is not None:
+            self.restore()
+        return self._state
+
+    @state.setter
+    def state(self, value: Optional[GameState]):
+        self._state = value
+        self._frozen = None
+
+    @property
+    def is_started(self) -> bool:
+        return self._state is not None or self._frozen is not None
 
-    async def connect(self, websocket: WebSocket, player_id: str):
+    @property
+    def is_hibernated(self) -> bool:
+        return self._frozen is not None
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def is_idle(self) -> bool:
+        """Nobody is connected, as a player or a spectator."""
+        return not self.connections and not self.spectators.watchers
+
+    def approx_bytes(self) -> int:
+        if self._frozen is not None:
+            return ROOM_BASE_BYTES + len(self._frozen)
+        if self._state is None:
+            return ROOM_BASE_BYTES
+        return ROOM_BASE_BYTES + GAME_BASE_BYTES + GAME_BYTES_PER_EVENT * len(self._state.events)
+
+    def hibernate(self) -> bool:
+        """
+        Compacts a started, idle room to its compressed state JSON, dropping the
+        resume history and spectator caches. Returns False if the room can't be.
+        """
+        if self._state is None or not self.is_idle():
+            return False
+        self._frozen = zlib.compress(json.dumps(self._state.to_dict(), separators=(",", ":")).encode())
+        self._state = None
+        self.history.compact()
+        self.spectators.compact()
+        return True
+
+    def restore(self):
+        state = GameStateSchema.model_validate_json(zlib.decompress(self._frozen)).to_engine()
+        if self.event_bus:
+            attach_bus(state, self.event_bus, self.room_id)
+        if self.recorder:
+            self.recorder.attach(state)
+        self.state = state
+        self.restores += 1
+
+    async def connect(self, websocket: WebSocket, player_id: str, version: Optional[int] = None):
+        """
+        version is the last state version a reconnecting client saw; if it is
+        still in the history the client only gets the deltas it missed.
+        """
         await websocket.accept()
+        self.touch()
         self.connections[player_id] = websocket
         if self.state:
-            await self.send_state(websocket)
+            self._sync_history()
+            ops = self.history.since(version) if version is not None else None
+            if ops is None:
+                await websocket.send_json(self._state_message())
+            else:
+                await websocket.send_json({
+                    "type": "state_delta",
+                    "from_version": version,
+                    "version": self.history.version,
+                    "ops": ops
+                })
         else:
             await self.broadcast_lobby_state()
 
+    async def connect_spectator(self, websocket: WebSocket):
+        await self.spectators.add(websocket)
+        if not self.spectators.delay:
+            # Idle channels skip updates, so catch everyone up from the live state
+            if self.state:
+                self.spectators.publish_state(self.state)
+            else:
+                self.spectators.publish({**self._lobby_message(), "spectator": True})
+
+    def disconnect_spectator(self, websocket: WebSocket):
+        self.spectators.remove(websocket)
+
     def disconnect(self, player_id: str):
         if player_id in self.connections:
             del self.connections[player_id]
+        self.touch()
         
         # If game hasn't started, remove player from room
-        if not self.state and player_id in self.player_ids:
+        if not self.is_started and player_id in self.player_ids:
             self.player_ids.remove(player_id)
             if player_id in self.player_names:
                 del self.player_names[player_id]
             
     def is_empty(self) -> bool:
-        return len(self.player_ids) == 0
+        # Bots alone don't keep a room alive. Seats aren't given up once the game
+        # starts, so then it's the connections that count.
+        if self.is_started:
+            return not self.connections
+        return all(pid in self.bots for pid in self.player_ids)
 
-    async def broadcast(self, message: dict):
+    @property
+    def host_id(self) -> Optional[str]:
+        """The first human seat: the creator, or whoever joined next if they left the lobby."""
+        return next((pid for pid in self.player_ids if pid not in self.bots), None)
+
+    def add_bot(self, agent: Optional[Agent] = None, requested_by: Optional[str] = None) -> str:
+        """requested_by: the player asking, for requests from clients; only the host may add bots."""
+        if requested_by is not None and requested_by != self.host_id:
+            raise ValueError("Only the host can add bots")
+        if self.is_started:
+            raise ValueError("Cannot add bots after the game has started")
+        if len(self.player_ids) >= MAX_PLAYERS:
+            raise ValueError(f"Room is full (max {MAX_PLAYERS} players)")
+        bot_id = f"bot_{uuid.uuid4().hex[:6]}"
+        self.player_ids.append(bot_id)
+        self.player_names[bot_id] = f"Bot {len(self.bots) + 1}"
+        self.bots[bot_id] = BotSeat(bot_id, agent or RandomAgent())
+        return bot_id
+
+    async def broadcast(self, message: dict, started: Optional[float] = None):
+        """started: when building the message began, if that counts as serialization time."""
         if not self.connections:
             return
-        
+        if started is None:
+            started = time.perf_counter()
+        # Encoded once for everyone rather than once per send_json
+        with span("broadcast.encode") as encode:
+            text = json.dumps(message, separators=(",", ":"))
+            encode.set_attribute("bytes", len(text))
+        BROADCAST_SERIALIZE_SECONDS.observe(time.perf_counter() - started)
+        BROADCAST_BYTES.observe(len(text))
+
         dead_player_ids = []
         for pid, connection in self.connections.items():
             try:
-                await connection.send_json(message)
+                with timer(WS_SEND_SECONDS), span("ws.send", player_id=pid):
+                    await connection.send_text(text)
             except Exception:
                 dead_player_ids.append(pid)
         
         for pid in dead_player_ids:
             self.disconnect(pid)
 
+    def _sync_history(self):
+        """Records the state as a new version if it changed since the last broadcast."""
+        snapshot = self.state.to_dict()
+        if snapshot != self.history.snapshot:
+            self.history.record(snapshot)
+
     async def send_state(self, websocket: WebSocket):
         if self.state:
-            await websocket.send_json({
-                "type": "state_update",
-                "state": self.state.model_dump()
-            })
+            self._sync_history()
+            await websocket.send_json(self._state_message())
+
+    def _state_message(self) -> dict:
+        return {"type": "state_update", "version": self.history.version, "state": self.history.snapshot}
 
     async def broadcast_state(self):
         if self.state:
+            self.touch()
+            if self.state.is_over and self.finished_at is None:
+                self.finished_at = self.last_active
+                if self.recorder:
+                    self.records.write(self.recorder.finish(self.state))
+                    self.recorder = None
+            with span("spectators.publish", watchers=len(self.spectators.watchers)):
+                self.spectators.publish_state(self.state)
+            started = time.perf_counter()
+            with span("state.to_dict"):
+                snapshot = self.state.to_dict()
+            with span("state.delta"):
+                version = self.history.record(snapshot)
             await self.broadcast({
                 "type": "state_update",
-                "state": self.state.model_dump()
-            })
+                "version": version,
+                "state": snapshot
+            }, started)
 
     async def broadcast_lobby_state(self):
         """Broadcasts the current player list as if it were a partial game state."""
+        message = self._lobby_message()
+        self.spectators.publish({**message, "spectator": True})
+        await self.broadcast(message)
+
+    def _lobby_message(self) -> dict:
         # Create a mock state structure that the frontend will accept
         players_data = [
-            {"id": pid, "name": self.player_names.get(pid, pid), "is_alive": True} 
+            {"id": pid, "name": self.player_names.get(pid, pid), "is_alive": True, "is_bot": pid in self.bots}
             for pid in self.player_ids
         ]
         # In a real app, we'd store names in player_ids or separate mapping. 
@@ -83,7 +310,7 @@ class GameRoom:
         # The user wants "Refactoring & Cleanup". Let's stick to the plan. 
         # Plan was: "If I send { type: 'state_update', state: { players: [...] } }, LobbyRoom checks gameState.players".
         
-        await self.broadcast({
+        return {
             "type": "state_update",
             "state": {
                 "players": players_data,
@@ -94,21 +321,95 @@ class GameRoom:
                 "turn_count": 0,
                 "phase": "LOBBY"
             }
-        })
+        }
 
     async def start_game(self):
         if len(self.player_ids) < 2:
             raise ValueError("Need at least 2 players to start game")
-        self.state = setup_game(self.player_ids, self.player_names)
+        self.state = setup_game(self.player_ids, self.player_names, self.rules)
+        self.history = StateHistory(HISTORY_LENGTH)
+        if self.event_bus:
+            attach_bus(self.state, self.event_bus, self.room_id)
+        if self.records:
+            # Games abandoned before the end are not recorded
+            meta = {"source": "server", "room_id": self.room_id, "bots": sorted(self.bots)}
+            self.recorder = GameRecorder(self.state, meta=meta).attach(self.state)
         await self.broadcast_state()
+        await self.run_bots()
+
+    async def apply_action(self, player_id: str, action_type: str, params: Optional[Dict[str, Any]] = None):
+        """Applies a player's action to the game, broadcasts the result and lets bots respond."""
+        if not self.state:
+            raise ValueError("Game not started")
+        # Unknown types share one label so clients can't grow the metric without bound
+        label = action_type if action_type in ACTION_HANDLERS else "unknown"
+        started = time.perf_counter()
+        try:
+            with span("engine.apply_action", action_type=label):
+                apply_action(self.state, player_id, action_type, params)
+        except Exception:
+            ACTION_ERRORS.labels(label).inc()
+            raise
+        finally:
+            ACTION_SECONDS.labels(label).observe(time.perf_counter() - started)
+        await self.broadcast_state()
+        await self.run_bots()
+
+    async def run_bots(self):
+        """Plays bot moves until a human is on turn (or the game ends)."""
+        if not self.bots:
+            return
+        idle = 0
+        for _ in range(MAX_BOT_STEPS):
+            if not self.state or self.state.is_over:
+                return
+            seat = self.bots.get(get_current_player(self.state).id)
+            if not seat:
+                return
+            with timer(ACTION_SECONDS.labels("bot")), span("bot.move", player_id=seat.player_id):
+                advanced = seat.on_state_change(self.state)
+            if not advanced:
+                idle += 1
+                if idle < MAX_IDLE_BOT_MOVES:
+                    continue
+                # Don't leave the room waiting on a bot that can't move
+                if not seat.play_fallback(self.state):
+                    return
+            idle = 0
+            await self.broadcast_state()
+            # Yield so other rooms sharing the event loop keep making progress
+            await asyncio.sleep(0)
 
 class GameRoomManager:
-    def __init__(self):
+    """
+    Owns the rooms and their lifecycle. sweep(), run periodically, deletes rooms
+    nobody has been connected to for idle_timeout seconds and finished games
+    after finished_ttl, then hibernates least recently active idle rooms while
+    the estimated total size is over memory_budget bytes (0: no budget).
+    """
+    def __init__(self, default_rules: Optional[RuleSet] = None, event_bus: Optional[EventBus] = None,
+                 spectator_delay: float = 0.0, spectator_interval: float = 0.0,
+                 idle_timeout: float = 1800.0, finished_ttl: float = 300.0, memory_budget: int = 0,
+                 records: Optional[RecordWriter] = None):
         self.rooms: Dict[str, GameRoom] = {}
+        self.default_rules = default_rules
+        # Shared by every room's game; events are tagged with the room id
+        self.event_bus = event_bus
+        self.records = records
+        self.spectator_delay = spectator_delay
+        self.spectator_interval = spectator_interval
+        self.idle_timeout = idle_timeout
+        self.finished_ttl = finished_ttl
+        self.memory_budget = memory_budget
+        self.evicted_total = 0
+        self.reaped_total = 0
+        self.hibernated_total = 0
+        self._retired_restores = 0
 
-    def create_room(self, name: str) -> GameRoom:
+    def create_room(self, name: str, rules: Optional[RuleSet] = None) -> GameRoom:
         room_id = str(uuid.uuid4())[:8]
-        room = GameRoom(room_id, name)
+        room = GameRoom(room_id, name, rules or self.default_rules, self.event_bus,
+                        self.spectator_delay, self.spectator_interval, self.records)
         self.rooms[room_id] = room
         return room
 
@@ -125,7 +426,58 @@ class GameRoomManager:
         if player_id not in room.player_ids:
             room.player_ids.append(player_id)
         room.player_names[player_id] = player_name
+        room.touch()
 
     def delete_room(self, room_id: str):
         if room_id in self.rooms:
-            del self.rooms[room_id]
+            room = self.rooms.pop(room_id)
+            room.spectators.close()
+            for bot in room.bots.values():
+                bot.agent.close()
+            self._retired_restores += room.restores
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """One pass of eviction, reaping and hibernation; returns what it did."""
+        now = time.monotonic() if now is None else now
+        evicted = reaped = hibernated = 0
+        for room in list(self.rooms.values()):
+            if not room.is_idle():
+                continue
+            if room.finished_at is not None and now - room.finished_at >= self.finished_ttl:
+                self.delete_room(room.room_id)
+                reaped += 1
+            elif now - room.last_active >= self.idle_timeout:
+                self.delete_room(room.room_id)
+                evicted += 1
+
+        if self.memory_budget:
+            total = sum(room.approx_bytes() for room in self.rooms.values())
+            candidates = sorted((r for r in self.rooms.values()
+                                 if r.is_started and not r.is_hibernated and r.is_idle()),
+                                key=lambda r: r.last_active)
+            for room in candidates:
+                if total <= self.memory_budget:
+                    break
+                before = room.approx_bytes()
+                if room.hibernate():
+                    total -= before - room.approx_bytes()
+                    hibernated += 1
+
+        self.evicted_total += evicted
+        self.reaped_total += reaped
+        self.hibernated_total += hibernated
+        return {"evicted": evicted, "reaped": reaped, "hibernated": hibernated}
+
+    def metrics(self) -> Dict[str, int]:
+        rooms = list(self.rooms.values())
+        return {
+            "rooms_live": sum(not r.is_hibernated for r in rooms),
+            "rooms_hibernated": sum(r.is_hibernated for r in rooms),
+            "rooms_in_lobby": sum(not r.is_started for r in rooms),
+            "rooms_finished": sum(r.finished_at is not None for r in rooms),
+            "estimated_bytes": sum(r.approx_bytes() for r in rooms),
+            "evicted_total": self.evicted_total,
+            "reaped_total": self.reaped_total,
+            "hibernated_total": self.hibernated_total,
+            "restored_total": self._retired_restores + sum(r.restores for r in rooms),
+        }
@@ -0,0 +1,212 @@
+"""
+In-process metrics in the Prometheus text format, served at /metrics.
+
+Deliberately small: an observation is a bisect into fixed buckets plus a couple
+of additions, and gauges that mirror server state (sockets, rooms) are read
+from callbacks at scrape time instead of being kept up to date.
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; engine actions are sub-millisecond, sends and loop lag can be much longer
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 131072, 262144, 524288, 1048576)
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._child()
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def _child(self):
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def _samples(self):
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(self.value)}"
+        for values, child in self._children.items():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+class Gauge(_Metric):
+    """A value that is set, or read from a callback when scraped (set_function)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._function: Optional[Callable[[], object]] = None
+
+    def _child(self):
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], object]):
+        """function returns a number, or with labels a dict of label-value tuple -> number."""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            result = self._function()
+            if self.labelnames:
+                for values, value in result.items():
+                    yield f"{self.name}{_labels(self.labelnames, values)} {_format_value(value)}"
+            else:
+                yield f"{self.name} {_format_value(result)}"
+            return
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(self.value)}"
+        for values, child in self._children.items():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per-bucket (not cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _child(self):
+        return Histogram(self.name, self.documentation, self.buckets)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def _series(self, values: Tuple[str, ...], hist: "Histogram") -> Iterable[str]:
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), hist.counts):
+            cumulative += n
+            le = 'le="' + _format_value(bound) + '"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.labelnames, values)} {_format_value(hist.sum)}"
+        yield f"{self.name}_count{_labels(self.labelnames, values)} {hist.count}"
+
+    def _samples(self):
+        if not self.labelnames:
+            yield from self._series((), self)
+        for values, child in self._children.items():
+            yield from self._series(values, child)
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets, labelnames))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+ACTION_SECONDS = REGISTRY.histogram(
+    "shovels_action_seconds", "Engine time to apply one action (bot moves include choosing it).",
+    labelnames=("action_type",))
+ACTION_ERRORS = REGISTRY.counter(
+    "shovels_action_errors_total", "Actions rejected by the engine.", labelnames=("action_type",))
+BROADCAST_SERIALIZE_SECONDS = REGISTRY.histogram(
+    "shovels_broadcast_serialize_seconds", "Time to build (dump, resume delta) and encode a broadcast once for all players.")
+BROADCAST_BYTES = REGISTRY.histogram(
+    "shovels_broadcast_bytes", "Encoded size of a state broadcast.", buckets=SIZE_BUCKETS)
+WS_SEND_SECONDS = REGISTRY.histogram(
+    "shovels_ws_send_seconds", "Time for one WebSocket send to a player.")
+WS_CONNECTIONS = REGISTRY.gauge(
+    "shovels_ws_connections", "Open WebSocket connections.", labelnames=("kind",))
+ROOMS = REGISTRY.gauge("shovels_rooms", "Rooms by lifecycle state.", labelnames=("state",))
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "shovels_event_loop_lag_seconds", "How late the event loop woke a periodic probe.")
+
+async def probe_loop_lag(interval: float = 0.5, histogram: Histogram = LOOP_LAG_SECONDS):
+    """Sleeps `interval` over and over, recording how much longer each sleep took."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - started - interval))
+
+class timer:
+    """`with timer(histogram): ...` observes the block's duration in seconds."""
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
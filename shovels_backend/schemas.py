@@ -1,8 +1,9 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class RoomCreateRequest(BaseModel):
     name: str
+    rules: Optional[Dict[str, Any]] = None  # RuleSet overrides for a variant room
 
 class PlayerInfo(BaseModel):
     id: str
@@ -12,3 +13,4 @@ class RoomInfoResponse(BaseModel):
     name: str
     player_count: int
     is_started: bool
+    spectator_count: int = 0
@@ -0,0 +1,153 @@
+"""
+Read-only spectator stream for a room.
+
+Every update is redacted and JSON-encoded once, then the same text frame goes
+to every watcher, so the server's work per update doesn't grow with the
+audience. The stream can run behind the game (delay) and can throttle fast
+updates (min_interval), in which case only the newest frame due in each
+interval is sent.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from fastapi import WebSocket
+from shovels_engine.models import Character, GameState
+
+def redact_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Hides cards drawn from the deck (discard-pile draws were face up anyway) and
+    cards played face down in Phase 1.
+    """
+    if event["event_type"] == "PLAY_CARD" and event["phase"] == 1:
+        return {**event, "data": {**event["data"], "card": None}}
+    if event["event_type"] != "DRAW":
+        return event
+    data = event["data"]
+    drawn = [card if source == "DISCARD" else None for source, card in zip(data["sources"], data["drawn"])]
+    return {**event, "data": {**data, "drawn": drawn}}
+
+def _face_down(char: Character) -> Dict[str, Any]:
+    # The uid names the pool card, so it goes too
+    return {"uid": None, "rank": None, "suit": None, "stack": [], "stack_count": len(char.stack),
+            "is_tapped": char.is_tapped, "shield": char.shield}
+
+def public_state(state: GameState, events: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    The state as an onlooker sees it: hands, the deck and the shop pile are
+    replaced by their sizes (hand_count, deck_count, shop_pile_count), Phase 1
+    characters are face down (only stack_count shows) and events are redacted
+    (see redact_event). `events` is an already-redacted copy of state.events to
+    reuse instead of redacting the whole log again.
+    """
+    view = state.to_dict(exclude=("deck", "shop_pile", "events"))
+    for player, dumped in zip(state.players, view["players"]):
+        dumped["hand"] = []
+        dumped["hand_count"] = len(player.hand)
+        if state.phase == 1:
+            dumped["characters"] = [_face_down(c) for c in player.characters]
+    view["deck"] = []
+    view["deck_count"] = len(state.deck)
+    view["shop_pile"] = []
+    view["shop_pile_count"] = len(state.shop_pile)
+    view["events"] = events if events is not None else [redact_event(e) for e in state.events]
+    return view
+
+class SpectatorChannel:
+    """
+    Fans one public stream out to any number of watchers.
+
+    delay: seconds each frame is held back before it is sent.
+    min_interval: seconds between sends; 0 sends every frame, otherwise frames
+    that fall due while the channel waits are coalesced into the newest one
+    (counted in `coalesced`).
+    """
+    def __init__(self, delay: float = 0.0, min_interval: float = 0.0):
+        if delay < 0 or min_interval < 0:
+            raise ValueError("Spectator delay and interval must be non-negative")
+        self.delay = delay
+        self.min_interval = min_interval
+        self.watchers: Set[WebSocket] = set()
+        self.frames: Deque[Tuple[float, str]] = deque()  # (due time, encoded message)
+        self.last_frame: Optional[str] = None  # most recent frame sent, for late joiners
+        self.coalesced = 0
+        self._last_sent = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        # Redacted copy of the current game's event log, extended as it grows
+        self._events: List[Dict[str, Any]] = []
+        self._events_source: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def idle(self) -> bool:
+        """Nobody is watching and nothing needs holding back, so updates can be skipped."""
+        return not self.watchers and not self.delay
+
+    async def add(self, websocket: WebSocket):
+        """
+        Accepts a watcher. With a delay it starts from the last frame sent;
+        without one the room publishes its live state instead (see GameRoom).
+        """
+        await websocket.accept()
+        self.watchers.add(websocket)
+        if self.delay and self.last_frame is not None:
+            await websocket.send_text(self.last_frame)
+
+    def remove(self, websocket: WebSocket):
+        self.watchers.discard(websocket)
+
+    def publish(self, message: Dict[str, Any]):
+        """Encodes message once and queues it for every watcher."""
+        if self.idle:
+            return
+        loop = asyncio.get_running_loop()
+        self.frames.append((loop.time() + self.delay, json.dumps(message, separators=(",", ":"))))
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def publish_state(self, state: GameState):
+        if self.idle:
+            return
+        if state.events is not self._events_source or len(state.events) < len(self._events):
+            self._events_source = state.events
+            self._events = []
+        self._events.extend(redact_event(e) for e in state.events[len(self._events):])
+        # The frame is encoded now, so later appends to _events can't leak into it
+        self.publish({"type": "state_update", "spectator": True, "state": public_state(state, self._events)})
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.frames:
+            wait = max(self.frames[0][0], self._last_sent + self.min_interval) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, frame = self.frames.popleft()
+            if self.min_interval:
+                now = loop.time()
+                while self.frames and self.frames[0][0] <= now:
+                    _, frame = self.frames.popleft()
+                    self.coalesced += 1
+            self._last_sent = loop.time()
+            self.last_frame = frame
+            await self._send(frame)
+
+    async def _send(self, frame: str):
+        watchers = list(self.watchers)
+        results = await asyncio.gather(*(ws.send_text(frame) for ws in watchers), return_exceptions=True)
+        for ws, result in zip(watchers, results):
+            if isinstance(result, Exception):
+                self.watchers.discard(ws)
+
+    def compact(self):
+        """Drops cached frames and redacted events (for a hibernating room with no watchers)."""
+        self.frames.clear()
+        self.last_frame = None
+        self._events = []
+        self._events_source = None
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.frames.clear()
+        self.watchers.clear()
@@ -0,0 +1,107 @@
+"""
+Pydantic schemas for game state crossing the backend's boundary: client-supplied
+rules, hibernated rooms read back from storage, and states the load tester reads
+off the wire. The engine itself runs on the plain dataclasses in
+shovels_engine.models; these validate untrusted data and convert both ways:
+
+    GameStateSchema.from_engine(state)   engine object -> validated schema
+    schema.to_engine()                   schema -> engine object
+
+Unknown keys are ignored (public spectator views add counts), except in rules,
+where a misspelled field is an error.
+"""
+import uuid
+from typing import Any, ClassVar, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from shovels_engine.models import Card, Character, GameState, Player, Suit
+from shovels_engine.rules import RuleSet, check_rules
+
+class _EngineSchema(BaseModel):
+    engine_type: ClassVar[Any]
+
+    @classmethod
+    def from_engine(cls, obj: Any) -> "_EngineSchema":
+        return cls.model_validate(obj.to_dict())
+
+    def to_engine(self) -> Any:
+        return self.engine_type.from_dict(self.model_dump())
+
+class CardSchema(_EngineSchema):
+    model_config = ConfigDict(frozen=True)
+    engine_type: ClassVar[Any] = Card
+
+    uid: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    rank: int
+    suit: Suit
+    is_face: bool = False
+    face_rank: Optional[str] = None
+    is_ace: bool = False
+
+class CharacterSchema(_EngineSchema):
+    engine_type: ClassVar[Any] = Character
+
+    uid: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    rank: str
+    suit: Suit
+    stack: List[CardSchema] = Field(default_factory=list)
+    is_tapped: bool = False
+    shield: int = 0
+
+class PlayerSchema(_EngineSchema):
+    engine_type: ClassVar[Any] = Player
+
+    id: str
+    name: str
+    characters: List[CharacterSchema] = Field(default_factory=list)
+    hand: List[CardSchema] = Field(default_factory=list)
+    coins: int = 0
+    can_discard_second_face: bool = False
+    is_alive: bool = True
+
+class RuleSetSchema(_EngineSchema):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    engine_type: ClassVar[Any] = RuleSet
+
+    name: str = "standard"
+    face_power: Dict[str, int] = {"J": 1, "Q": 2, "K": 3}
+    shield_values: Dict[str, int] = {"J": 3, "Q": 5, "K": 10}
+    face_prices: Dict[str, int] = {"J": 3, "Q": 4, "K": 5}
+    ace_price: int = 10
+    clubs_tap_damage: int = 10
+    starting_characters: int = 3
+    max_characters: int = 3
+    shop_size: int = 3
+    shop_pile_size: int = 20
+    gravedig_pool_size: int = 5
+    refresh_cost: int = 2
+
+    @model_validator(mode="after")
+    def _playable(self) -> "RuleSetSchema":
+        check_rules(self.model_dump())
+        return self
+
+class GameStateSchema(_EngineSchema):
+    engine_type: ClassVar[Any] = GameState
+
+    deck: List[CardSchema] = Field(default_factory=list)
+    shop_pile: List[CardSchema] = Field(default_factory=list)
+    shop_row: List[Optional[CardSchema]] = Field(default_factory=list)
+    discard_pile: List[CardSchema] = Field(default_factory=list)
+    players: List[PlayerSchema] = Field(default_factory=list)
+    current_turn_index: int = 0
+    turn_count: int = 0
+    phase: int = 1
+    turn_subphase: str = "DRAW"
+    max_characters: int = 3
+    shop_size: int = 3
+    rules: RuleSetSchema = Field(default_factory=RuleSetSchema)
+    action_taken_this_turn: bool = False
+    cards_removed_this_turn: bool = False
+    character_tapped_this_turn: bool = False
+    dug_cards: List[CardSchema] = Field(default_factory=list)
+    active_character_index: Optional[int] = None
+    gravedig_pool: List[CardSchema] = Field(default_factory=list)
+    free_buys_remaining: int = 0
+    events: List[Dict] = Field(default_factory=list)
+    winner_id: Optional[str] = None
+    is_over: bool = False
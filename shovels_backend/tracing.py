@@ -0,0 +1,235 @@
+"""
+Minimal tracing with OpenTelemetry-compatible output.
+
+Spans nest through a context variable, so code deeper in a request (room,
+engine call, per-socket sends) only needs `with span("name"):` to become a
+child of the frame span the WebSocket endpoint opened. Finished spans are
+batched on a background thread and written by an exporter:
+    FileSpanExporter   OTLP/JSON lines, one ExportTraceServiceRequest per batch
+                       (the format of the collector's file exporter)
+    OtlpHttpExporter   POSTs the same JSON to a collector's /v1/traces
+    InMemorySpanExporter  keeps spans, for tests
+
+Until configure() is called (TRACE_EXPORT_PATH / TRACE_OTLP_ENDPOINT unset)
+span() returns a shared no-op, so tracing costs one attribute check.
+"""
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SERVICE_NAME = "shovels-backend"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        wrapped = {"boolValue": value}
+    elif isinstance(value, int):
+        wrapped = {"intValue": str(value)}
+    elif isinstance(value, float):
+        wrapped = {"doubleValue": value}
+    else:
+        wrapped = {"stringValue": str(value)}
+    return {"key": key, "value": wrapped}
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = self.end_ns = 0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NOOP = _NoopSpan()
+
+def otlp_request(spans: List[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """An OTLP ExportTraceServiceRequest (JSON encoding) for one batch of spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", service_name)]},
+        "scopeSpans": [{"scope": {"name": "shovels_backend.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+    }]}
+
+class SpanExporter:
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+class InMemorySpanExporter(SpanExporter):
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]):
+        self.spans.extend(spans)
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        self.service_name = service_name
+        self.file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: List[Span]):
+        self.file.write(json.dumps(otlp_request(spans, self.service_name), separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def shutdown(self):
+        self.file.close()
+
+class OtlpHttpExporter(SpanExporter):
+    """Sends batches to an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces."""
+    def __init__(self, endpoint: str, service_name: str = SERVICE_NAME, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.failures = 0
+
+    def export(self, spans: List[Span]):
+        import urllib.request
+
+        body = json.dumps(otlp_request(spans, self.service_name)).encode()
+        request = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError:
+            self.failures += 1
+
+class Tracer:
+    """
+    Hands finished spans to a writer thread in batches of batch_size (or every
+    flush_interval seconds). Spans past max_pending are dropped and counted, as
+    are batches the exporter raised on; the writer carries on either way.
+    """
+    def __init__(self):
+        self.exporter: Optional[SpanExporter] = None
+        self.dropped = 0
+        self.export_failures = 0
+        self._pending: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: SpanExporter, batch_size: int = 256, flush_interval: float = 1.0,
+                  max_pending: int = 10000):
+        if self.enabled:
+            self.shutdown()
+        self.exporter = exporter
+        self._pending = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, args=(exporter, self._pending, batch_size, flush_interval),
+                                        name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def span(self, name: str, **attributes: Any):
+        """A child of the current span, or a new trace's root span."""
+        if self.exporter is None:
+            return _NOOP
+        return Span(self, name, _current.get(), attributes)
+
+    def _finish(self, span: Span):
+        try:
+            self._pending.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self, exporter: SpanExporter, pending: "queue.Queue[Any]", batch_size: int, flush_interval: float):
+        batch: List[Span] = []
+        while True:
+            try:
+                item = pending.get(timeout=flush_interval)
+            except queue.Empty:
+                item = None
+            if isinstance(item, Span):
+                batch.append(item)
+                if len(batch) < batch_size:
+                    continue
+            if batch:
+                try:
+                    exporter.export(batch)
+                except Exception:
+                    self.export_failures += 1
+                batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is Tracer._STOP:
+                exporter.shutdown()
+                return
+
+    _STOP = object()
+
+    def flush(self):
+        """Waits until every span finished so far has been exported."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._pending.put(done)
+        done.wait()
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._pending.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+        self.exporter = None
+
+TRACER = Tracer()
+
+def span(name: str, **attributes: Any):
+    return TRACER.span(name, **attributes)
+
+def current_span():
+    return _current.get() or _NOOP
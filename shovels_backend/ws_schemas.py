@@ -2,9 +2,9 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 
 class WsMessage(BaseModel):
-    type: str # "action", "chat", "error", "start_game"
+    type: str # "action", "chat", "error", "start_game", "add_bot"
     data: Optional[Dict[str, Any]] = None
 
 class ActionData(BaseModel):
-    action_type: str # "draw", "discard", "play", "buy", "refresh", "tap", "gravedig", "action", "strike"
+    action_type: str # "draw", "discard", "play", "buy", "refresh", "tap", "gravedig", "action", "strike", "end"
     params: Dict[str, Any]
@@ -0,0 +1,195 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from itertools import combinations, combinations_with_replacement
+from .models import GameState, Player, Suit
+from .engine import (
+    draw_cards, discard_card, play_card,
+    perform_action, apply_face_strike,
+    tap_hero_power, resolve_gravedig, buy_card, refresh_shop,
+    get_current_player, end_turn
+)
+
+def end_player_turn(state: GameState, player_id: str):
+    """
+    Ends the turn on behalf of the current player: to leave the shop, or to pass
+    when no other move is legal (see legal_actions).
+    """
+    if get_current_player(state).id != player_id:
+        raise ValueError("Not your turn")
+    if state.turn_subphase not in ["SHOPPING", "SHOP_FREE_BUY"] and legal_actions(state, player_id) != [("end", {})]:
+        raise ValueError(f"Cannot end the turn in {state.turn_subphase} subphase")
+    end_turn(state)
+
+# Maps the wire-level action_type (see ws_schemas.ActionData) to the engine call.
+# Every handler takes (state, player_id, **params).
+ACTION_HANDLERS: Dict[str, Callable[..., None]] = {
+    "draw": draw_cards,
+    "discard": discard_card,
+    "play": play_card,
+    "buy": buy_card,
+    "refresh": refresh_shop,
+    "tap": tap_hero_power,
+    "gravedig": resolve_gravedig,
+    "action": perform_action,
+    "strike": apply_face_strike,
+    "end": end_player_turn,
+}
+
+def apply_action(state: GameState, player_id: str, action_type: str, params: Optional[Dict[str, Any]] = None):
+    """
+    Single entry point for mutating a game on behalf of a player.
+    Used by the WebSocket endpoint, in-server bot seats and the agents.
+    """
+    handler = ACTION_HANDLERS.get(action_type)
+    if handler is None:
+        raise ValueError(f"Unknown action: {action_type}")
+    recorder = state._recorder
+    # Encoded before the engine touches the state, so a move the record can't hold is refused
+    encoded = recorder.encode(player_id, action_type, params) if recorder is not None else None
+    handler(state, player_id, **(params or {}))
+    state._applied += 1
+    if recorder is not None:
+        recorder.on_action(state, encoded)
+
+# (action_type, params) - the same shape the WebSocket sends
+Action = Tuple[str, Dict[str, Any]]
+
+def action_key(action: Action) -> Hashable:
+    """Hashable identity of an action, for use as a dict key (search trees, records)."""
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(v) for v in value)
+        return value
+    return (action[0], freeze(action[1]))
+
+def _opponent_targets(state: GameState, player_id: str) -> List[Dict[str, Any]]:
+    return [
+        {"target_player_id": p.id, "target_char_index": c_idx}
+        for p in state.players if p.is_alive and p.id != player_id
+        for c_idx in range(len(p.characters))
+    ]
+
+def _suit_actions(base: Dict[str, Any], suits, targets: List[Dict[str, Any]]) -> List[Action]:
+    actions = []
+    for suit in sorted(suits):
+        if suit == Suit.CLUBS:
+            actions.extend(("action", {**base, "action_suit": suit, "target_info": t}) for t in targets)
+        else:
+            actions.append(("action", {**base, "action_suit": suit, "target_info": None}))
+    return actions
+
+def _phase1_actions(state: GameState, player: Player) -> List[Action]:
+    actions: List[Action] = []
+    if state.turn_subphase == "DRAW":
+        deck, discard = len(state.deck), len(state.discard_pile)
+        if deck >= 2:
+            actions.append(("draw", {"sources": ["DECK", "DECK"]}))
+        if deck >= 1 and discard >= 1:
+            actions.append(("draw", {"sources": ["DISCARD", "DECK"]}))
+        if discard >= 2:
+            actions.append(("draw", {"sources": ["DISCARD", "DISCARD"]}))
+    elif state.turn_subphase == "DISCARD":
+        actions.extend(("discard", {"card_index": i}) for i in range(len(player.hand)))
+    elif state.turn_subphase == "PLAY":
+        for h_idx, card in enumerate(player.hand):
+            slots = list(range(len(player.characters)))
+            if card.is_face:
+                if len(player.characters) < state.max_characters:
+                    slots.append(len(player.characters))
+                if player.can_discard_second_face:
+                    slots.append(None)
+            actions.extend(("play", {"card_index": h_idx, "character_index": c_idx}) for c_idx in slots)
+    return actions
+
+def _battle_actions(state: GameState, player: Player) -> List[Action]:
+    actions: List[Action] = []
+    targets = _opponent_targets(state, player.id)
+
+    if state.dug_cards:
+        # Recursive action: one option per suit, using every dug card of that suit
+        by_suit: Dict[Suit, List[int]] = {}
+        for i, c in enumerate(state.dug_cards):
+            by_suit.setdefault(c.suit, []).append(i)
+        for suit, indices in by_suit.items():
+            base = {"char_index": state.active_character_index, "top_n_cards": 0, "dug_indices": indices}
+            actions.extend(_suit_actions(base, [suit], targets))
+        actions.extend(
+            ("strike", {"char_index": state.active_character_index, **t}) for t in targets
+        )
+        return actions
+
+    char_indices = range(len(player.characters))
+    if state.active_character_index is not None:
+        char_indices = [state.active_character_index]
+
+    for c_idx in char_indices:
+        char = player.characters[c_idx]
+        seen = set()
+        for n in range(1, len(char.stack) + 1):
+            seen.add(char.stack[-n].suit)
+            base = {"char_index": c_idx, "top_n_cards": n}
+            actions.extend(_suit_actions(base, seen, targets))
+
+        if not char.is_tapped:
+            if char.suit == Suit.CLUBS:
+                hits = state.rules.compiled().power[char.rank]
+                for combo in combinations_with_replacement(range(len(targets)), hits):
+                    info = {"targets": [targets[i] for i in combo]}
+                    actions.append(("tap", {"char_index": c_idx, "target_info": info}))
+            else:
+                actions.append(("tap", {"char_index": c_idx, "target_info": None}))
+
+        if not char.stack:
+            actions.extend(("strike", {"char_index": c_idx, **t}) for t in targets)
+    return actions
+
+def _shop_actions(state: GameState, player: Player) -> List[Action]:
+    rules = state.rules.compiled()
+    is_free = state.free_buys_remaining > 0
+    actions: List[Action] = []
+    for slot, card in enumerate(state.shop_row):
+        if card is None or (not is_free and rules.price(card) > player.coins):
+            continue
+        for c_idx, char in enumerate(player.characters):
+            if card.is_face and rules.power[card.face_rank] <= rules.power[char.rank]:
+                continue
+            actions.append(("buy", {"slot_index": slot, "char_index": c_idx}))
+    if state.turn_subphase == "SHOPPING" and player.coins >= rules.refresh_cost:
+        actions.append(("refresh", {}))
+    return actions
+
+def _gravedig_actions(state: GameState, player: Player) -> List[Action]:
+    char = player.characters[state.active_character_index]
+    keep = min(state.rules.compiled().power[char.rank], len(state.gravedig_pool))
+    return [
+        ("gravedig", {"char_index": state.active_character_index, "indices": list(combo)})
+        for n in range(keep + 1)
+        for combo in combinations(range(len(state.gravedig_pool)), n)
+    ]
+
+def legal_actions(state: GameState, player_id: str) -> List[Action]:
+    """
+    Enumerates the on-turn actions available to player_id.
+    Out-of-turn Heart taps are not included. "end" is offered when nothing else
+    applies, and always while shopping (it's how a turn leaves the shop).
+    """
+    if state.is_over or not state.players or get_current_player(state).id != player_id:
+        return []
+    player = get_current_player(state)
+
+    if state.phase == 1:
+        actions = _phase1_actions(state, player)
+    elif state.turn_subphase == "BATTLE_ACTION":
+        actions = _battle_actions(state, player)
+    elif state.turn_subphase in ["SHOPPING", "SHOP_FREE_BUY"]:
+        actions = _shop_actions(state, player)
+        actions.append(("end", {}))
+    elif state.turn_subphase == "GRAVEDIGGING":
+        actions = _gravedig_actions(state, player)
+    else:
+        actions = []
+
+    if not actions:
+        actions.append(("end", {}))
+    return actions
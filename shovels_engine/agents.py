@@ -1,17 +1,39 @@
 import random
-from shovels_engine.models import GameState, Suit
-from shovels_engine.engine import (
-    draw_cards, discard_card, play_card, 
-    perform_action, apply_face_strike, 
-    tap_hero_power, resolve_gravedig, buy_card,
-    get_current_player, end_turn
-)
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+from shovels_engine.models import GameState, Card, Character, Player, Suit, initialize_full_pool
+from shovels_engine.rules import STANDARD_RULES
+from shovels_engine.actions import Action, apply_action, legal_actions
+from shovels_engine.stacks import stack_summary
 
 class Agent:
     def act(self, state: GameState, player_id: str):
         raise NotImplementedError
 
+    def close(self):
+        """Releases anything the agent holds between moves (worker processes); a no-op by default."""
+
+    def __enter__(self) -> "Agent":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@contextmanager
+def closing_agents(agents: Dict[str, Agent]) -> Iterator[Dict[str, Agent]]:
+    """Closes every agent in `agents` once the block exits, however it exits."""
+    try:
+        yield agents
+    finally:
+        for agent in agents.values():
+            agent.close()
+
 class RandomAgent(Agent):
+    """Picks random moves, from `rng` if given, else the global random module."""
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random
+
     def act(self, state: GameState, player_id: str):
         """Performs a random valid action based on the current subphase."""
         player = next(p for p in state.players if p.id == player_id)
@@ -35,29 +57,29 @@ class RandomAgent(Agent):
                         # Enforce DISCARD first if drawing from both
                         if "DISCARD" in sources and "DECK" in sources:
                             sources = ["DISCARD", "DECK"]
-                        draw_cards(state, player_id, sources)
+                        apply_action(state, player_id, "draw", {"sources": sources})
                     else:
-                        end_turn(state)
+                        apply_action(state, player_id, "end")
                 elif state.turn_subphase == "DISCARD":
-                    discard_card(state, player_id, 0)
+                    apply_action(state, player_id, "discard", {"card_index": 0})
                 elif state.turn_subphase == "PLAY":
                     # Try to play a card on a valid character index
                     played = False
                     # Randomize order to avoid bias towards index 0
                     candidates = list(range(len(player.characters) + 1))
-                    random.shuffle(candidates)
+                    self.rng.shuffle(candidates)
                     for c_idx in candidates:
                         target_idx = c_idx if c_idx < len(player.characters) else None
                         if target_idx is not None and target_idx >= state.max_characters:
                             target_idx = None
                         try:
-                            play_card(state, player_id, 0, target_idx)
+                            apply_action(state, player_id, "play", {"card_index": 0, "character_index": target_idx})
                             played = True
                             break
                         except ValueError:
                             continue
                     if not played:
-                        end_turn(state)
+                        apply_action(state, player_id, "end")
             
             else:
                 # Phase 2
@@ -65,27 +87,30 @@ class RandomAgent(Agent):
                     if state.dug_cards:
                         # Recursive action using dug cards
                         suits = {c.suit for c in state.dug_cards}
-                        suit = random.choice(list(suits))
+                        suit = self.rng.choice(sorted(suits))
                         indices = [i for i, c in enumerate(state.dug_cards) if c.suit == suit]
                         
                         target_info = None
                         if suit == Suit.CLUBS:
                             target_players = [p for p in state.players if p.is_alive and p.id != player_id]
                             if target_players:
-                                target_p = random.choice(target_players)
-                                target_c_idx = random.choice(range(len(target_p.characters)))
+                                target_p = self.rng.choice(target_players)
+                                target_c_idx = self.rng.choice(range(len(target_p.characters)))
                                 target_info = {'target_player_id': target_p.id, 'target_char_index': target_c_idx}
                         
-                        perform_action(state, player_id, state.active_character_index, 0, suit, dug_indices=indices, target_info=target_info)
+                        apply_action(state, player_id, "action", {
+                            "char_index": state.active_character_index, "top_n_cards": 0, "action_suit": suit,
+                            "dug_indices": indices, "target_info": target_info
+                        })
                         return
 
-                    action_type = random.choice(["HAND", "TAP", "STRIKE"])
+                    action_type = self.rng.choice(["HAND", "TAP", "STRIKE"])
                     char_indices = [i for i, c in enumerate(player.characters)]
                     if not char_indices:
-                        end_turn(state)
+                        apply_action(state, player_id, "end")
                         return
                         
-                    char_idx = random.choice(char_indices)
+                    char_idx = self.rng.choice(char_indices)
                     char = player.characters[char_idx]
                     
                     if action_type == "TAP" and not char.is_tapped:
@@ -96,10 +121,10 @@ class RandomAgent(Agent):
                                 if p.is_alive and p.id != player_id:
                                     for c_idx in range(len(p.characters)):
                                         target_info['targets'].append({'target_player_id': p.id, 'target_char_index': c_idx})
-                            random.shuffle(target_info['targets'])
-                            target_info['targets'] = target_info['targets'][:{"J": 1, "Q": 2, "K": 3}[char.rank]]
+                            self.rng.shuffle(target_info['targets'])
+                            target_info['targets'] = target_info['targets'][:state.rules.compiled().power[char.rank]]
                         try:
-                            tap_hero_power(state, player_id, char_idx, target_info)
+                            apply_action(state, player_id, "tap", {"char_index": char_idx, "target_info": target_info})
                             return
                         except:
                             action_type = "HAND"
@@ -107,10 +132,12 @@ class RandomAgent(Agent):
                     if action_type == "STRIKE":
                         target_players = [p for p in state.players if p.is_alive and p.id != player_id]
                         if target_players:
-                            target_p = random.choice(target_players)
-                            target_c_idx = random.choice(range(len(target_p.characters)))
+                            target_p = self.rng.choice(target_players)
+                            target_c_idx = self.rng.choice(range(len(target_p.characters)))
                             try:
-                                apply_face_strike(state, player_id, char_idx, target_p.id, target_c_idx)
+                                apply_action(state, player_id, "strike", {
+                                    "char_index": char_idx, "target_player_id": target_p.id, "target_char_index": target_c_idx
+                                })
                                 return
                             except:
                                 action_type = "HAND"
@@ -119,51 +146,247 @@ class RandomAgent(Agent):
                     
                     if action_type == "HAND":
                         if not char.stack:
-                            end_turn(state)
+                            apply_action(state, player_id, "end")
                             return
                             
-                        num_cards = random.randint(1, len(char.stack))
+                        num_cards = self.rng.randint(1, len(char.stack))
                         suits = {c.suit for c in char.stack[-num_cards:]}
-                        suit = random.choice(list(suits))
+                        suit = self.rng.choice(sorted(suits))
                         
                         target_info = None
                         if suit == Suit.CLUBS:
                             target_players = [p for p in state.players if p.is_alive and p.id != player_id]
                             if target_players:
-                                target_p = random.choice(target_players)
-                                target_c_idx = random.choice(range(len(target_p.characters)))
+                                target_p = self.rng.choice(target_players)
+                                target_c_idx = self.rng.choice(range(len(target_p.characters)))
                                 target_info = {'target_player_id': target_p.id, 'target_char_index': target_c_idx}
                             else:
-                                end_turn(state)
+                                apply_action(state, player_id, "end")
                                 return
                         
-                        perform_action(state, player_id, char_idx, num_cards, suit, target_info=target_info)
+                        apply_action(state, player_id, "action", {
+                            "char_index": char_idx, "top_n_cards": num_cards, "action_suit": suit, "target_info": target_info
+                        })
 
                 elif state.turn_subphase in ["SHOPPING", "SHOP_FREE_BUY"]:
                     valid_slots = [i for i, c in enumerate(state.shop_row) if c is not None]
                     played_in_shop = False
                     if valid_slots:
-                        slot = random.choice(valid_slots)
-                        char_idx = random.choice(range(len(player.characters)))
+                        slot = self.rng.choice(valid_slots)
+                        char_idx = self.rng.choice(range(len(player.characters)))
                         try:
-                            buy_card(state, player_id, slot, char_idx)
+                            apply_action(state, player_id, "buy", {"slot_index": slot, "char_index": char_idx})
                             played_in_shop = True
                         except:
                             pass
                     
                     if not played_in_shop or (player.coins < 3 and state.turn_subphase == "SHOPPING"):
-                        end_turn(state)
+                        apply_action(state, player_id, "end")
 
                 elif state.turn_subphase == "GRAVEDIGGING":
                     num_pool = len(state.gravedig_pool)
                     char = player.characters[state.active_character_index]
-                    limit = {"J": 1, "Q": 2, "K": 3}[char.rank]
-                    indices = random.sample(range(num_pool), min(limit, num_pool))
-                    resolve_gravedig(state, player_id, state.active_character_index, indices)
+                    limit = state.rules.compiled().power[char.rank]
+                    indices = self.rng.sample(range(num_pool), min(limit, num_pool))
+                    apply_action(state, player_id, "gravedig", {"char_index": state.active_character_index, "indices": indices})
 
         except Exception as e:
             # Fallback
             try:
-                end_turn(state)
+                apply_action(state, player_id, "end")
             except:
                 pass
+
+# --- Heuristic agent lookup tables (built once at import) ---
+
+# Card values assume the standard rules; power and shields are read from the game's own rules.
+FACE_POWER = STANDARD_RULES.compiled().power
+SHIELD_VALUES = STANDARD_RULES.compiled().shield
+# How much a rank point is worth on a stack, by suit: Hearts defend, Clubs attack,
+# Diamonds buy, Spades dig.
+SUIT_WEIGHT = {Suit.HEARTS: 1.2, Suit.CLUBS: 1.0, Suit.DIAMONDS: 0.8, Suit.SPADES: 0.6}
+
+CardKind = Tuple[Suit, int, Optional[str], bool]
+
+def _kind(card: Card) -> CardKind:
+    return (card.suit, card.rank, card.face_rank, card.is_ace)
+
+def _build_card_tables() -> Tuple[Dict[CardKind, float], Dict[CardKind, float]]:
+    card_value: Dict[CardKind, float] = {}
+    shop_value: Dict[CardKind, float] = {}
+    for card in initialize_full_pool():
+        if card.is_face:
+            value = FACE_POWER[card.face_rank] * 4.0
+        else:
+            value = (10 if card.is_ace else card.rank) * SUIT_WEIGHT[card.suit]
+        card_value[_kind(card)] = value
+        shop_value[_kind(card)] = value / card.price
+    return card_value, shop_value
+
+CARD_VALUE, SHOP_VALUE = _build_card_tables()
+MEAN_CARD_VALUE = sum(CARD_VALUE.values()) / len(CARD_VALUE)
+
+KILL_SCORE = 30.0
+FATIGUE_SCORE = -100.0
+
+def attack_outcome(target: Character, damage: int) -> Tuple[str, int]:
+    """
+    Mirrors attack_heart without mutating: returns ("KILL" | "BREAK" | "ABSORB", cards removed).
+    Damage is compared against the topmost Heart; breaking it takes everything above it.
+    """
+    i = stack_summary(target).nearest_heart()
+    if i >= 0:
+        if damage >= target.stack[i].rank + target.shield:
+            return "BREAK", len(target.stack) - i
+        return "ABSORB", 0
+    if damage < 1:
+        return "ABSORB", 0
+    return "KILL", 0
+
+class HeuristicAgent(Agent):
+    """
+    Greedy one-ply agent: scores every legal action with the lookup tables above
+    and plays the best. Deterministic (ties go to the first action), so it doubles
+    as a fixed evaluation opponent and a cheap rollout policy for MCTSAgent.
+    """
+    # Per-decision cache of stack value prefix sums, keyed by id(character)
+    _stack_values: Optional[Dict[int, List[float]]] = None
+
+    def act(self, state: GameState, player_id: str):
+        apply_action(state, player_id, *self.choose_action(state, player_id))
+
+    def choose_action(self, state: GameState, player_id: str) -> Action:
+        actions = legal_actions(state, player_id)
+        if len(actions) == 1:
+            return actions[0]
+        player = next(p for p in state.players if p.id == player_id)
+        self._stack_values = {}
+        try:
+            return max(actions, key=lambda a: self.score(state, player, a))
+        finally:
+            self._stack_values = None
+
+    def _top_value(self, char: Character, n: int) -> float:
+        """CARD_VALUE of the top n cards, from prefix sums built once per decision."""
+        if self._stack_values is None:
+            return sum(CARD_VALUE[_kind(c)] for c in char.stack[-n:])
+        prefix = self._stack_values.get(id(char))
+        if prefix is None:
+            prefix = self._stack_values[id(char)] = [0.0, *accumulate(CARD_VALUE[_kind(c)] for c in char.stack)]
+        return prefix[-1] - prefix[-1 - n]
+
+    def score(self, state: GameState, player: Player, action: Action) -> float:
+        action_type, params = action
+        scorer = getattr(self, f"_score_{action_type}")
+        return scorer(state, player, **params)
+
+    # Phase 1
+
+    def _score_draw(self, state: GameState, player: Player, sources: List[str]) -> float:
+        score = 0.0
+        discard_depth = 1
+        for source in sources:
+            if source == "DISCARD":
+                score += CARD_VALUE[_kind(state.discard_pile[-discard_depth])]
+                discard_depth += 1
+            else:
+                score += MEAN_CARD_VALUE
+        return score
+
+    def _score_discard(self, state: GameState, player: Player, card_index: int) -> float:
+        return -CARD_VALUE[_kind(player.hand[card_index])]
+
+    def _score_play(self, state: GameState, player: Player, card_index: int, character_index: Optional[int]) -> float:
+        card = player.hand[card_index]
+        if character_index is None:
+            return 0.0
+        if character_index == len(player.characters):
+            # An extra character is an extra life
+            return 8.0 + FACE_POWER[card.face_rank]
+        char = player.characters[character_index]
+        if card.is_face:
+            return (FACE_POWER[card.face_rank] - FACE_POWER[char.rank]) * 5.0
+        # Spread cards so no character sits exposed
+        return CARD_VALUE[_kind(card)] - 0.5 * len(char.stack)
+
+    # Phase 2: battle
+
+    def _targets_score(self, state: GameState, targets: List[Dict], damage: int) -> float:
+        score = 0.0
+        for t in targets:
+            target_player = next(p for p in state.players if p.id == t["target_player_id"])
+            target = target_player.characters[t["target_char_index"]]
+            outcome, removed = attack_outcome(target, damage)
+            if outcome == "KILL":
+                score += KILL_SCORE + FACE_POWER[target.rank] * 2
+            elif outcome == "BREAK":
+                score += 5.0 + 1.5 * removed
+            else:
+                score -= 1.0
+        return score
+
+    def _score_action(self, state: GameState, player: Player, char_index: int, top_n_cards: int,
+                      action_suit: Suit, dug_indices: Optional[List[int]] = None,
+                      target_info: Optional[Dict] = None) -> float:
+        if dug_indices is not None:
+            cards = [state.dug_cards[i] for i in dug_indices]
+            cost = 0.0
+            total = sum(10 if c.is_ace else c.rank for c in cards if c.suit == action_suit)
+        else:
+            char = player.characters[char_index]
+            cost = 0.3 * self._top_value(char, top_n_cards)
+            total = stack_summary(char).top_sum(top_n_cards, action_suit)
+
+        if action_suit == Suit.CLUBS:
+            gain = self._targets_score(state, [target_info], total)
+        elif action_suit == Suit.DIAMONDS:
+            price = state.rules.compiled().price
+            affordable = [CARD_VALUE[_kind(c)] for c in state.shop_row if c is not None and price(c) <= total]
+            gain = 0.8 * max(affordable, default=0.0)
+        elif action_suit == Suit.SPADES:
+            remaining = len(player.characters[char_index].stack) - top_n_cards
+            gain = 2.0 + 0.5 * min(total, remaining)
+        else:
+            gain = 0.5
+        return gain - cost
+
+    def _score_tap(self, state: GameState, player: Player, char_index: int, target_info: Optional[Dict] = None) -> float:
+        char = player.characters[char_index]
+        rules = state.rules.compiled()
+        if char.suit == Suit.HEARTS:
+            return rules.shield[char.rank] * 0.8
+        if char.suit == Suit.CLUBS:
+            return self._targets_score(state, target_info["targets"], rules.clubs_tap_damage)
+        if char.suit == Suit.DIAMONDS:
+            return rules.power[char.rank] * 4.0
+        return rules.power[char.rank] * 2.0 if state.discard_pile else 0.0
+
+    def _score_strike(self, state: GameState, player: Player, char_index: int,
+                      target_player_id: str, target_char_index: int) -> float:
+        target_player = next(p for p in state.players if p.id == target_player_id)
+        target = target_player.characters[target_char_index]
+        if not target.stack:
+            return KILL_SCORE + FACE_POWER[target.rank] * 2
+        # A strike that removes nothing costs the striker its life
+        return -20.0
+
+    def _score_end(self, state: GameState, player: Player) -> float:
+        if state.phase == 2 and state.turn_subphase == "BATTLE_ACTION":
+            return FATIGUE_SCORE
+        return 0.0
+
+    # Phase 2: shop and gravedig
+
+    def _score_buy(self, state: GameState, player: Player, slot_index: int, char_index: int) -> float:
+        card = state.shop_row[slot_index]
+        if card.is_face:
+            return (FACE_POWER[card.face_rank] - FACE_POWER[player.characters[char_index].rank]) * 6.0
+        if state.free_buys_remaining > 0:
+            return CARD_VALUE[_kind(card)]
+        return SHOP_VALUE[_kind(card)] * 3.0
+
+    def _score_refresh(self, state: GameState, player: Player) -> float:
+        return -1.0
+
+    def _score_gravedig(self, state: GameState, player: Player, char_index: int, indices: List[int]) -> float:
+        return sum(CARD_VALUE[_kind(state.gravedig_pool[i])] for i in indices)
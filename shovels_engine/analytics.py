@@ -0,0 +1,194 @@
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .models import Suit
+from .agents import RandomAgent, closing_agents
+from .simulation import new_game, run_game, DEFAULT_MAX_STEPS
+from .tournament import AGENT_REGISTRY
+
+# Categorical codes used in the columnar tables
+SUITS = [s.value for s in Suit]
+RANKS = ["J", "Q", "K"]
+EVENT_TYPES = [
+    "DRAW", "DISCARD_HAND", "PLAY_CARD", "BUY_CARD", "TAP_HERO", "ACTION", "DIG_ACTION",
+    "FACE_STRIKE", "HEART_BROKEN", "CHARACTER_DEATH", "PLAYER_DEAD", "SHOPPING_END",
+    "GRAVEDIGGING_END", "TURN_START", "PHASE_TRANSITION", "GAME_OVER",
+]
+DEATH_REASONS = ["STRIKE", "SUICIDE_STRIKE", "HEART_OVERWHELM", "FATIGUE"]
+
+_EVENT_CODE = {e: i for i, e in enumerate(EVENT_TYPES)}
+_REASON_CODE = {r: i for i, r in enumerate(DEATH_REASONS)}
+_SUIT_CODE = {s: i for i, s in enumerate(SUITS)}
+_RANK_CODE = {r: i for i, r in enumerate(RANKS)}
+
+EVENT_COLUMNS = ["game", "turn", "phase", "event_type", "seat", "subject_seat", "reason", "rank", "suit"]
+
+Tables = Dict[str, Dict[str, np.ndarray]]
+
+def _simulate(agent_name: str, n_players: int, rules: Dict[str, Any], seed: int, max_steps: int) -> Dict[str, Any]:
+    """Worker: plays one game and flattens it into plain rows (cheap to pickle back)."""
+    player_ids = [f"p{i}" for i in range(n_players)]
+    state = new_game(player_ids, seed, rules)
+    seat_of = {pid: i for i, pid in enumerate(player_ids)}
+    start_chars = [
+        (seat, _RANK_CODE[c.rank], _SUIT_CODE[c.suit.value])
+        for seat, p in enumerate(state.players) for c in p.characters
+    ]
+
+    factory = AGENT_REGISTRY.get(agent_name, RandomAgent)
+    with closing_agents({pid: factory() for pid in player_ids}) as agents:
+        run_game(state, agents, max_steps)
+
+    events = []
+    for e in state.events:
+        data = e["data"]
+        rank, suit = data.get("rank"), data.get("suit")
+        events.append((
+            e["turn_count"], e["phase"], _EVENT_CODE.get(e["event_type"], -1), seat_of[e["player_id"]],
+            seat_of.get(data.get("player_id"), -1), _REASON_CODE.get(data.get("reason"), -1),
+            _RANK_CODE.get(rank, -1), _SUIT_CODE.get(suit.value if isinstance(suit, Suit) else suit, -1),
+        ))
+
+    winner = seat_of.get(state.winner_id, -1) if state.is_over else -1
+    return {
+        "game": (seed, n_players, state.turn_count, int(state.is_over), winner),
+        "start_characters": start_chars,
+        "events": events,
+    }
+
+def build_tables(games: List[Dict[str, Any]]) -> Tables:
+    """Turns per-game rows into columnar numpy tables: games, start_characters, events."""
+    game_rows = np.array([g["game"] for g in games], dtype=np.int64).reshape(-1, 5)
+    games_table = dict(zip(["seed", "n_players", "turns", "finished", "winner_seat"], game_rows.T))
+
+    char_rows = [(i, *row) for i, g in enumerate(games) for row in g["start_characters"]]
+    char_arr = np.array(char_rows, dtype=np.int64).reshape(-1, 4)
+    chars_table = dict(zip(["game", "seat", "rank", "suit"], char_arr.T))
+    chars_table["won"] = (games_table["winner_seat"][chars_table["game"]] == chars_table["seat"]).astype(np.int64)
+
+    event_rows = [(i, *row) for i, g in enumerate(games) for row in g["events"]]
+    event_arr = np.array(event_rows, dtype=np.int64).reshape(-1, len(EVENT_COLUMNS))
+    events_table = dict(zip(EVENT_COLUMNS, event_arr.T))
+
+    return {"games": games_table, "start_characters": chars_table, "events": events_table}
+
+def simulate_batch(games: int, player_counts: Iterable[int] = (2, 3, 4), rules: Optional[Dict[str, Any]] = None,
+                   agent: str = "random", seed_offset: int = 0, workers: int = 1,
+                   max_steps: int = DEFAULT_MAX_STEPS) -> Tables:
+    """Plays `games` games per player count under `rules` and returns columnar tables."""
+    rules = rules or {}
+    jobs = [(agent, n, rules, seed_offset + s, max_steps) for n in player_counts for s in range(games)]
+    if workers <= 1:
+        rows = [_simulate(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_simulate, *zip(*jobs), chunksize=max(1, len(jobs) // (workers * 4))))
+    return build_tables(rows)
+
+# --- Aggregations (vectorized over the tables) ---
+
+def win_rate_by_start_character(tables: Tables) -> Dict[str, float]:
+    """Win rate of seats holding each starting character, keyed like "K-HEARTS"."""
+    chars = tables["start_characters"]
+    finished = tables["games"]["finished"][chars["game"]] == 1
+    code = chars["rank"][finished] * len(SUITS) + chars["suit"][finished]
+    size = len(RANKS) * len(SUITS)
+    held = np.bincount(code, minlength=size)
+    won = np.bincount(code, weights=chars["won"][finished], minlength=size)
+    rates = np.divide(won, held, out=np.zeros(size), where=held > 0)
+    return {f"{RANKS[i // len(SUITS)]}-{SUITS[i % len(SUITS)]}": float(rates[i]) for i in range(size)}
+
+def game_length_stats(tables: Tables) -> Dict[str, Dict[str, float]]:
+    """Turn-count distribution of finished games, per player count."""
+    games = tables["games"]
+    stats = {}
+    for n in np.unique(games["n_players"]):
+        turns = games["turns"][(games["n_players"] == n) & (games["finished"] == 1)]
+        if not len(turns):
+            continue
+        p10, p50, p90 = np.percentile(turns, [10, 50, 90])
+        stats[str(int(n))] = {"games": int(len(turns)), "mean": float(turns.mean()), "p10": float(p10),
+                              "p50": float(p50), "p90": float(p90), "max": float(turns.max())}
+    return stats
+
+def death_stats(tables: Tables) -> Dict[str, float]:
+    """Character deaths by reason, plus how often fatigue decides games."""
+    events = tables["events"]
+    n_games = len(tables["games"]["seed"])
+    deaths = events["event_type"] == _EVENT_CODE["CHARACTER_DEATH"]
+    by_reason = np.bincount(events["reason"][deaths], minlength=len(DEATH_REASONS))
+    total = max(int(deaths.sum()), 1)
+
+    fatigue = deaths & (events["reason"] == _REASON_CODE["FATIGUE"])
+    games_with_fatigue = np.unique(events["game"][fatigue])
+    eliminations = events["event_type"] == _EVENT_CODE["PLAYER_DEAD"]
+    fatigue_eliminations = eliminations & (events["reason"] == _REASON_CODE["FATIGUE"])
+
+    stats = {f"deaths_{r.lower()}_share": float(by_reason[i] / total) for i, r in enumerate(DEATH_REASONS)}
+    stats["deaths_per_game"] = float(deaths.sum() / max(n_games, 1))
+    stats["fatigue_deaths_per_game"] = float(fatigue.sum() / max(n_games, 1))
+    stats["games_with_fatigue_death"] = float(len(games_with_fatigue) / max(n_games, 1))
+    stats["fatigue_elimination_share"] = float(fatigue_eliminations.sum() / max(int(eliminations.sum()), 1))
+    return stats
+
+def seat_win_rates(tables: Tables) -> Dict[str, List[float]]:
+    """Win rate per seat (seat 0 opens Phase 1), per player count."""
+    games = tables["games"]
+    rates = {}
+    for n in np.unique(games["n_players"]):
+        mask = (games["n_players"] == n) & (games["finished"] == 1) & (games["winner_seat"] >= 0)
+        wins = np.bincount(games["winner_seat"][mask], minlength=int(n))
+        rates[str(int(n))] = (wins / max(int(mask.sum()), 1)).round(4).tolist()
+    return rates
+
+def report(tables: Tables) -> Dict[str, Any]:
+    games = tables["games"]
+    return {
+        "games": int(len(games["seed"])),
+        "unfinished": int((games["finished"] == 0).sum()),
+        "game_length": game_length_stats(tables),
+        "seat_win_rate": seat_win_rates(tables),
+        "deaths": death_stats(tables),
+        "win_rate_by_start_character": win_rate_by_start_character(tables),
+    }
+
+def save_tables(tables: Tables, path: str):
+    """Writes every column to a single .npz (keys are "<table>.<column>")."""
+    np.savez_compressed(path, **{f"{t}.{c}": col for t, cols in tables.items() for c, col in cols.items()})
+
+def load_tables(path: str) -> Tables:
+    tables: Tables = {}
+    with np.load(path) as data:
+        for key in data.files:
+            t, c = key.split(".", 1)
+            tables.setdefault(t, {})[c] = data[key]
+    return tables
+
+def _parse_config(text: str) -> Tuple[str, Dict[str, Any]]:
+    label, _, rules = text.partition("=")
+    return label, json.loads(rules) if rules else {}
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Simulate batches of games and report balance statistics.")
+    parser.add_argument("--games", type=int, default=200, help="Games per player count per config")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--agent", default="random", choices=sorted(AGENT_REGISTRY))
+    parser.add_argument("--config", action="append", type=_parse_config, default=None,
+                        help='RuleSet overrides as LABEL=JSON, e.g. wide=\'{"shield_values": {"J": 2, "Q": 4, "K": 8}}\'. Repeatable.')
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--save", help="Directory to write <label>.npz tables to")
+    args = parser.parse_args(argv)
+
+    configs = dict(args.config or [("default", {})])
+    results = {}
+    for label, rules in configs.items():
+        tables = simulate_batch(args.games, args.players, rules, agent=args.agent, workers=args.workers)
+        if args.save:
+            save_tables(tables, f"{args.save}/{label}.npz")
+        results[label] = {"rules": rules, **report(tables)}
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
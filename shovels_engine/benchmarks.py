@@ -0,0 +1,372 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from .models import GameState, Card, Suit, setup_game, clone_state
+from .engine import (
+    get_current_player, draw_cards, discard_card, play_card, perform_action, attack_heart,
+    tap_hero_power, buy_card, end_turn, can_player_act,
+)
+from .exposure import exposure, invalidate_exposure
+from .stacks import stack_summary
+from .agents import RandomAgent
+from .simulation import new_game
+
+# Fixed deal every fixture is played out from
+FIXTURE_SEED = 7
+FIXTURE_PLAYERS = ["p1", "p2", "p3"]
+STAGES = ["early", "mid", "late"]
+
+# A benchmark is >25% slower than its baseline before it counts as a regression
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+Thunk = Callable[[], object]
+Prepare = Callable[[GameState], Thunk]
+
+def _play_until(state: GameState, done: Callable[[GameState], bool], max_steps: int = 5000) -> GameState:
+    agent = RandomAgent()
+    for _ in range(max_steps):
+        if done(state):
+            return state
+        if state.is_over:
+            break
+        agent.act(state, get_current_player(state).id)
+    raise RuntimeError("Fixture game ended before reaching its stage")
+
+def build_fixtures(seed: int = FIXTURE_SEED) -> Dict[str, GameState]:
+    """
+    Snapshots of one seeded RandomAgent game:
+    early - the opening deal (Phase 1, first DRAW)
+    mid   - Phase 1 with half the deck drawn
+    late  - Phase 2, a few rounds after the stacks were revealed
+    Every snapshot is taken at the start of a turn.
+    """
+    random.seed(seed)
+    state = new_game(FIXTURE_PLAYERS)
+    fixtures = {"early": clone_state(state, keep_events=True)}
+    half = len(state.deck) // 2
+    _play_until(state, lambda s: len(s.deck) <= half and s.turn_subphase == "DRAW")
+    fixtures["mid"] = clone_state(state, keep_events=True)
+    _play_until(state, lambda s: s.phase == 2)
+    reveal = state.turn_count
+    _play_until(state, lambda s: s.turn_count >= reveal + 2 * len(s.players) and s.turn_subphase == "BATTLE_ACTION"
+                and not s.dug_cards)
+    fixtures["late"] = clone_state(state, keep_events=True)
+    return fixtures
+
+def _opponent(state: GameState, player_id: str):
+    return next(p for p in state.players if p.id != player_id and p.is_alive and p.characters)
+
+# --- Scenarios: each takes a private copy of a fixture and returns the call to time ---
+
+def _draw(state):
+    pid = get_current_player(state).id
+    return lambda: draw_cards(state, pid, ["DECK", "DECK"])
+
+def _play_number(state):
+    pid = get_current_player(state).id
+    draw_cards(state, pid, ["DECK", "DECK"])
+    discard_card(state, pid, 0)
+    player = get_current_player(state)
+    player.hand = [Card(rank=6, suit=Suit.HEARTS)]
+    return lambda: play_card(state, pid, 0, 0)
+
+def _play_face(state):
+    pid = get_current_player(state).id
+    draw_cards(state, pid, ["DECK", "DECK"])
+    discard_card(state, pid, 0)
+    player = get_current_player(state)
+    player.hand = [Card(rank=0, suit=Suit.SPADES, is_face=True, face_rank="K")]
+    return lambda: play_card(state, pid, 0, 0)
+
+def _action_clubs(state):
+    player = get_current_player(state)
+    target = _opponent(state, player.id)
+    target.characters[0].shield = 0
+    target.characters[0].stack = [Card(rank=3, suit=Suit.HEARTS), Card(rank=4, suit=Suit.DIAMONDS)]
+    player.characters[0].stack.append(Card(rank=9, suit=Suit.CLUBS))
+    info = {"target_player_id": target.id, "target_char_index": 0}
+    return lambda: perform_action(state, player.id, 0, 1, Suit.CLUBS, target_info=info)
+
+def _action_spades_dig(state):
+    """Spades digs two cards, then both are played from the dug pool (three nested actions)."""
+    player = get_current_player(state)
+    player.characters[0].stack += [
+        Card(rank=4, suit=Suit.DIAMONDS), Card(rank=7, suit=Suit.HEARTS), Card(rank=2, suit=Suit.SPADES),
+    ]
+    pid = player.id
+
+    def run():
+        perform_action(state, pid, 0, 1, Suit.SPADES)
+        perform_action(state, pid, 0, 0, Suit.HEARTS, dug_indices=[0])
+        perform_action(state, pid, 0, 0, Suit.DIAMONDS, dug_indices=[0])
+    return run
+
+def _attack_heart(state):
+    player = get_current_player(state)
+    target = _opponent(state, player.id)
+    char = target.characters[0]
+    char.shield = 0
+    char.stack = [Card(rank=5, suit=Suit.HEARTS)] + [Card(rank=r, suit=Suit.DIAMONDS) for r in range(2, 9)]
+    return lambda: attack_heart(state, player.id, target.id, 0, 20)
+
+def _tap_hearts(state):
+    player = get_current_player(state)
+    char = player.characters[0]
+    char.suit, char.rank, char.is_tapped = Suit.HEARTS, "K", False
+    return lambda: tap_hero_power(state, player.id, 0)
+
+def _tap_clubs(state):
+    player = get_current_player(state)
+    target = _opponent(state, player.id)
+    for c in target.characters:
+        c.shield = 0
+    char = player.characters[0]
+    char.suit, char.rank, char.is_tapped = Suit.CLUBS, "K", False
+    targets = [{"target_player_id": target.id, "target_char_index": 0}] * 3
+    return lambda: tap_hero_power(state, player.id, 0, {"targets": targets})
+
+def _buy(state):
+    player = get_current_player(state)
+    state.turn_subphase = "SHOPPING"
+    player.coins = 20
+    state.shop_row[0] = Card(rank=5, suit=Suit.HEARTS)
+    return lambda: buy_card(state, player.id, 0, 0)
+
+def _end_turn(state):
+    # An acting turn; a fatigued one is covered by the game fixtures themselves
+    state.action_taken_this_turn = True
+    return lambda: end_turn(state)
+
+def _can_act(state):
+    # Worst case: the player has only exposed, tapped faces, so every opponent is scanned
+    player = get_current_player(state)
+    for c in player.characters:
+        c.stack, c.is_tapped = [], True
+    for p in state.players:
+        if p is not player:
+            for c in p.characters:
+                c.stack = c.stack or [Card(rank=2, suit=Suit.DIAMONDS)]
+    return lambda: can_player_act(state, player.id)
+
+def _setup_game(state):
+    return lambda: setup_game(FIXTURE_PLAYERS)
+
+def _to_dict(state):
+    return lambda: state.to_dict()
+
+# name -> (prepare, stages it runs at or None if it needs no fixture, whether the call mutates state)
+BENCHMARKS: Dict[str, Tuple[Prepare, Optional[List[str]], bool]] = {
+    "draw_cards": (_draw, ["early", "mid"], True),
+    "play_card[number]": (_play_number, ["early", "mid"], True),
+    "play_card[face]": (_play_face, ["early", "mid"], True),
+    "perform_action[clubs]": (_action_clubs, ["late"], True),
+    "perform_action[spades_dig]": (_action_spades_dig, ["late"], True),
+    "attack_heart": (_attack_heart, ["late"], True),
+    "tap_hero_power[hearts]": (_tap_hearts, ["late"], True),
+    "tap_hero_power[clubs]": (_tap_clubs, ["late"], True),
+    "buy_card": (_buy, ["late"], True),
+    "end_turn": (_end_turn, STAGES, True),
+    "can_player_act": (_can_act, STAGES, False),
+    "setup_game": (_setup_game, None, False),
+    "to_dict": (_to_dict, STAGES, False),
+}
+
+Case = Tuple[str, Prepare, Optional[GameState], bool]
+
+def cases(fixtures: Dict[str, GameState], only: Optional[List[str]] = None) -> List[Case]:
+    """Expands BENCHMARKS into (case name, prepare, fixture, mutates), e.g. "draw_cards[early]"."""
+    out = []
+    for name, (prepare, stages, mutates) in BENCHMARKS.items():
+        if only and not any(name.startswith(o) for o in only):
+            continue
+        if stages is None:
+            out.append((name, prepare, None, mutates))
+        else:
+            out.extend((f"{name}[{stage}]", prepare, fixtures[stage], mutates) for stage in stages)
+    return out
+
+def _fresh(prepare: Prepare, fixture: Optional[GameState]) -> Thunk:
+    if fixture is None:
+        return prepare(None)
+    state = clone_state(fixture, keep_events=True)
+    thunk = prepare(state)
+    # Scenarios edit characters by hand; resync the summaries outside the timer
+    invalidate_exposure(state)
+    exposure(state)
+    for player in state.players:
+        for char in player.characters:
+            stack_summary(char)
+    return thunk
+
+def measure(prepare: Prepare, fixture: Optional[GameState], mutates: bool = True,
+            number: int = 200, repeat: int = 7) -> Dict[str, float]:
+    """
+    Times `number` calls per round and returns per-call microseconds. A mutating call
+    gets a fresh copy of the fixture each time (copying and scenario setup stay outside
+    the timer); a read-only one is called repeatedly on one copy. GC is paused while
+    timing, as in timeit.
+    """
+    rounds = []
+    for _ in range(repeat):
+        if mutates:
+            thunks = [_fresh(prepare, fixture) for _ in range(number)]
+        else:
+            thunks = [_fresh(prepare, fixture)] * number
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for thunk in thunks:
+                thunk()
+            elapsed = time.perf_counter() - start
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        rounds.append(elapsed / number * 1e6)
+    return {"min_us": round(min(rounds), 3), "median_us": round(statistics.median(rounds), 3)}
+
+def run_benchmarks(only: Optional[List[str]] = None, number: int = 200, repeat: int = 7) -> Dict[str, Dict[str, float]]:
+    fixtures = build_fixtures()
+    random.seed(FIXTURE_SEED)
+    return {name: measure(prepare, fixture, mutates, number, repeat)
+            for name, prepare, fixture, mutates in cases(fixtures, only)}
+
+def setup_throughput(player_counts=(2, 3, 4), seconds: float = 1.0) -> Dict[str, float]:
+    """Games dealt per second by setup_game, per player count."""
+    rates = {}
+    for n in player_counts:
+        player_ids = [f"p{i}" for i in range(n)]
+        games = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for _ in range(100):
+                setup_game(player_ids)
+            games += 100
+        rates[f"{n}p"] = round(games / (time.perf_counter() - start), 1)
+    return rates
+
+# Cold-start targets: what a simulation worker, a CLI run and the server import
+IMPORT_TARGETS = ["shovels_engine.engine", "shovels_engine.simulation", "shovels_engine.records",
+                  "shovels_engine.tournament", "shovels_backend.auth", "shovels_backend.main"]
+# Dependencies worth knowing about when one of them shows up in a cold start
+HEAVY_PACKAGES = ["pydantic", "numpy", "asyncio", "sqlite3", "multiprocessing", "fastapi", "authlib", "jose",
+                  "cryptography", "httpx"]
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = {{name.split(".")[0] for name in set(sys.modules) - before}}
+print(json.dumps({{"ms": elapsed * 1e3, "loaded": sorted(loaded)}}))
+"""
+
+def import_time(module: str, repeat: int = 5) -> Dict[str, object]:
+    """
+    Cold-import cost of `module`: each round imports it in a fresh interpreter and
+    times only the import statement (interpreter startup is excluded). "heavy" lists
+    the HEAVY_PACKAGES the import loaded.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    rounds, loaded = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-W", "ignore", "-c", _IMPORT_SCRIPT.format(module=module)],
+                             capture_output=True, text=True, check=True, env=env).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        rounds.append(result["ms"])
+        loaded = result["loaded"]
+    return {"min_ms": round(min(rounds), 1), "median_ms": round(statistics.median(rounds), 1),
+            "heavy": [name for name in HEAVY_PACKAGES if name in loaded]}
+
+def import_times(modules: Optional[List[str]] = None, repeat: int = 5) -> Dict[str, Dict[str, object]]:
+    return {module: import_time(module, repeat) for module in modules or IMPORT_TARGETS}
+
+def format_import_times(results: Dict[str, Dict[str, object]]) -> str:
+    lines = [f"{'module':<28}{'min ms':>9}{'median ms':>11}  heavy dependencies"]
+    for module, r in results.items():
+        lines.append(f"{module:<28}{r['min_ms']:>9.1f}{r['median_ms']:>11.1f}  {', '.join(r['heavy']) or '-'}")
+    return "\n".join(lines)
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, object]]:
+    """Rows of name, baseline, current and ratio (on min_us); regressed when ratio > 1 + threshold."""
+    rows = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if not base:
+            rows.append({"name": name, "baseline": None, "current": result["min_us"], "ratio": None, "regressed": False})
+            continue
+        ratio = result["min_us"] / base["min_us"] if base["min_us"] else 1.0
+        rows.append({"name": name, "baseline": base["min_us"], "current": result["min_us"],
+                     "ratio": round(ratio, 3), "regressed": ratio > 1 + threshold})
+    return rows
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def format_comparison(rows: List[Dict[str, object]]) -> str:
+    lines = [f"{'benchmark':<36}{'baseline us':>12}{'current us':>12}{'ratio':>8}"]
+    for r in rows:
+        base = f"{r['baseline']:.2f}" if r["baseline"] is not None else "-"
+        ratio = f"{r['ratio']:.2f}" if r["ratio"] is not None else "new"
+        flag = "  REGRESSED" if r["regressed"] else ""
+        lines.append(f"{r['name']:<36}{base:>12}{r['current']:>12.2f}{ratio:>8}{flag}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the engine entry points.")
+    parser.add_argument("--only", nargs="+", help="Run benchmarks whose name starts with any of these")
+    parser.add_argument("--number", type=int, default=200, help="Calls per timing round")
+    parser.add_argument("--repeat", type=int, default=7, help="Timing rounds (the fastest is compared)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown before failing")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--throughput", action="store_true", help="Only report setup_game games per second")
+    parser.add_argument("--imports", nargs="*", metavar="MODULE",
+                        help="Only report cold import times (of IMPORT_TARGETS unless modules are given)")
+    args = parser.parse_args(argv)
+
+    if args.throughput:
+        print(json.dumps({"setup_games_per_second": setup_throughput()}, indent=2))
+        return
+    if args.imports is not None:
+        print(format_import_times(import_times(args.imports, args.repeat)))
+        return
+
+    results = run_benchmarks(args.only, args.number, args.repeat)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"commit": _commit(), "python": platform.python_version(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    except FileNotFoundError:
+        baseline = {}
+    rows = compare(results, baseline, args.threshold)
+    print(format_comparison(rows))
+    regressed = [r["name"] for r in rows if r["regressed"]]
+    if regressed:
+        print(f"{len(regressed)} regression(s) over {args.threshold:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
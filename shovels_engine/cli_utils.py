@@ -1,3 +1,5 @@
+import sys
+from typing import IO, Any, Callable, Dict, List, Optional, Sequence, Tuple
 from shovels_engine.models import GameState, Suit, Card, Character, Player
 
 def card_to_str(card: Card) -> str:
@@ -12,44 +14,126 @@ def char_to_str(char: Character) -> str:
     status = "TAPPED" if char.is_tapped else "READY"
     return f"[{face} | {stack_str}] ({status})"
 
-def print_state(state: GameState):
-    print("\n" + "="*50)
-    print(f"TURN {state.turn_count} | PHASE {state.phase} | SUBPHASE: {state.turn_subphase}")
-    print(f"Deck: {len(state.deck)} cards")
+RULE = "=" * 50
+
+def _card_list(cards) -> str:
+    return ", ".join(card_to_str(c) for c in cards)
+
+def _header_lines(state: GameState) -> List[str]:
+    lines = ["", RULE, f"TURN {state.turn_count} | PHASE {state.phase} | SUBPHASE: {state.turn_subphase}",
+             f"Deck: {len(state.deck)} cards"]
     if state.discard_pile:
         top_3 = state.discard_pile[-3:]
-        discard_str = ", ".join(card_to_str(c) for c in reversed(top_3))
-        print(f"Discard Pile ({len(state.discard_pile)} cards): [{discard_str}]")
+        lines.append(f"Discard Pile ({len(state.discard_pile)} cards): [{_card_list(reversed(top_3))}]")
     else:
-        print("Discard Pile: EMPTY")
-    print("="*50)
+        lines.append("Discard Pile: EMPTY")
+    lines.append(RULE)
+    return lines
 
-    print("\nSHOP ROW:")
+def _shop_lines(state: GameState) -> List[str]:
+    lines = ["", "SHOP ROW:"]
     for i, c in enumerate(state.shop_row):
-        card_str = card_to_str(c) if c else "EMPTY"
-        print(f"  Slot {i}: {card_str}")
-
-    print("\nPLAYERS:")
-    for i, p in enumerate(state.players):
-        active = ">> " if state.current_turn_index == i else "   "
-        dead = " (DEAD)" if not p.is_alive else ""
-        print(f"{active}Player {p.id} ({p.name}){dead}")
-        print(f"     Coins: {p.coins}")
-        hand_str = ", ".join(card_to_str(c) for c in p.hand)
-        print(f"     Hand: [{hand_str}]")
-        print(f"     Characters ({len(p.characters)}/{state.max_characters}):")
-        for j, c in enumerate(p.characters):
-            print(f"       {j}: {char_to_str(c)}")
-    
-    if state.dug_cards:
-        dug_str = ", ".join(card_to_str(c) for c in state.dug_cards)
-        print(f"\nDUG CARDS (RECURSIVE POOL): [{dug_str}]")
+        lines.append(f"  Slot {i}: {card_to_str(c) if c else 'EMPTY'}")
+    return lines
 
+def _player_lines(state: GameState, i: int, char_str: Callable[[Character], str] = char_to_str) -> List[str]:
+    p = state.players[i]
+    active = ">> " if state.current_turn_index == i else "   "
+    dead = " (DEAD)" if not p.is_alive else ""
+    lines = [f"{active}Player {p.id} ({p.name}){dead}",
+             f"     Coins: {p.coins}",
+             f"     Hand: [{_card_list(p.hand)}]",
+             f"     Characters ({len(p.characters)}/{state.max_characters}):"]
+    for j, c in enumerate(p.characters):
+        lines.append(f"       {j}: {char_str(c)}")
+    return lines
+
+def _pool_lines(state: GameState) -> List[str]:
+    lines = []
+    if state.dug_cards:
+        lines += ["", f"DUG CARDS (RECURSIVE POOL): [{_card_list(state.dug_cards)}]"]
     if state.gravedig_pool:
-        pool_str = ", ".join(card_to_str(c) for c in state.gravedig_pool)
-        print(f"\nGRAVEDIG POOL: [{pool_str}]")
-    
-    print("="*50)
+        lines += ["", f"GRAVEDIG POOL: [{_card_list(state.gravedig_pool)}]"]
+    lines.append(RULE)
+    return lines
+
+def board_lines(state: GameState) -> List[str]:
+    """The board print_state shows, as lines."""
+    lines = _header_lines(state) + _shop_lines(state) + ["", "PLAYERS:"]
+    for i in range(len(state.players)):
+        lines += _player_lines(state, i)
+    return lines + _pool_lines(state)
+
+def print_state(state: GameState):
+    print("\n".join(board_lines(state)))
+
+class BoardRenderer:
+    """
+    Full-screen ANSI view of the board for watching games. Each component
+    (header, shop, one block per player, dug/gravedig pools, recent events) is
+    rebuilt only when its key changes. Keys hold the card objects themselves:
+    cards are immutable, and tuples of them compare by identity first. Then only the screen lines that
+    differ from the previous frame are rewritten, in place.
+    With ansi=False each frame is printed in full, for pipes and logs.
+    """
+    def __init__(self, out: Optional[IO[str]] = None, ansi: Optional[bool] = None):
+        self.out = out or sys.stdout
+        self.ansi = self.out.isatty() if ansi is None else ansi
+        self._cache: Dict[str, Tuple[Any, List[str]]] = {}
+        self._screen: List[str] = []
+        self._chars: Dict[str, Tuple[Any, str]] = {}
+
+    def _char_str(self, char: Character) -> str:
+        key = (char.is_tapped, tuple(char.stack))
+        cached = self._chars.get(char.uid)
+        if cached is None or cached[0] != key:
+            cached = self._chars[char.uid] = (key, char_to_str(char))
+        return cached[1]
+
+    def _component(self, name: str, key: Any, build: Callable[[], List[str]]) -> List[str]:
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        lines = build()
+        self._cache[name] = (key, lines)
+        return lines
+
+    def lines(self, state: GameState, events: Sequence[str] = ()) -> List[str]:
+        c = self._component
+        discard = state.discard_pile
+        lines = list(c("header", (state.turn_count, state.phase, state.turn_subphase, len(state.deck),
+                                  len(discard), tuple(discard[-3:])), lambda: _header_lines(state)))
+        lines += c("shop", tuple(state.shop_row), lambda: _shop_lines(state))
+        lines += ["", "PLAYERS:"]
+        for i, p in enumerate(state.players):
+            key = (state.current_turn_index == i, p.is_alive, p.coins, tuple(p.hand), state.max_characters,
+                   tuple(self._char_str(ch) for ch in p.characters))
+            lines += c(f"player:{i}", key, lambda: _player_lines(state, i, self._char_str))
+        lines += c("pools", (tuple(state.dug_cards), tuple(state.gravedig_pool)), lambda: _pool_lines(state))
+        if events:
+            lines += c("events", tuple(events), lambda: ["", "RECENT EVENTS:"] + [f"  {e}" for e in events])
+        return lines
+
+    def frame(self, state: GameState, events: Sequence[str] = ()) -> str:
+        """The text that brings the screen up to date with state."""
+        lines = self.lines(state, events)
+        if not self.ansi:
+            return "\n".join(lines) + "\n"
+        if not self._screen:
+            parts = ["\x1b[2J\x1b[H" + "\n".join(lines)]
+        else:
+            parts = [f"\x1b[{row + 1};1H{line}\x1b[K" for row, line in enumerate(lines)
+                     if row >= len(self._screen) or self._screen[row] != line]
+            if len(lines) < len(self._screen):
+                parts.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+        # Park the cursor below the board
+        parts.append(f"\x1b[{len(lines) + 1};1H")
+        self._screen = lines
+        return "".join(parts)
+
+    def draw(self, state: GameState, events: Sequence[str] = ()):
+        self.out.write(self.frame(state, events))
+        self.out.flush()
 
 def print_banner(text: str):
     print("\n" + "#"*60)
@@ -0,0 +1,464 @@
+"""
+Offline imitation-learning datasets built from game records.
+
+Each recorded action becomes one sample, seen from the acting seat:
+    obs      int16[OBS_SIZE]   the observation (encode_observation)
+    action   int16             the action's index in ACTION_SPACE
+    legal    int16[...]        indices of the legal actions (a sparse legal mask)
+    outcome  int8              +1 if the actor won the game, -1 if it lost, 0 otherwise
+    game     int64, seat int8  where the sample came from
+
+Records are split into shards by a hash of the game (not by file position or
+worker), so a shard's contents depend only on the input and the shard count.
+Every shard is written as chunks of .npy files that load memory-mapped, and a
+manifest.json lists them:
+
+    python -m shovels_engine.dataset build games.shvr -o data/ --shards 16 --workers 4
+    data = ShardDataset("data/")
+    for obs, action, mask, outcome in data.batches(1024, seed=0): ...
+
+Observations and action indices are relative to the actor: seat 0 is always
+the player on turn, and opponents are numbered by how many seats after it they sit.
+Hidden information (other hands, deck order) is not included.
+"""
+import argparse
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, combinations_with_replacement
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .actions import Action, apply_action, legal_actions
+from .models import Card, GameState, Suit
+from .records import GameRecord, iter_records
+
+DATASET_VERSION = 1
+
+# Shape limits of the observation and action space; games past them (house
+# rules with more seats or characters) have actions that can't be encoded
+MAX_SEATS = 4
+MAX_CHARACTERS = 4
+MAX_HAND = 4
+MAX_SHOP = 4
+MAX_STACK = 16
+MAX_POOL = 5
+MAX_HITS = 3
+STACK_SHOWN = 8
+
+SUITS = list(Suit)
+SUBPHASES = ["DRAW", "DISCARD", "PLAY", "BATTLE_ACTION", "SHOPPING", "SHOP_FREE_BUY", "GRAVEDIGGING"]
+_SUIT_CODE = {s: i for i, s in enumerate(SUITS)}
+_SUBPHASE_CODE = {s: i + 1 for i, s in enumerate(SUBPHASES)}
+_FACE_CODE = {"J": 11, "Q": 12, "K": 13}
+
+def card_code(card: Optional[Card]) -> int:
+    """0 for no card, else 1-52: 13 kinds (2-10, ace, J, Q, K) per suit."""
+    if card is None:
+        return 0
+    if card.is_face:
+        kind = _FACE_CODE[card.face_rank] - 1
+    elif card.is_ace:
+        kind = 9
+    else:
+        kind = card.rank - 2
+    return 1 + _SUIT_CODE[card.suit] * 13 + kind
+
+def _face_code(rank: str, suit: Suit) -> int:
+    return 1 + _SUIT_CODE[suit] * 13 + _FACE_CODE[rank] - 1
+
+# (name, width) of each observation block, in order
+CHARACTER_FIELDS = [("present", 1), ("face", 1), ("tapped", 1), ("shield", 1), ("stack_size", 1),
+                    ("stack_top", STACK_SHOWN), ("stack_suits", len(SUITS))]
+SEAT_FIELDS = [("present", 1), ("alive", 1), ("coins", 1), ("hand_size", 1), ("characters", 1),
+               ("can_discard_second_face", 1)]
+OBS_FIELDS = [
+    ("phase", 1), ("subphase", 1), ("turn", 1), ("deck_size", 1), ("discard_size", 1), ("shop_pile_size", 1),
+    ("active_character", 1), ("free_buys", 1), ("action_taken", 1), ("character_tapped", 1),
+    ("cards_removed", 1), ("players", 1), ("discard_top", 3), ("shop_row", MAX_SHOP), ("dug_cards", MAX_POOL),
+    ("gravedig_pool", MAX_POOL), ("hand", MAX_HAND),
+    ("seats", MAX_SEATS * (sum(w for _, w in SEAT_FIELDS) + MAX_CHARACTERS * sum(w for _, w in CHARACTER_FIELDS))),
+]
+OBS_SIZE = sum(width for _, width in OBS_FIELDS)
+
+def _clip(n: int) -> int:
+    return min(n, 32767)
+
+def _codes(cards: Sequence[Optional[Card]], width: int) -> List[int]:
+    codes = [card_code(c) for c in cards[:width]]
+    return codes + [0] * (width - len(codes))
+
+def seat_order(state: GameState, player_id: str) -> List[int]:
+    """Indices into state.players, starting with player_id and going round the table."""
+    n = len(state.players)
+    start = next(i for i, p in enumerate(state.players) if p.id == player_id)
+    return [(start + k) % n for k in range(n)]
+
+def encode_observation(state: GameState, player_id: str) -> np.ndarray:
+    """The state as player_id sees it, as int16[OBS_SIZE] laid out by OBS_FIELDS."""
+    seats = seat_order(state, player_id)
+    me = state.players[seats[0]]
+    active = state.active_character_index
+    obs = [
+        state.phase, _SUBPHASE_CODE.get(state.turn_subphase, 0), _clip(state.turn_count), len(state.deck),
+        len(state.discard_pile), len(state.shop_pile), -1 if active is None else active, state.free_buys_remaining,
+        int(state.action_taken_this_turn), int(state.character_tapped_this_turn),
+        int(state.cards_removed_this_turn), len(state.players),
+    ]
+    obs += _codes(state.discard_pile[::-1], 3)
+    obs += _codes(state.shop_row, MAX_SHOP)
+    obs += _codes(state.dug_cards, MAX_POOL)
+    obs += _codes(state.gravedig_pool, MAX_POOL)
+    obs += _codes(me.hand, MAX_HAND)
+    char_width = sum(w for _, w in CHARACTER_FIELDS)
+    seat_width = sum(w for _, w in SEAT_FIELDS) + MAX_CHARACTERS * char_width
+    for k in range(MAX_SEATS):
+        if k >= len(seats):
+            obs += [0] * seat_width
+            continue
+        p = state.players[seats[k]]
+        obs += [1, int(p.is_alive), _clip(p.coins), len(p.hand), len(p.characters), int(p.can_discard_second_face)]
+        for c in range(MAX_CHARACTERS):
+            if c >= len(p.characters):
+                obs += [0] * char_width
+                continue
+            char = p.characters[c]
+            suits = [0] * len(SUITS)
+            for card in char.stack:
+                suits[_SUIT_CODE[card.suit]] += 1
+            obs += [1, _face_code(char.rank, char.suit), int(char.is_tapped), char.shield, len(char.stack)]
+            obs += _codes(char.stack[::-1], STACK_SHOWN)
+            obs += suits
+    return np.array(obs, dtype=np.int16)
+
+# Targets are (seats after the actor, character index)
+_TARGETS = [(s, c) for s in range(1, MAX_SEATS) for c in range(MAX_CHARACTERS)]
+
+def _action_keys() -> List[Hashable]:
+    keys: List[Hashable] = [("draw", s) for s in (("DECK", "DECK"), ("DISCARD", "DECK"), ("DISCARD", "DISCARD"))]
+    keys += [("discard", h) for h in range(MAX_HAND)]
+    keys += [("play", h, c) for h in range(MAX_HAND) for c in list(range(MAX_CHARACTERS)) + [None]]
+    keys += [("buy", s, c) for s in range(MAX_SHOP) for c in range(MAX_CHARACTERS)]
+    keys += [("refresh",), ("end",)]
+    for c in range(MAX_CHARACTERS):
+        keys += [("tap", c, None)]
+        keys += [("tap", c, hits) for n in range(MAX_HITS + 1) for hits in combinations_with_replacement(_TARGETS, n)]
+    suit_targets = [(s, None) for s in SUITS if s != Suit.CLUBS] + [(Suit.CLUBS, t) for t in _TARGETS]
+    keys += [("dig", s, t) for s, t in suit_targets]
+    keys += [("action", c, n, s, t) for c in range(MAX_CHARACTERS) for n in range(1, MAX_STACK + 1)
+             for s, t in suit_targets]
+    keys += [("strike", c, t) for c in range(MAX_CHARACTERS) for t in _TARGETS]
+    keys += [("gravedig", combo) for n in range(MAX_HITS + 1) for combo in combinations(range(MAX_POOL), n)]
+    return keys
+
+class ActionSpace:
+    """
+    A fixed numbering of actor-relative actions. Recursive (dug card) actions
+    are numbered by suit and target, as legal_actions offers them.
+    """
+    def __init__(self):
+        self.keys = _action_keys()
+        self.index = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def _seats(state: GameState, player_id: str) -> Dict[str, int]:
+        return {state.players[i].id: k for k, i in enumerate(seat_order(state, player_id))}
+
+    def key(self, state: GameState, player_id: str, action: Action,
+            seats: Optional[Dict[str, int]] = None) -> Hashable:
+        action_type, params = action
+        params = params or {}
+        seats = seats or self._seats(state, player_id)
+
+        def target(info):
+            return (seats[info["target_player_id"]], info["target_char_index"])
+
+        if action_type == "draw":
+            return ("draw", tuple(params["sources"]))
+        if action_type == "discard":
+            return ("discard", params["card_index"])
+        if action_type == "play":
+            return ("play", params["card_index"], params.get("character_index"))
+        if action_type == "buy":
+            return ("buy", params["slot_index"], params["char_index"]) if not params.get("is_free") else None
+        if action_type in ("refresh", "end"):
+            return (action_type,)
+        if action_type == "tap":
+            info = params.get("target_info")
+            if info is None:
+                return ("tap", params["char_index"], None)
+            return ("tap", params["char_index"], tuple(sorted(target(t) for t in info.get("targets", []))))
+        if action_type == "action":
+            suit = Suit(params["action_suit"])
+            info = params.get("target_info")
+            hit = target(info) if suit == Suit.CLUBS and info else None
+            if params.get("dug_indices"):
+                return ("dig", suit, hit)
+            return ("action", params["char_index"], params["top_n_cards"], suit, hit)
+        if action_type == "strike":
+            return ("strike", params["char_index"], target(params))
+        if action_type == "gravedig":
+            return ("gravedig", tuple(sorted(params["indices"])))
+        return None
+
+    def encode(self, state: GameState, player_id: str, action: Action,
+               seats: Optional[Dict[str, int]] = None) -> int:
+        """The action's index, or -1 if it is outside the space."""
+        try:
+            key = self.key(state, player_id, action, seats)
+        except (KeyError, ValueError):
+            return -1
+        return self.index.get(key, -1)
+
+    def legal(self, state: GameState, player_id: str) -> np.ndarray:
+        """Sorted indices of player_id's legal actions (those inside the space)."""
+        seats = self._seats(state, player_id)
+        indices = {self.encode(state, player_id, a, seats) for a in legal_actions(state, player_id)}
+        indices.discard(-1)
+        return np.array(sorted(indices), dtype=np.int16)
+
+    def decode(self, state: GameState, player_id: str, index: int) -> Action:
+        """The engine action for an index, e.g. to play a trained policy's choice."""
+        key = self.keys[index]
+        order = seat_order(state, player_id)
+
+        def target(t):
+            return {"target_player_id": state.players[order[t[0]]].id, "target_char_index": t[1]}
+
+        kind = key[0]
+        if kind == "draw":
+            return ("draw", {"sources": list(key[1])})
+        if kind == "discard":
+            return ("discard", {"card_index": key[1]})
+        if kind == "play":
+            return ("play", {"card_index": key[1], "character_index": key[2]})
+        if kind == "buy":
+            return ("buy", {"slot_index": key[1], "char_index": key[2]})
+        if kind in ("refresh", "end"):
+            return (kind, {})
+        if kind == "tap":
+            # Hits land in the order legal_actions lists them (table order), which decides event order
+            hits = None if key[2] is None else sorted(key[2], key=lambda t: (order[t[0]], t[1]))
+            info = None if hits is None else {"targets": [target(t) for t in hits]}
+            return ("tap", {"char_index": key[1], "target_info": info})
+        if kind == "dig":
+            indices = [i for i, c in enumerate(state.dug_cards) if c.suit == key[1]]
+            return ("action", {"char_index": state.active_character_index, "top_n_cards": 0, "dug_indices": indices,
+                               "action_suit": key[1], "target_info": target(key[2]) if key[2] else None})
+        if kind == "action":
+            return ("action", {"char_index": key[1], "top_n_cards": key[2], "action_suit": key[3],
+                               "target_info": target(key[4]) if key[4] else None})
+        if kind == "strike":
+            return ("strike", {"char_index": key[1], **target(key[2])})
+        return ("gravedig", {"char_index": state.active_character_index, "indices": list(key[1])})
+
+ACTION_SPACE = ActionSpace()
+
+def game_id(record: GameRecord) -> int:
+    """A stable 63-bit id from the deal, shuffle seed and seating."""
+    digest = zlib.crc32(record.deal + record.shuffle_seed.to_bytes(8, "little", signed=True))
+    return digest << 31 | zlib.crc32(",".join(record.players).encode()) >> 1
+
+def shard_of(record: GameRecord, shards: int) -> int:
+    return game_id(record) % shards
+
+def record_samples(record: GameRecord, agents: Optional[Sequence[str]] = None,
+                   stats: Optional[Dict[str, int]] = None) -> Iterator[Tuple[np.ndarray, int, np.ndarray, int, int]]:
+    """
+    Replays a record, yielding (obs, action, legal, outcome, seat) before each
+    action. With `agents`, only seats whose meta["agents"] entry is listed are
+    kept. Actions outside ACTION_SPACE are skipped and counted in
+    stats["skipped"].
+    """
+    stats = stats if stats is not None else {}
+    seat_agents = record.meta.get("agents")
+    keep = set(range(len(record.players)))
+    if agents is not None:
+        keep = {i for i, name in enumerate(seat_agents or []) if name in agents}
+    seat_of = {pid: i for i, pid in enumerate(record.players)}
+    state = record.new_state()
+    for player_id, action_type, params in record.actions:
+        seat = seat_of[player_id]
+        if seat in keep:
+            legal = ACTION_SPACE.legal(state, player_id)
+            index = ACTION_SPACE.encode(state, player_id, (action_type, params))
+            if index < 0:
+                stats["skipped"] = stats.get("skipped", 0) + 1
+            else:
+                if not np.any(legal == index):
+                    # The engine accepted a move legal_actions doesn't list (e.g. a paid buy
+                    # during free buys), so it was legal all the same
+                    legal = np.sort(np.append(legal, np.int16(index)))
+                outcome = 0 if record.winner is None else (1 if record.winner == player_id else -1)
+                yield encode_observation(state, player_id), index, legal, outcome, seat
+        apply_action(state, player_id, action_type, params)
+
+class _ChunkWriter:
+    def __init__(self, directory: str, shard: int, chunk_size: int):
+        self.directory = directory
+        self.shard = shard
+        self.chunk_size = chunk_size
+        self.chunks: List[Dict[str, Any]] = []
+        self._reset()
+
+    def _reset(self):
+        self.obs, self.action, self.outcome, self.game, self.seat = [], [], [], [], []
+        self.legal: List[np.ndarray] = []
+
+    def add(self, obs, action, legal, outcome, game, seat):
+        self.obs.append(obs)
+        self.action.append(action)
+        self.legal.append(legal)
+        self.outcome.append(outcome)
+        self.game.append(game)
+        self.seat.append(seat)
+        if len(self.action) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.action:
+            return
+        name = f"shard-{self.shard:05d}-{len(self.chunks):04d}"
+        offsets = np.zeros(len(self.legal) + 1, dtype=np.int64)
+        np.cumsum([len(l) for l in self.legal], out=offsets[1:])
+        arrays = {
+            "obs": np.stack(self.obs),
+            "action": np.array(self.action, dtype=np.int16),
+            "legal": np.concatenate(self.legal).astype(np.int16),
+            "legal_offsets": offsets,
+            "outcome": np.array(self.outcome, dtype=np.int8),
+            "game": np.array(self.game, dtype=np.int64),
+            "seat": np.array(self.seat, dtype=np.int8),
+        }
+        for field, array in arrays.items():
+            np.save(os.path.join(self.directory, f"{name}.{field}.npy"), array)
+        self.chunks.append({"name": name, "rows": len(self.action)})
+        self._reset()
+
+def build_shard(inputs: Sequence[str], output: str, shard: int, shards: int, chunk_size: int = 65536,
+                agents: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Writes the samples of every input record that hashes to `shard`. Returns its manifest entry."""
+    writer = _ChunkWriter(output, shard, chunk_size)
+    stats = {"games": 0, "samples": 0, "skipped": 0}
+    for path in inputs:
+        for record in iter_records(path):
+            if shard_of(record, shards) != shard:
+                continue
+            gid = game_id(record)
+            stats["games"] += 1
+            for obs, action, legal, outcome, seat in record_samples(record, agents, stats):
+                writer.add(obs, action, legal, outcome, gid, seat)
+                stats["samples"] += 1
+    writer.flush()
+    return {"shard": shard, "chunks": writer.chunks, **stats}
+
+def build_dataset(inputs: Sequence[str], output: str, shards: int = 8, workers: int = 1, chunk_size: int = 65536,
+                  agents: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Builds every shard (in parallel with workers > 1) and writes output/manifest.json."""
+    os.makedirs(output, exist_ok=True)
+    inputs = [os.path.abspath(p) for p in inputs]
+    if workers <= 1:
+        entries = [build_shard(inputs, output, k, shards, chunk_size, agents) for k in range(shards)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(build_shard, inputs, output, k, shards, chunk_size, agents) for k in range(shards)]
+            entries = [f.result() for f in futures]
+    manifest = {
+        "version": DATASET_VERSION,
+        "obs_size": OBS_SIZE,
+        "obs_fields": OBS_FIELDS,
+        "actions": len(ACTION_SPACE),
+        "inputs": inputs,
+        "agents": list(agents) if agents is not None else None,
+        "shards": entries,
+    }
+    with open(os.path.join(output, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+class ShardDataset:
+    """Reads a built dataset; chunks are memory-mapped and loaded on first use."""
+    FIELDS = ("obs", "action", "legal", "legal_offsets", "outcome", "game", "seat")
+
+    def __init__(self, path: str, shards: Optional[Sequence[int]] = None):
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] != DATASET_VERSION:
+            raise ValueError(f"Dataset version {self.manifest['version']}, expected {DATASET_VERSION}")
+        if self.manifest["obs_size"] != OBS_SIZE or self.manifest["actions"] != len(ACTION_SPACE):
+            raise ValueError("Dataset was built with a different observation or action space")
+        self.path = path
+        self.chunks = [c for entry in self.manifest["shards"] if shards is None or entry["shard"] in shards
+                       for c in entry["chunks"]]
+        self._loaded: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return sum(c["rows"] for c in self.chunks)
+
+    def chunk(self, i: int) -> Dict[str, np.ndarray]:
+        name = self.chunks[i]["name"]
+        if name not in self._loaded:
+            self._loaded[name] = {
+                field: np.load(os.path.join(self.path, f"{name}.{field}.npy"), mmap_mode="r") for field in self.FIELDS
+            }
+        return self._loaded[name]
+
+    @staticmethod
+    def masks(chunk: Dict[str, np.ndarray], rows: np.ndarray) -> np.ndarray:
+        """Dense bool[len(rows), actions] legal masks for rows of a chunk."""
+        mask = np.zeros((len(rows), len(ACTION_SPACE)), dtype=bool)
+        offsets, legal = chunk["legal_offsets"], chunk["legal"]
+        for r, row in enumerate(rows):
+            mask[r, legal[offsets[row]:offsets[row + 1]]] = True
+        return mask
+
+    def batches(self, batch_size: int, seed: Optional[int] = None
+                ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        (obs, action, mask, outcome) batches. With a seed, chunks and the rows
+        within each chunk are visited in a seeded random order.
+        """
+        rng = np.random.default_rng(seed) if seed is not None else None
+        order = rng.permutation(len(self.chunks)) if rng is not None else range(len(self.chunks))
+        for i in order:
+            chunk = self.chunk(i)
+            rows = np.arange(self.chunks[i]["rows"])
+            if rng is not None:
+                rng.shuffle(rows)
+            for start in range(0, len(rows), batch_size):
+                picked = np.sort(rows[start:start + batch_size]) if rng is None else rows[start:start + batch_size]
+                yield (np.asarray(chunk["obs"][picked]), np.asarray(chunk["action"][picked]),
+                       self.masks(chunk, picked), np.asarray(chunk["outcome"][picked]))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build imitation-learning shards from game record files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Replay records into NumPy shards")
+    build.add_argument("inputs", nargs="+", help="Game record files (see shovels_engine.records)")
+    build.add_argument("-o", "--output", required=True, help="Output directory")
+    build.add_argument("--shards", type=int, default=8)
+    build.add_argument("--workers", type=int, default=1)
+    build.add_argument("--chunk-size", type=int, default=65536, help="Samples per .npy chunk")
+    build.add_argument("--agents", nargs="+", help="Only keep moves by seats played by these agents")
+    info = commands.add_parser("info", help="Summarize a built dataset")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        manifest = build_dataset(args.inputs, args.output, args.shards, args.workers, args.chunk_size, args.agents)
+        totals = {k: sum(e[k] for e in manifest["shards"]) for k in ("games", "samples", "skipped")}
+        print(f"{totals['games']} games -> {totals['samples']} samples in {args.shards} shards "
+              f"({totals['skipped']} actions outside the action space skipped)")
+    else:
+        data = ShardDataset(args.path)
+        outcomes = np.concatenate([data.chunk(i)["outcome"] for i in range(len(data.chunks))]) if data.chunks else []
+        print(f"{len(data)} samples in {len(data.chunks)} chunks; obs {OBS_SIZE} x int16, {len(ACTION_SPACE)} actions")
+        if len(outcomes):
+            print(f"Outcomes: {np.mean(np.asarray(outcomes) == 1):.1%} from winners, "
+                  f"{np.mean(np.asarray(outcomes) == -1):.1%} from losers")
+
+if __name__ == "__main__":
+    main()
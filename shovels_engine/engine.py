@@ -1,5 +1,8 @@
 from typing import List, Optional, Tuple, Dict
-from .models import GameState, Card, Character, Player, Suit
+from .models import GameState, Card, Character, Player, Suit, face_card
+from .exposure import exposure, track
+from .stacks import stack_summary, push_card, pop_card, action_rank
+from .events import publish
 import collections
 import random
 
@@ -18,7 +21,11 @@ def log_event(state: GameState, event_type: str, data: Dict):
         "subphase": state.turn_subphase,
         "data": data
     }
-    state.events.append(event)
+    publish(state, event)
+
+def _shuffle(state: GameState, cards: List[Card]):
+    """Shuffles with the game's own RNG if it has one (recorded games), else the global one."""
+    (state._rng or random).shuffle(cards)
 
 def get_current_player(state: GameState) -> Player:
     return state.players[state.current_turn_index]
@@ -72,7 +79,7 @@ def draw_cards(state: GameState, player_id: str, sources: List[str]):
         player.can_discard_second_face = True
         
     state.turn_subphase = "DISCARD"
-    log_event(state, "DRAW", {"sources": sources, "drawn": [c.model_dump() for c in temp_drawn]})
+    log_event(state, "DRAW", {"sources": sources, "drawn": [c.to_dict() for c in temp_drawn]})
 
 def discard_card(state: GameState, player_id: str, card_index: int):
     """
@@ -92,7 +99,7 @@ def discard_card(state: GameState, player_id: str, card_index: int):
     state.discard_pile.append(card)
     
     state.turn_subphase = "PLAY"
-    log_event(state, "DISCARD_HAND", {"card": card.model_dump()})
+    log_event(state, "DISCARD_HAND", {"card": card.to_dict()})
 
 def play_card(state: GameState, player_id: str, card_index: int, character_index: Optional[int] = None):
     """
@@ -130,16 +137,14 @@ def play_card(state: GameState, player_id: str, card_index: int, character_index
             raise ValueError("Cannot create new character with a number card")
         # All valid, now consume card and apply
         player.hand.pop(card_index)
-        player.characters[character_index].stack.append(card)
+        push_card(player.characters[character_index], card)
     else:
         # Replacement or New Character
         if character_index < len(player.characters):
             # Replace existing
             player.hand.pop(card_index)
             old_char = player.characters[character_index]
-            # Must include uid for Card validation
-            old_face = Card(uid=old_char.uid, rank=0, suit=old_char.suit, is_face=True, face_rank=old_char.rank)
-            state.discard_pile.append(old_face)
+            state.discard_pile.append(face_card(old_char))
             
             player.characters[character_index].uid = card.uid
             player.characters[character_index].rank = card.face_rank
@@ -153,7 +158,8 @@ def play_card(state: GameState, player_id: str, card_index: int, character_index
         else:
             raise ValueError(f"Invalid character index or too many characters (max {state.max_characters})")
     
-    log_event(state, "PLAY_CARD", {"card": card.model_dump(), "character_index": character_index})
+    track(state, player)
+    log_event(state, "PLAY_CARD", {"card": card.to_dict(), "character_index": character_index})
     end_turn(state)
 
 def buy_card(state: GameState, player_id: str, slot_index: int, char_index: int, is_free: bool = False):
@@ -175,9 +181,10 @@ def buy_card(state: GameState, player_id: str, slot_index: int, char_index: int,
     
     card = state.shop_row[slot_index]
     
+    rules = state.rules.compiled()
     # Calculate effective price
     effective_is_free = is_free or state.free_buys_remaining > 0
-    price = 0 if effective_is_free else card.price
+    price = 0 if effective_is_free else rules.price(card)
         
     if player.coins < price:
         raise ValueError("Not enough coins")
@@ -186,8 +193,7 @@ def buy_card(state: GameState, player_id: str, slot_index: int, char_index: int,
     char = player.characters[char_index]
     if card.is_face:
         # Face upgrade: J < Q < K
-        rank_values = {"J": 1, "Q": 2, "K": 3}
-        if rank_values[card.face_rank] <= rank_values[char.rank]:
+        if rules.power[card.face_rank] <= rules.power[char.rank]:
             if effective_is_free:
                 # Discard invalid free buy
                 state.discard_pile.append(card)
@@ -199,14 +205,15 @@ def buy_card(state: GameState, player_id: str, slot_index: int, char_index: int,
                 raise ValueError(f"Cannot upgrade {char.rank} with {card.face_rank}")
         
         # Replace face
-        old_face = Card(rank=0, suit=char.suit, is_face=True, face_rank=char.rank)
-        state.discard_pile.append(old_face)
+        state.discard_pile.append(face_card(char))
+        char.uid = card.uid
         char.rank = card.face_rank
         char.suit = card.suit
         char.is_tapped = False
     else:
         # Number card to stack
-        char.stack.append(card)
+        push_card(char, card)
+    track(state, player)
         
     player.coins -= price
     if state.free_buys_remaining > 0:
@@ -214,7 +221,7 @@ def buy_card(state: GameState, player_id: str, slot_index: int, char_index: int,
         
     # Mark slot as empty (refilled at end of turn or refresh)
     state.shop_row[slot_index] = None
-    log_event(state, "BUY_CARD", {"card": card.model_dump(), "slot_index": slot_index, "char_index": char_index, "price": price})
+    log_event(state, "BUY_CARD", {"card": card.to_dict(), "slot_index": slot_index, "char_index": char_index, "price": price})
 
 def refresh_shop(state: GameState, player_id: str):
     """
@@ -228,17 +235,18 @@ def refresh_shop(state: GameState, player_id: str):
     if not player:
         raise ValueError(f"Player {player_id} not found")
     
-    if player.coins < 2:
+    cost = state.rules.compiled().refresh_cost
+    if player.coins < cost:
         raise ValueError("Not enough coins to refresh shop")
     
-    player.coins -= 2
+    player.coins -= cost
     
     # Wipe current row
     for card in state.shop_row:
         if card:
             state.discard_pile.append(card)
     
-    state.shop_row = [None, None, None]
+    state.shop_row = [None] * state.shop_size
     refill_shop_row(state)
 
 def refill_shop_row(state: GameState):
@@ -249,7 +257,7 @@ def refill_shop_row(state: GameState):
                 # Refill shop pile from discard
                 state.shop_pile = state.discard_pile[:]
                 state.discard_pile = []
-                random.shuffle(state.shop_pile)
+                _shuffle(state, state.shop_pile)
             
             if state.shop_pile:
                 state.shop_row[i] = state.shop_pile.pop()
@@ -275,8 +283,10 @@ def tap_hero_power(state: GameState, player_id: str, char_index: int, target_inf
     if char.is_tapped:
         raise ValueError("Character already tapped")
     
+    rules = state.rules.compiled()
     char.is_tapped = True
     state.character_tapped_this_turn = True
+    track(state, player)
     log_event(state, "TAP_HERO", {"char_index": char_index, "suit": char.suit, "rank": char.rank})
     
     if char.suit == Suit.CLUBS:
@@ -284,7 +294,7 @@ def tap_hero_power(state: GameState, player_id: str, char_index: int, target_inf
             raise ValueError("Target info required for Clubs power")
         targets = target_info.get('targets', []) # List of {'target_player_id': ..., 'target_char_index': ...}
         
-        num_strikes = {"J": 1, "Q": 2, "K": 3}[char.rank]
+        num_strikes = rules.power[char.rank]
         if len(targets) > num_strikes:
             raise ValueError(f"{char.rank} of Clubs can only hit {num_strikes} targets")
             
@@ -304,13 +314,13 @@ def tap_hero_power(state: GameState, player_id: str, char_index: int, target_inf
                     # Re-check existence before each hit on this slot
                     target_p = next(p for p in state.players if p.id == target_p_id)
                     if slot_idx < len(target_p.characters):
-                        attack_heart(state, player_id, target_p_id, slot_idx, 10)
+                        attack_heart(state, player_id, target_p_id, slot_idx, rules.clubs_tap_damage)
                     else:
                         break # Slot already removed
     
     elif char.suit == Suit.DIAMONDS:
         # Free purchases: Set counter and transition to subphase
-        num_free = {"J": 1, "Q": 2, "K": 3}[char.rank]
+        num_free = rules.power[char.rank]
         state.free_buys_remaining = num_free
         state.turn_subphase = "SHOP_FREE_BUY"
         return # subphase remains
@@ -320,11 +330,11 @@ def tap_hero_power(state: GameState, player_id: str, char_index: int, target_inf
         # Shuffle discard pile
         temp_deck = state.discard_pile[:]
         state.discard_pile = []
-        random.shuffle(temp_deck)
+        _shuffle(state, temp_deck)
         
         # Deal up to 5 cards to gravedig pool
         state.gravedig_pool = []
-        for _ in range(min(5, len(temp_deck))):
+        for _ in range(min(rules.gravedig_pool_size, len(temp_deck))):
             state.gravedig_pool.append(temp_deck.pop())
         
         # Remaining discard pile
@@ -334,8 +344,8 @@ def tap_hero_power(state: GameState, player_id: str, char_index: int, target_inf
         return # subphase remains
         
     elif char.suit == Suit.HEARTS:
-        shield_values = {"J": 3, "Q": 5, "K": 10}
-        char.shield += shield_values[char.rank]
+        char.shield += rules.shield[char.rank]
+        track(state, player)
     
     if is_turn and not state.dug_cards and state.turn_subphase not in ["SHOPPING", "SHOP_FREE_BUY", "GRAVEDIGGING"]:
         end_turn(state)
@@ -350,7 +360,7 @@ def resolve_gravedig(state: GameState, player_id: str, char_index: int, indices:
     player = next((p for p in state.players if p.id == player_id), None)
     char = player.characters[char_index]
     
-    num_keep = {"J": 1, "Q": 2, "K": 3}[char.rank]
+    num_keep = state.rules.compiled().power[char.rank]
     if len(indices) > num_keep:
         raise ValueError(f"{char.rank} of Spades can only keep {num_keep} cards")
         
@@ -358,8 +368,9 @@ def resolve_gravedig(state: GameState, player_id: str, char_index: int, indices:
     # We must sort reverse to avoid shifting indices while popping
     for idx in sorted(indices, reverse=True):
         if idx < len(state.gravedig_pool):
-            char.stack.append(state.gravedig_pool.pop(idx))
+            push_card(char, state.gravedig_pool.pop(idx))
             
+    track(state, player)
     # Return rest to discard
     state.discard_pile.extend(state.gravedig_pool)
     state.gravedig_pool = []
@@ -391,28 +402,32 @@ def perform_action(state: GameState, player_id: str, char_index: Optional[int],
             raise ValueError("Recursive actions must use the same character")
         char_index = state.active_character_index
 
-    action_cards = []
-    
     if dug_indices is not None:
         # Use from dug pool
+        action_cards = []
         for idx in sorted(dug_indices, reverse=True):
             action_cards.append(state.dug_cards.pop(idx))
+        if action_suit not in {c.suit for c in action_cards}:
+            raise ValueError(f"Suit {action_suit} not present")
+        total_rank = sum(action_rank(c) for c in action_cards if c.suit == action_suit)
     else:
-        # Use from character stack
+        # Use from character stack: check and total the top cards before taking them
         if char_index is None:
             raise ValueError("char_index required")
         char = player.characters[char_index]
+        if top_n_cards < 1:
+            raise ValueError("Must use at least one card from the top of the stack")
+        if top_n_cards > len(char.stack):
+            raise ValueError("Not enough cards on the stack")
+        stack = stack_summary(char)
+        if not stack.top_has(top_n_cards, action_suit):
+            raise ValueError(f"Suit {action_suit} not present")
+        total_rank = stack.top_sum(top_n_cards, action_suit)
         for _ in range(top_n_cards):
-            c = char.stack.pop()
-            action_cards.append(c)
-            state.discard_pile.append(c)
-            state.cards_removed_this_turn = True
-
-    suits_present = {c.suit for c in action_cards}
-    if action_suit not in suits_present:
-        raise ValueError(f"Suit {action_suit} not present")
+            state.discard_pile.append(stack.pop())
+        state.cards_removed_this_turn = True
+        track(state, player)
 
-    total_rank = sum(10 if c.is_ace else c.rank for c in action_cards if c.suit == action_suit)
     state.action_taken_this_turn = True
     state.active_character_index = char_index # Set this as the active character for this turn
     
@@ -442,15 +457,17 @@ def resolve_suit_effect(state: GameState, player_id: str, char_index: Optional[i
     elif suit == Suit.SPADES:
         if char_index is None:
             raise ValueError("Spade actions require character context")
-        char = next(p for p in state.players if p.id == player_id).characters[char_index]
+        player = next(p for p in state.players if p.id == player_id)
+        char = player.characters[char_index]
         dig_count = min(total_rank, len(char.stack))
         dug = []
         for _ in range(dig_count):
-            card = char.stack.pop()
+            card = pop_card(char)
             state.dug_cards.append(card)
             dug.append(card)
             state.cards_removed_this_turn = True
-        log_event(state, "DIG_ACTION", {"dig_count": dig_count, "dug_cards": [c.model_dump() for c in dug]})
+        track(state, player)
+        log_event(state, "DIG_ACTION", {"dig_count": dig_count, "dug_cards": [c.to_dict() for c in dug]})
         return # Recursion
 
 def apply_face_strike(state: GameState, player_id: str, char_index: int, target_player_id: str, target_char_index: int):
@@ -489,6 +506,7 @@ def apply_face_strike(state: GameState, player_id: str, char_index: int, target_
         target_player.characters.pop(target_char_index)
         state.cards_removed_this_turn = True
         removed = True
+        track(state, target_player)
         if not target_player.characters:
             target_player.is_alive = False
             log_event(state, "PLAYER_DEAD", {"player_id": target_player_id, "reason": "STRIKE"})
@@ -512,6 +530,7 @@ def apply_face_strike(state: GameState, player_id: str, char_index: int, target_
         if not player.characters:
             player.is_alive = False
             log_event(state, "PLAYER_DEAD", {"player_id": player_id, "reason": "SUICIDE_STRIKE"})
+        track(state, player)
 
     if not state.dug_cards:
         end_turn(state)
@@ -534,20 +553,19 @@ def attack_heart(state: GameState, player_id: str, target_player_id: str, target
             if not target_player.characters:
                 target_player.is_alive = False
                 log_event(state, "PLAYER_DEAD", {"player_id": target_player_id, "reason": "HEART_OVERWHELM"})
+            track(state, target_player)
         return
 
-    heart_found = False
-    for i in range(len(target_char.stack) - 1, -1, -1):
-        card = target_char.stack[i]
-        if card.suit == Suit.HEARTS:
-            heart_found = True
-            if damage >= (card.rank + target_char.shield):
-                num_to_remove = len(target_char.stack) - i
-                for _ in range(num_to_remove):
-                    state.discard_pile.append(target_char.stack.pop())
-                state.cards_removed_this_turn = True
-                log_event(state, "HEART_BROKEN", {"target_player_id": target_player_id, "target_char_index": target_char_index, "damage": damage, "shield": target_char.shield})
-                break
+    # Damage is compared against the topmost Heart only
+    stack = stack_summary(target_char)
+    i = stack.nearest_heart()
+    heart_found = i >= 0
+    if heart_found and damage >= (target_char.stack[i].rank + target_char.shield):
+        for _ in range(len(target_char.stack) - i):
+            state.discard_pile.append(stack.pop())
+        state.cards_removed_this_turn = True
+        track(state, target_player)
+        log_event(state, "HEART_BROKEN", {"target_player_id": target_player_id, "target_char_index": target_char_index, "damage": damage, "shield": target_char.shield})
     
     # If no Heart Card was found to absorb damage, the character dies (if damage >= 1)
     if not heart_found and damage >= 1:
@@ -563,6 +581,7 @@ def attack_heart(state: GameState, player_id: str, target_player_id: str, target
         if not target_player.characters:
             target_player.is_alive = False
             log_event(state, "PLAYER_DEAD", {"player_id": target_player_id, "reason": "HEART_OVERWHELM"})
+        track(state, target_player)
 
 def end_turn(state: GameState):
     player = get_current_player(state)
@@ -584,8 +603,11 @@ def end_turn(state: GameState):
     state.action_taken_this_turn = False
     state.cards_removed_this_turn = False
     state.character_tapped_this_turn = False
+    # Dug cards and a gravedig pool nobody resolved go back to the discard pile
+    state.discard_pile.extend(state.dug_cards)
     state.dug_cards = []
     state.active_character_index = None
+    state.discard_pile.extend(state.gravedig_pool)
     state.gravedig_pool = []
     state.free_buys_remaining = 0
     
@@ -642,37 +664,15 @@ def check_win_condition(state: GameState):
             log_event(state, "GAME_OVER", {"winner_id": "DRAW"})
 
 def can_player_act(state: GameState, player_id: str) -> bool:
-    """Every turn you must either discard a card, tap a hero power, or face-strike."""
+    """
+    Every turn you must either discard a card, tap a hero power, or face-strike.
+    A face can strike once it is exposed, and a legal target is an opposing face that
+    is exposed or whose top Heart 1 damage would break; see exposure.py.
+    """
     player = next((p for p in state.players if p.id == player_id), None)
     if not player or not player.is_alive or not player.characters:
         return False
-    
-    for char in player.characters:
-        # Can discard? (Has any cards in stack)
-        if char.stack:
-            return True
-        # Can tap hero power?
-        if not char.is_tapped:
-            return True
-        # Can face-strike that kills?
-        # A face card can strike if it has NO cards on top.
-        # It must kill at least one opposing card.
-        if not char.stack:
-            for other_player in state.players:
-                if other_player.id == player_id or not other_player.is_alive:
-                    continue
-                for other_char_idx, other_char in enumerate(other_player.characters):
-                    # If target is an exposed face (no cards on top), it's a legal strike target.
-                    # It will either die or be forced to tap for shield.
-                    if not other_char.stack:
-                        return True
-                    
-                    # If it has hearts, check if 1 damage would kill it.
-                    top_card = other_char.stack[-1]
-                    if top_card.suit == Suit.HEARTS and (1 >= (top_card.rank + other_char.shield)):
-                        return True
-                        
-    return False
+    return exposure(state).can_act(player_id)
 
 def apply_fatigue(state: GameState, player_id: str, end_turn_after: bool = False):
     """Discard one of your own face cards — that character dies."""
@@ -693,6 +693,7 @@ def apply_fatigue(state: GameState, player_id: str, end_turn_after: bool = False
         if not player.characters:
             player.is_alive = False
             log_event(state, "PLAYER_DEAD", {"player_id": player_id, "reason": "FATIGUE"})
+        track(state, player)
     
     # After fatigue, check win condition
     check_win_condition(state)
@@ -719,7 +720,7 @@ def transition_to_phase_2(state: GameState):
     
     # Initialize Shop Row
     state.shop_row = []
-    for _ in range(3):
+    for _ in range(state.shop_size):
         if state.shop_pile:
             state.shop_row.append(state.shop_pile.pop())
             
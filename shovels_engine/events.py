@@ -0,0 +1,238 @@
+"""
+Game-event streaming. log_event hands every event to the EventBus attached to the
+state (if any), which fans it out to sinks: memory, JSONL, SQLite, an asyncio
+queue, or any of those behind a background writer thread.
+
+Published records are the event dict plus a "game_id" key. A bus can serve many
+games at once, and with retain=False events are streamed without also being kept
+in state.events.
+
+asyncio and sqlite3 are imported by the sinks that need them, so simulation
+workers that only use memory or JSONL sinks don't load them.
+"""
+import json
+import queue
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+from .models import GameState
+
+Event = Dict[str, Any]
+
+def _dumps(record: Event) -> str:
+    # Suit is a str enum, so the default encoder writes its value
+    return json.dumps(record, separators=(",", ":"))
+
+class EventSink:
+    def write(self, record: Event):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+class MemorySink(EventSink):
+    """Keeps records in memory; maxlen bounds it to the most recent ones."""
+    def __init__(self, maxlen: Optional[int] = None):
+        self.records: Deque[Event] = deque(maxlen=maxlen)
+
+    def write(self, record: Event):
+        self.records.append(record)
+
+class _BatchedSink(EventSink):
+    """Buffers records and writes them batch_size at a time (and on flush/close)."""
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.buffer: List[Event] = []
+
+    def write(self, record: Event):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Event]):
+        raise NotImplementedError
+
+class JsonlSink(_BatchedSink):
+    """One JSON object per line, appended to path."""
+    def __init__(self, path: str, batch_size: int = 1000):
+        super().__init__(batch_size)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _write_batch(self, batch: List[Event]):
+        self.file.write("".join(_dumps(r) + "\n" for r in batch))
+
+    def flush(self):
+        super().flush()
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+class SqliteSink(_BatchedSink):
+    """
+    Rows of (game_id, turn_count, phase, subphase, event_type, player_id, data JSON)
+    in `table`, inserted one transaction per batch.
+    """
+    COLUMNS = ("game_id", "turn_count", "phase", "subphase", "event_type", "player_id", "data")
+
+    def __init__(self, path: str, batch_size: int = 5000, table: str = "events"):
+        super().__init__(batch_size)
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.table = table
+        import sqlite3
+
+        # The writer may run on a BackgroundSink thread rather than the creating one
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, game_id TEXT, turn_count INTEGER, "
+            "phase INTEGER, subphase TEXT, event_type TEXT, player_id TEXT, data TEXT)"
+        )
+        self.conn.commit()
+
+    def _write_batch(self, batch: List[Event]):
+        rows = [
+            (r.get("game_id"), r["turn_count"], r["phase"], r["subphase"], r["event_type"], r["player_id"],
+             _dumps(r["data"]))
+            for r in batch
+        ]
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {self.table} ({', '.join(self.COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def close(self):
+        super().close()
+        self.conn.close()
+
+class AsyncQueueSink(EventSink):
+    """
+    Feeds an asyncio.Queue for consumers on the event loop (spectators, live analytics).
+    write() must be called on the loop's thread and never blocks it: when the queue
+    is full the oldest record is dropped and counted in `dropped`.
+    """
+    def __init__(self, maxsize: int = 10000):
+        import asyncio
+
+        self.queue: "asyncio.Queue" = asyncio.Queue(maxsize)
+        self._full = asyncio.QueueFull
+        self.dropped = 0
+
+    def write(self, record: Event):
+        try:
+            self.queue.put_nowait(record)
+        except self._full:
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(record)
+
+class BackgroundSink(EventSink):
+    """
+    Runs another sink on a writer thread behind a bounded queue. When the writer
+    falls behind, write() blocks (block=True, backpressure on the producer) or
+    drops the record and counts it in `dropped`.
+    """
+    _STOP = object()
+
+    def __init__(self, sink: EventSink, max_pending: int = 100000, block: bool = True):
+        self.sink = sink
+        self.block = block
+        self.dropped = 0
+        self.pending: "queue.Queue[Any]" = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is self._STOP:
+                self.sink.close()
+                return
+            if isinstance(item, threading.Event):
+                self.sink.flush()
+                item.set()
+                continue
+            self.sink.write(item)
+
+    def write(self, record: Event):
+        if self.block:
+            self.pending.put(record)
+            return
+        try:
+            self.pending.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Waits until everything queued so far has been written and flushed."""
+        done = threading.Event()
+        self.pending.put(done)
+        done.wait()
+
+    def close(self):
+        self.pending.put(self._STOP)
+        self.thread.join()
+
+class EventBus:
+    """Fans published events out to its sinks."""
+    def __init__(self, sinks: Iterable[EventSink] = (), retain: bool = True):
+        self.sinks: List[EventSink] = list(sinks)
+        # Whether attached states also keep their events in state.events
+        self.retain = retain
+
+    def subscribe(self, sink: EventSink) -> EventSink:
+        self.sinks.append(sink)
+        return sink
+
+    def unsubscribe(self, sink: EventSink):
+        self.sinks.remove(sink)
+
+    def publish(self, record: Event):
+        for sink in self.sinks:
+            sink.write(record)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+class _Channel:
+    __slots__ = ("bus", "game_id")
+
+    def __init__(self, bus: EventBus, game_id: Optional[str]):
+        self.bus = bus
+        self.game_id = game_id
+
+def attach_bus(state: GameState, bus: Optional[EventBus], game_id: Optional[str] = None):
+    """
+    Streams the state's events to bus, tagged with game_id; None detaches.
+    Copies made with clone_state (search, rollouts) are never attached.
+    """
+    state._event_channel = _Channel(bus, game_id) if bus is not None else None
+
+def publish(state: GameState, event: Event):
+    """Called by log_event: stores the event on the state and/or sends it to the bus."""
+    channel = state._event_channel
+    if channel is None:
+        state.events.append(event)
+        return
+    if channel.bus.retain:
+        state.events.append(event)
+    channel.bus.publish({**event, "game_id": channel.game_id})
+
+def read_jsonl(path: str) -> Iterable[Event]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
@@ -0,0 +1,81 @@
+from typing import Dict, Optional
+from .models import GameState, Character, Player, Suit
+
+def is_vulnerable(char: Character) -> bool:
+    """A legal face-strike target: exposed, or a top Heart that 1 damage would break."""
+    if not char.stack:
+        return True
+    top = char.stack[-1]
+    return top.suit == Suit.HEARTS and top.rank + char.shield <= 1
+
+class PlayerExposure:
+    """Counts over one player's characters."""
+    __slots__ = ("stacked", "untapped", "vulnerable")
+
+    def __init__(self, player: Player):
+        self.stacked = self.untapped = self.vulnerable = 0
+        if not player.is_alive:
+            return
+        for char in player.characters:
+            self.stacked += bool(char.stack)
+            self.untapped += not char.is_tapped
+            self.vulnerable += is_vulnerable(char)
+
+class ExposureSummary:
+    """
+    Per-game exposure counts kept in step with the state: the engine calls
+    update(player) after it changes a player's stacks, taps, shields or characters.
+    Cheap enough for the fatigue check on every turn, and readable by agents.
+    """
+    __slots__ = ("players", "vulnerable_total")
+
+    def __init__(self, state: GameState):
+        self.players: Dict[str, PlayerExposure] = {p.id: PlayerExposure(p) for p in state.players}
+        self.vulnerable_total = sum(e.vulnerable for e in self.players.values())
+
+    def update(self, player: Player):
+        old = self.players.get(player.id)
+        new = PlayerExposure(player)
+        self.players[player.id] = new
+        self.vulnerable_total += new.vulnerable - (old.vulnerable if old else 0)
+
+    def opponent_targets(self, player_id: str) -> int:
+        """Strikeable characters belonging to everyone but player_id."""
+        own = self.players.get(player_id)
+        return self.vulnerable_total - (own.vulnerable if own else 0)
+
+    def can_act(self, player_id: str) -> bool:
+        """Discard from a stack, tap an untapped face, or strike an opponent."""
+        own = self.players.get(player_id)
+        if own is None:
+            return False
+        return bool(own.stacked or own.untapped or self.opponent_targets(player_id))
+
+    def copy(self) -> "ExposureSummary":
+        clone = ExposureSummary.__new__(ExposureSummary)
+        clone.players = dict(self.players)  # PlayerExposure is replaced, never mutated
+        clone.vulnerable_total = self.vulnerable_total
+        return clone
+
+def exposure(state: GameState) -> ExposureSummary:
+    """The state's summary, built on first use."""
+    summary = state._exposure
+    if summary is None:
+        summary = state._exposure = ExposureSummary(state)
+    return summary
+
+def track(state: GameState, player: Player):
+    """Engine hook: player's characters changed. A no-op until the summary is first used."""
+    summary = state._exposure
+    if summary is not None:
+        summary.update(player)
+
+def invalidate_exposure(state: GameState, player: Optional[Player] = None):
+    """
+    For code that edits characters directly rather than through the engine (tests,
+    tools): refreshes player's counts, or drops the summary so it is rebuilt.
+    """
+    if player is not None:
+        track(state, player)
+    else:
+        state._exposure = None
@@ -0,0 +1,233 @@
+import math
+import random
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Hashable, List, Optional, Tuple
+from .models import GameState, clone_state
+from .engine import get_current_player
+from .actions import Action, action_key, apply_action, legal_actions
+from .agents import Agent, RandomAgent
+
+class _Node:
+    """
+    A node of a single-observer information-set search tree.
+    Children are keyed by action; a node is shared by every determinization
+    in which that action sequence is legal.
+    """
+    __slots__ = ("parent", "action", "mover", "children", "visits", "avail", "reward")
+
+    def __init__(self, parent: Optional["_Node"] = None, action: Optional[Action] = None, mover: Optional[str] = None):
+        self.parent = parent
+        self.action = action
+        self.mover = mover  # player who made `action`
+        self.children: Dict[Hashable, "_Node"] = {}
+        self.visits = 0
+        self.avail = 1
+        self.reward = 0.0
+
+    def ucb(self, exploration: float) -> float:
+        return self.reward / self.visits + exploration * math.sqrt(math.log(self.avail) / self.visits)
+
+def determinize(state: GameState, observer_id: str, rng: random.Random) -> GameState:
+    """
+    Returns a copy of state with everything observer_id can't see resampled:
+    opponents' hands, the deck and the shop pile are pooled, shuffled and dealt
+    back out in the same sizes. Shuffles the engine makes on the copy also use rng.
+    """
+    det = clone_state(state)
+    det._rng = rng
+    others = [p for p in det.players if p.id != observer_id]
+    unseen = [c for p in others for c in p.hand] + det.deck + det.shop_pile
+    rng.shuffle(unseen)
+
+    pos = 0
+    for p in others:
+        n = len(p.hand)
+        p.hand = unseen[pos:pos + n]
+        pos += n
+    det.deck = unseen[pos:pos + len(det.deck)]
+    pos += len(det.deck)
+    det.shop_pile = unseen[pos:]
+    return det
+
+class MCTSAgent(Agent):
+    """
+    Information-set Monte Carlo tree search (SO-ISMCTS).
+
+    Each iteration samples a determinization of the hidden cards, walks the shared
+    tree with availability-weighted UCB, expands one action and finishes the game
+    with rollout_policy. The move with the most visits is played.
+
+    Budget: stops after `iterations` or `time_limit` seconds, whichever comes first
+    (defaults to 200 iterations when neither is given).
+    Tree reuse: when the agent acts again within the same turn (DRAW -> DISCARD -> PLAY,
+    shopping, digging) the subtree under the previous move becomes the new root.
+    Parallelism: workers > 1 runs extra root-parallel searches in a process pool
+    and merges their root visit counts with the local (reused) tree. The pool is
+    started on first use; close() (or leaving a `with` block) shuts it down, and
+    it is shut down anyway when the agent is garbage collected.
+    """
+    def __init__(self, iterations: Optional[int] = None, time_limit: Optional[float] = None,
+                 exploration: float = 0.7, rollout_policy: Optional[Agent] = None,
+                 max_rollout_steps: int = 500, workers: int = 1, reuse_tree: bool = True,
+                 seed: Optional[int] = None):
+        if iterations is None and time_limit is None:
+            iterations = 200
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        # The default rollouts draw from self.rng so a seeded agent searches reproducibly
+        self._own_rollouts = rollout_policy is None
+        self.rollout_policy = rollout_policy or RandomAgent(self.rng)
+        self.max_rollout_steps = max_rollout_steps
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self._executor: Optional[Executor] = None
+        self._finalizer: Optional[weakref.finalize] = None
+        # player_id -> (turn_count, subtree to resume from)
+        self._reusable: Dict[str, Tuple[int, _Node]] = {}
+
+    def act(self, state: GameState, player_id: str):
+        action = self.choose_action(state, player_id)
+        apply_action(state, player_id, *action)
+
+    def choose_action(self, state: GameState, player_id: str) -> Action:
+        actions = legal_actions(state, player_id)
+        if len(actions) == 1:
+            self._reusable.pop(player_id, None)
+            return actions[0]
+
+        root = self._take_root(state, player_id)
+        futures = []
+        if self.workers > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+                self._finalizer = weakref.finalize(self, self._executor.shutdown)
+            # Workers get a bare copy: no events, and no event channel, recorder or rng
+            # (open files and sockets there don't pickle)
+            snapshot = clone_state(state)
+            futures = [
+                self._executor.submit(_search_worker, snapshot, player_id, self._worker_config(), self.rng.getrandbits(32))
+                for _ in range(self.workers - 1)
+            ]
+
+        self._search(root, state, player_id)
+
+        visits: Dict[Hashable, int] = {}
+        for key, child in root.children.items():
+            visits[key] = child.visits
+        for f in futures:
+            for key, n in f.result().items():
+                visits[key] = visits.get(key, 0) + n
+
+        legal = {action_key(a): a for a in actions}
+        best_key = max((k for k in visits if k in legal), key=lambda k: visits[k], default=None)
+        if best_key is None:
+            best_key = action_key(self.rng.choice(actions))
+
+        if self.reuse_tree and best_key in root.children:
+            subtree = root.children[best_key]
+            subtree.parent = None
+            self._reusable[player_id] = (state.turn_count, subtree)
+        else:
+            self._reusable.pop(player_id, None)
+        return legal[best_key]
+
+    def close(self):
+        if self._finalizer is not None:
+            self._finalizer()
+            self._executor = self._finalizer = None
+
+    def _take_root(self, state: GameState, player_id: str) -> _Node:
+        entry = self._reusable.pop(player_id, None)
+        if self.reuse_tree and entry is not None and entry[0] == state.turn_count:
+            return entry[1]
+        return _Node()
+
+    def _worker_config(self) -> Dict:
+        return {
+            "iterations": max(1, self.iterations // self.workers) if self.iterations else None,
+            "time_limit": self.time_limit,
+            "exploration": self.exploration,
+            # Workers build their own default rollouts around their own seed
+            "rollout_policy": None if self._own_rollouts else self.rollout_policy,
+            "max_rollout_steps": self.max_rollout_steps,
+        }
+
+    def _search(self, root: _Node, state: GameState, player_id: str):
+        iterations = self.iterations
+        if iterations and self.workers > 1:
+            iterations = max(1, iterations // self.workers)
+        deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+
+        done = 0
+        while True:
+            if iterations is not None and done >= iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._iterate(root, determinize(state, player_id, self.rng))
+            done += 1
+
+    def _iterate(self, root: _Node, det: GameState):
+        node = root
+        # Selection / expansion
+        while not det.is_over:
+            mover = get_current_player(det).id
+            actions = legal_actions(det, mover)
+            keyed = [(action_key(a), a) for a in actions]
+            untried = [(k, a) for k, a in keyed if k not in node.children]
+            if untried:
+                key, action = self.rng.choice(untried)
+                child = _Node(node, action, mover)
+                node.children[key] = child
+                node = child
+                self._apply(det, mover, action)
+                break
+
+            available = [node.children[k] for k, _ in keyed]
+            for child in available:
+                child.avail += 1
+            node = max(available, key=lambda c: c.ucb(self.exploration))
+            self._apply(det, mover, node.action)
+
+        # Rollout
+        steps = 0
+        while not det.is_over and steps < self.max_rollout_steps:
+            self.rollout_policy.act(det, get_current_player(det).id)
+            steps += 1
+
+        # Backpropagation
+        alive = [p.id for p in det.players if p.is_alive]
+        while node is not None:
+            node.visits += 1
+            if node.mover is not None:
+                node.reward += _reward(det, alive, node.mover)
+            node = node.parent
+
+    @staticmethod
+    def _apply(det: GameState, mover: str, action: Action):
+        try:
+            apply_action(det, mover, *action)
+        except Exception:
+            # Determinized states are throwaway copies; treat a rejected move as a pass
+            try:
+                apply_action(det, mover, "end")
+            except Exception:
+                pass
+
+def _reward(state: GameState, alive: List[str], player_id: str) -> float:
+    if state.is_over:
+        return 1.0 if state.winner_id == player_id else 0.0
+    # Rollout ran out of steps: split the win between the survivors
+    return 1.0 / len(alive) if player_id in alive else 0.0
+
+def _search_worker(state: GameState, player_id: str, config: Dict, seed: int) -> Dict[Hashable, int]:
+    """Process-pool entry point: runs an independent search and returns root visit counts."""
+    random.seed(seed)
+    agent = MCTSAgent(reuse_tree=False, seed=seed, **config)
+    root = _Node()
+    agent._search(root, state, player_id)
+    return {key: child.visits for key, child in root.children.items()}
@@ -1,8 +1,15 @@
+"""
+The game's data: plain slotted dataclasses, so engine writes are ordinary
+attribute sets. Nothing here validates; untrusted input goes through the
+backend's pydantic schemas (shovels_backend.state_schemas) before it becomes
+a GameState. to_dict()/from_dict() convert to and from JSON-ready data.
+"""
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional, Union, Dict
-from pydantic import BaseModel, Field
+from typing import Any, Collection, List, Optional, Sequence, Union, Dict
 import random
 import uuid
+from .rules import RuleSet, STANDARD_RULES
 
 class Suit(str, Enum):
     CLUBS = "CLUBS"
@@ -10,8 +17,13 @@ class Suit(str, Enum):
     HEARTS = "HEARTS"
     SPADES = "SPADES"
 
-class Card(BaseModel):
-    uid: str = Field(default_factory=lambda: uuid.uuid4().hex)
+def _new_uid() -> str:
+    return uuid.uuid4().hex
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Card:
+    # Immutable: the standard 104 are interned (see CARD_POOL) and shared by every game
+    uid: str = field(default_factory=_new_uid)
     rank: int  # 2-10
     suit: Suit
     is_face: bool = False
@@ -20,51 +32,167 @@ class Card(BaseModel):
 
     @property
     def price(self) -> int:
-        if self.is_face:
-            return {"J": 3, "Q": 4, "K": 5}[self.face_rank]
-        return 10 if self.is_ace else self.rank
+        """Price under the standard rules; the engine uses state.rules for variants."""
+        return STANDARD_RULES.compiled().price(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"uid": self.uid, "rank": self.rank, "suit": self.suit, "is_face": self.is_face,
+                "face_rank": self.face_rank, "is_ace": self.is_ace}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Card":
+        """The interned pool card when `data` describes one, else a new card."""
+        card = cls(uid=data.get("uid") or _new_uid(), rank=data["rank"], suit=Suit(data["suit"]),
+                   is_face=data.get("is_face", False), face_rank=data.get("face_rank"),
+                   is_ace=data.get("is_ace", False))
+        pooled = CARDS_BY_UID.get(card.uid)
+        return pooled if pooled == card else card
+
+def _cards(cards: Sequence[Card]) -> List[Dict[str, Any]]:
+    return [c.to_dict() for c in cards]
 
-class Character(BaseModel):
-    uid: str = Field(default_factory=lambda: uuid.uuid4().hex)
+def _cards_from(data: Sequence[Dict[str, Any]]) -> List[Card]:
+    return [Card.from_dict(c) for c in data]
+
+@dataclass(slots=True, kw_only=True)
+class Character:
+    uid: str = field(default_factory=_new_uid)
     rank: str  # J, Q, K
     suit: Suit
-    stack: List[Card] = Field(default_factory=list)
+    stack: List[Card] = field(default_factory=list)
     is_tapped: bool = False
     shield: int = 0
 
-class Player(BaseModel):
+    # stacks.StackSummary over `stack`; not serialized
+    _stack_summary: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"uid": self.uid, "rank": self.rank, "suit": self.suit, "stack": _cards(self.stack),
+                "is_tapped": self.is_tapped, "shield": self.shield}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Character":
+        return cls(uid=data.get("uid") or _new_uid(), rank=data["rank"], suit=Suit(data["suit"]),
+                   stack=_cards_from(data.get("stack", ())), is_tapped=data.get("is_tapped", False),
+                   shield=data.get("shield", 0))
+
+@dataclass(slots=True, kw_only=True)
+class Player:
     id: str
     name: str
-    characters: List[Character] = Field(default_factory=list)
-    hand: List[Card] = Field(default_factory=list)
+    characters: List[Character] = field(default_factory=list)
+    hand: List[Card] = field(default_factory=list)
     coins: int = 0
     can_discard_second_face: bool = False
     is_alive: bool = True
 
-class GameState(BaseModel):
-    deck: List[Card] = Field(default_factory=list)
-    shop_pile: List[Card] = Field(default_factory=list)
-    shop_row: List[Card] = Field(default_factory=list)
-    discard_pile: List[Card] = Field(default_factory=list)
-    players: List[Player] = Field(default_factory=list)
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "characters": [c.to_dict() for c in self.characters],
+                "hand": _cards(self.hand), "coins": self.coins,
+                "can_discard_second_face": self.can_discard_second_face, "is_alive": self.is_alive}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Player":
+        return cls(id=data["id"], name=data["name"],
+                   characters=[Character.from_dict(c) for c in data.get("characters", ())],
+                   hand=_cards_from(data.get("hand", ())), coins=data.get("coins", 0),
+                   can_discard_second_face=data.get("can_discard_second_face", False),
+                   is_alive=data.get("is_alive", True))
+
+def _standard_rules() -> RuleSet:
+    return STANDARD_RULES
+
+@dataclass(slots=True, kw_only=True)
+class GameState:
+    deck: List[Card] = field(default_factory=list)
+    shop_pile: List[Card] = field(default_factory=list)
+    shop_row: List[Optional[Card]] = field(default_factory=list)  # None marks a bought-out slot
+    discard_pile: List[Card] = field(default_factory=list)
+    players: List[Player] = field(default_factory=list)
     current_turn_index: int = 0
     turn_count: int = 0
     phase: int = 1
     turn_subphase: str = "DRAW"  # DRAW, DISCARD, PLAY, BATTLE_ACTION
     max_characters: int = 3
+    shop_size: int = 3
+    rules: RuleSet = field(default_factory=_standard_rules)
     action_taken_this_turn: bool = False
     cards_removed_this_turn: bool = False
     character_tapped_this_turn: bool = False
-    dug_cards: List[Card] = Field(default_factory=list)
+    dug_cards: List[Card] = field(default_factory=list)
     active_character_index: Optional[int] = None
-    gravedig_pool: List[Card] = Field(default_factory=list)
+    gravedig_pool: List[Card] = field(default_factory=list)
     free_buys_remaining: int = 0
-    events: List[Dict] = Field(default_factory=list)
+    events: List[Dict] = field(default_factory=list)
     winner_id: Optional[str] = None
     is_over: bool = False
 
-def initialize_full_pool() -> List[Card]:
-    """Creates the full 104-card pool (2 standard 52-card decks)."""
+    # exposure.ExposureSummary, maintained by the engine; not serialized
+    _exposure: Any = field(default=None, init=False, repr=False, compare=False)
+    # events._Channel when events are streamed to an EventBus (see events.attach_bus)
+    _event_channel: Any = field(default=None, init=False, repr=False, compare=False)
+    # In-game shuffles draw from this (any object with shuffle()) instead of the
+    # global random module when set, and a records.GameRecorder sees every
+    # applied action (see records.GameRecorder.attach)
+    _rng: Any = field(default=None, init=False, repr=False, compare=False)
+    _recorder: Any = field(default=None, init=False, repr=False, compare=False)
+    # Actions actions.apply_action has applied to this object (a cheap "did that move
+    # go through" check for callers whose agents swallow rejected moves)
+    _applied: int = field(default=0, init=False, repr=False, compare=False)
+
+    def to_dict(self, exclude: Collection[str] = ()) -> Dict[str, Any]:
+        """
+        The state as plain data, without the engine's private caches. Suits stay
+        Suit members, which json.dumps writes as their names. `exclude` leaves out
+        top-level fields (they aren't converted at all). The events list is copied
+        but shares the logged dicts, which are never changed once logged.
+        """
+        data = {}
+        for name in _STATE_FIELDS:
+            if name in exclude:
+                continue
+            value = getattr(self, name)
+            if name in _CARD_LIST_FIELDS:
+                value = _cards(value)
+            elif name == "shop_row":
+                value = [c.to_dict() if c is not None else None for c in value]
+            elif name == "players":
+                value = [p.to_dict() for p in value]
+            elif name == "rules":
+                value = value.to_dict()
+            elif name == "events":
+                value = value[:]
+            data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameState":
+        """
+        The inverse of to_dict(), also accepting its JSON form. Missing fields take
+        their defaults and unknown keys are ignored; nothing else is checked.
+        """
+        values: Dict[str, Any] = {}
+        for name in _STATE_FIELDS:
+            if name not in data:
+                continue
+            value = data[name]
+            if name in _CARD_LIST_FIELDS:
+                value = _cards_from(value)
+            elif name == "shop_row":
+                value = [Card.from_dict(c) if c is not None else None for c in value]
+            elif name == "players":
+                value = [Player.from_dict(p) for p in value]
+            elif name == "rules":
+                value = value if isinstance(value, RuleSet) else RuleSet.from_dict(value)
+            elif name == "events":
+                value = list(value)
+            values[name] = value
+        return cls(**values)
+
+_STATE_FIELDS = [name for name in GameState.__dataclass_fields__ if not name.startswith("_")]
+_CARD_LIST_FIELDS = frozenset({"deck", "shop_pile", "discard_pile", "dug_cards", "gravedig_pool"})
+
+def _build_pool() -> List[Card]:
     pool = []
     card_id = 0
     for _ in range(2):
@@ -82,38 +210,125 @@ def initialize_full_pool() -> List[Card]:
                 card_id += 1
     return pool
 
-def setup_game(player_ids: List[str], player_names: Optional[Dict[str, str]] = None) -> GameState:
-    """Initializes a new game according to the rules."""
-    pool = initialize_full_pool()
-    random.shuffle(pool)
-    
-    # Extract all face cards for character dealing
-    face_cards = [c for c in pool if c.is_face]
-    remaining_deck = [c for c in pool if not c.is_face]
-    
-    random.shuffle(face_cards)
-    
+# The card universe is fixed, so each card is created once per process and games
+# reference these instances. CARDS_BY_UID maps a card (or character) uid back to it.
+CARD_POOL = tuple(_build_pool())
+CARDS_BY_UID: Dict[str, Card] = {c.uid: c for c in CARD_POOL}
+_FACE_IDS = [i for i, c in enumerate(CARD_POOL) if c.is_face]
+_NUMBER_IDS = [i for i, c in enumerate(CARD_POOL) if not c.is_face]
+
+def initialize_full_pool() -> List[Card]:
+    """The full 104-card pool (2 standard 52-card decks), as a new list of the interned cards."""
+    return list(CARD_POOL)
+
+def face_card(char: Character) -> Card:
+    """The face card a character is showing, e.g. to discard it when it is replaced."""
+    card = CARDS_BY_UID.get(char.uid)
+    if card is not None and card.face_rank == char.rank and card.suit == char.suit:
+        return card
+    # Hand-built characters don't come from the pool
+    return Card(uid=char.uid, rank=0, suit=char.suit, is_face=True, face_rank=char.rank)
+
+def setup_game(player_ids: List[str], player_names: Optional[Dict[str, str]] = None, rules: Optional[RuleSet] = None) -> GameState:
+    """Initializes a new game according to the rules (standard rules unless given)."""
+    rules = rules or STANDARD_RULES
+    # Deal face-down characters from a random draw of the faces
+    dealt = len(player_ids) * rules.starting_characters
+    faces = random.sample(_FACE_IDS, len(_FACE_IDS))
+    # Undealt faces go back into the deck, which is one permutation of card ids;
+    # the shop pile comes off its top
+    deck_ids = _NUMBER_IDS + faces[dealt:]
+    random.shuffle(deck_ids)
+    return game_from_deal(player_ids, faces[:dealt] + deck_ids, player_names, rules)
+
+def game_from_deal(player_ids: List[str], deal: Sequence[int], player_names: Optional[Dict[str, str]] = None,
+                   rules: Optional[RuleSet] = None) -> GameState:
+    """
+    The game setup_game deals, from its permutation of CARD_POOL ids: each
+    player's starting characters in seat order, then the deck with the shop
+    pile on top. Raises ValueError if `deal` isn't such a permutation or the
+    rules can't be dealt to this many players.
+    """
+    rules = rules or STANDARD_RULES
+    dealt = len(player_ids) * rules.starting_characters
+    if dealt > len(_FACE_IDS):
+        raise ValueError(f"{len(player_ids)} players can't each start with {rules.starting_characters} "
+                         f"characters: there are only {len(_FACE_IDS)} face cards")
+    if dealt + rules.shop_pile_size > len(CARD_POOL):
+        raise ValueError(f"A shop pile of {rules.shop_pile_size} doesn't fit in the {len(CARD_POOL) - dealt} "
+                         "cards left after dealing")
+    if sorted(deal) != list(range(len(CARD_POOL))):
+        raise ValueError(f"A deal must be a permutation of the {len(CARD_POOL)} card ids")
+    if not all(CARD_POOL[card_id].is_face for card_id in deal[:dealt]):
+        raise ValueError("Starting characters must be dealt face cards")
     players = []
-    for pid in player_ids:
-        # Deal 3 face-down characters
+    for i, pid in enumerate(player_ids):
         p_chars = []
-        for _ in range(3):
-            fc = face_cards.pop()
+        for card_id in deal[i * rules.starting_characters:(i + 1) * rules.starting_characters]:
+            fc = CARD_POOL[card_id]
             p_chars.append(Character(uid=fc.uid, rank=fc.face_rank, suit=fc.suit))
         
         # Use real name if provided, else fallback to generic ID-based name
         p_name = player_names.get(pid, f"Player {pid}") if player_names else f"Player {pid}"
         players.append(Player(id=pid, name=p_name, characters=p_chars))
     
-    # Return remaining face cards to deck
-    remaining_deck.extend(face_cards)
-    random.shuffle(remaining_deck)
-    
-    # Create Shop Pile (20 cards)
-    shop_pile = [remaining_deck.pop() for _ in range(20)]
-    
+    split = len(deal) - rules.shop_pile_size
     return GameState(
-        deck=remaining_deck,
-        shop_pile=shop_pile,
-        players=players
+        deck=[CARD_POOL[i] for i in deal[dealt:split]],
+        shop_pile=[CARD_POOL[i] for i in deal[split:]],
+        players=players,
+        max_characters=rules.max_characters,
+        shop_size=rules.shop_size,
+        rules=rules
+    )
+
+def _clone_character(char: Character) -> Character:
+    stack = char.stack[:]
+    clone = Character(uid=char.uid, rank=char.rank, suit=char.suit, stack=stack, is_tapped=char.is_tapped,
+                      shield=char.shield)
+    summary = char._stack_summary
+    if summary is not None and summary.is_current(char.stack):
+        clone._stack_summary = summary.copy(stack)
+    return clone
+
+def clone_state(state: GameState, keep_events: bool = False) -> GameState:
+    """
+    Cheap copy for search and simulation. The engine never mutates a Card, so cards
+    are shared; every list, Player and Character is copied. Events are dropped unless
+    keep_events is set.
+    """
+    players = [
+        Player(id=p.id, name=p.name, characters=[_clone_character(c) for c in p.characters], hand=p.hand[:],
+               coins=p.coins, can_discard_second_face=p.can_discard_second_face, is_alive=p.is_alive)
+        for p in state.players
+    ]
+    clone = GameState(
+        deck=state.deck[:],
+        shop_pile=state.shop_pile[:],
+        shop_row=state.shop_row[:],
+        discard_pile=state.discard_pile[:],
+        players=players,
+        current_turn_index=state.current_turn_index,
+        turn_count=state.turn_count,
+        phase=state.phase,
+        turn_subphase=state.turn_subphase,
+        max_characters=state.max_characters,
+        shop_size=state.shop_size,
+        rules=state.rules,
+        action_taken_this_turn=state.action_taken_this_turn,
+        cards_removed_this_turn=state.cards_removed_this_turn,
+        character_tapped_this_turn=state.character_tapped_this_turn,
+        dug_cards=state.dug_cards[:],
+        active_character_index=state.active_character_index,
+        gravedig_pool=state.gravedig_pool[:],
+        free_buys_remaining=state.free_buys_remaining,
+        events=state.events[:] if keep_events else [],
+        winner_id=state.winner_id,
+        is_over=state.is_over,
     )
+    summary = state._exposure
+    clone._exposure = summary.copy() if summary is not None else None
+    # The event channel, recorder and shuffle RNG stay unset: hypothetical futures
+    # must not reach the game's event stream or record, and they shuffle with the
+    # global RNG so they can't advance the game's own
+    return clone
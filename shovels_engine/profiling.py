@@ -0,0 +1,192 @@
+"""
+Opt-in per-function timing for the engine.
+
+EngineProfiler swaps the functions of the chosen modules (engine by default)
+for timing wrappers while it is enabled, and puts the originals back when it
+is disabled. Nothing is wrapped otherwise, so an unprofiled engine pays nothing.
+References elsewhere in shovels_engine (from-imports, ACTION_HANDLERS) are
+patched too, so calls through actions and agents are counted.
+
+    with EngineProfiler() as profiler:
+        play_game(agents, seed=1)
+    print(profiler.report())
+    profiler.write_folded("engine.folded")  # flamegraph.pl / speedscope input
+
+Timings are inclusive (total) and exclusive of profiled callees (self). Folded
+stacks hold self time in microseconds, keyed by the chain of profiled callers.
+"""
+import argparse
+import importlib
+import inspect
+import math
+import sys
+import time
+from array import array
+from collections import defaultdict
+from functools import wraps
+from types import ModuleType
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from . import engine
+from .agents import closing_agents
+from .simulation import play_game
+from .tournament import AGENT_REGISTRY
+
+class FunctionStats:
+    __slots__ = ("name", "calls", "total", "self_time", "durations")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.self_time = 0.0
+        self.durations = array("d")  # inclusive seconds per call, for percentiles
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of the per-call durations, in seconds."""
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+class EngineProfiler:
+    """Counts and times calls to every function defined in `modules` while enabled."""
+    _active: Optional["EngineProfiler"] = None
+
+    def __init__(self, modules: Sequence[ModuleType] = (engine,), include: Optional[Iterable[str]] = None):
+        self.modules = tuple(modules)
+        self.include = set(include) if include is not None else None
+        self.stats: Dict[str, FunctionStats] = {}
+        self.folded: Dict[str, float] = defaultdict(float)
+        # Frames of the profiled call stack: [folded path, time spent in profiled callees]
+        self._stack: List[list] = []
+        self._patches: List[Tuple[dict, str, Callable]] = []
+
+    def _targets(self) -> Dict[Callable, str]:
+        targets = {}
+        for module in self.modules:
+            short = module.__name__.rsplit(".", 1)[-1]
+            for name, func in vars(module).items():
+                if not inspect.isfunction(func) or func.__module__ != module.__name__:
+                    continue
+                if self.include is None or name in self.include:
+                    label = name if module is engine else f"{short}.{name}"
+                    targets[func] = label
+        return targets
+
+    def _wrap(self, label: str, func: Callable) -> Callable:
+        stats = self.stats.setdefault(label, FunctionStats(label))
+        stack, folded, clock = self._stack, self.folded, time.perf_counter
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            frame = [stack[-1][0] + ";" + label if stack else label, 0.0]
+            stack.append(frame)
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - started
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                own = elapsed - frame[1]
+                stats.calls += 1
+                stats.total += elapsed
+                stats.self_time += own
+                stats.durations.append(elapsed)
+                folded[frame[0]] += own
+        return timed
+
+    def enable(self):
+        if EngineProfiler._active is not None:
+            raise ValueError("Another EngineProfiler is already enabled")
+        targets = self._targets()
+        wrappers = {func: self._wrap(label, func) for func, label in targets.items()}
+        # Patch every reference inside the package, including dicts of handlers
+        for module in [m for n, m in sys.modules.items() if n.split(".")[0] == "shovels_engine"]:
+            namespace = vars(module)
+            for name, value in list(namespace.items()):
+                if inspect.isfunction(value) and value in wrappers:
+                    self._patches.append((namespace, name, value))
+                    namespace[name] = wrappers[value]
+                elif isinstance(value, dict) and not name.startswith("__"):
+                    for key, item in list(value.items()):
+                        if inspect.isfunction(item) and item in wrappers:
+                            self._patches.append((value, key, item))
+                            value[key] = wrappers[item]
+        EngineProfiler._active = self
+
+    def disable(self):
+        for container, key, original in reversed(self._patches):
+            container[key] = original
+        self._patches.clear()
+        self._stack.clear()
+        if EngineProfiler._active is self:
+            EngineProfiler._active = None
+
+    def __enter__(self) -> "EngineProfiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def hot_paths(self, sort: str = "self") -> List[FunctionStats]:
+        key = {"self": lambda s: s.self_time, "total": lambda s: s.total, "calls": lambda s: s.calls}[sort]
+        return sorted((s for s in self.stats.values() if s.calls), key=key, reverse=True)
+
+    def report(self, top: int = 20, sort: str = "self") -> str:
+        rows = self.hot_paths(sort)[:top]
+        grand = sum(s.self_time for s in self.stats.values()) or 1.0
+        lines = [f"{'Function':<28}{'Calls':>9}{'Total ms':>11}{'Self ms':>10}{'Self %':>8}"
+                 f"{'Mean us':>10}{'p50 us':>9}{'p90 us':>9}{'p99 us':>9}"]
+        for s in rows:
+            lines.append(
+                f"{s.name:<28}{s.calls:>9}{s.total * 1e3:>11.2f}{s.self_time * 1e3:>10.2f}"
+                f"{100 * s.self_time / grand:>7.1f}%{s.total / s.calls * 1e6:>10.1f}"
+                f"{s.percentile(50) * 1e6:>9.1f}{s.percentile(90) * 1e6:>9.1f}{s.percentile(99) * 1e6:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def folded_lines(self) -> List[str]:
+        """"caller;callee self_microseconds" lines, the input format of flamegraph.pl."""
+        return [f"{path} {round(t * 1e6)}" for path, t in sorted(self.folded.items()) if round(t * 1e6) > 0]
+
+    def write_folded(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.folded_lines()) + "\n")
+
+def profile_games(games: int, players: int = 3, agent: str = "random", seed: int = 0,
+                  modules: Sequence[ModuleType] = (engine,)) -> EngineProfiler:
+    """Plays `games` seeded games with every seat taken by `agent`, under the profiler."""
+    profiler = EngineProfiler(modules)
+    with profiler:
+        for i in range(games):
+            with closing_agents({f"p{n + 1}": AGENT_REGISTRY[agent]() for n in range(players)}) as agents:
+                play_game(agents, seed=seed + i)
+    return profiler
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Profile the engine over simulated games.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--agent", default="random", choices=sorted(AGENT_REGISTRY))
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--modules", nargs="+", default=["engine"],
+                        help="shovels_engine modules to instrument, e.g. engine stacks exposure")
+    parser.add_argument("--top", type=int, default=25, help="Rows in the hot-path report")
+    parser.add_argument("--sort", default="self", choices=["self", "total", "calls"])
+    parser.add_argument("--folded", help="Write flamegraph-compatible folded stacks to this file")
+    args = parser.parse_args(argv)
+
+    modules = [importlib.import_module(f"shovels_engine.{name}") for name in args.modules]
+    started = time.perf_counter()
+    profiler = profile_games(args.games, args.players, args.agent, args.seed, modules)
+    print(f"{args.games} games in {time.perf_counter() - started:.2f}s (profiled)")
+    print(profiler.report(args.top, args.sort))
+    if args.folded:
+        profiler.write_folded(args.folded)
+        print(f"Folded stacks written to {args.folded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+"""
+Compact, versioned game records for archiving and replaying games.
+
+A record holds what it takes to replay a game exactly: a header (players,
+rules overrides, result, free-form meta), the initial deal as a permutation of
+CARD_POOL ids, the seed of the game's in-game shuffles and the applied actions.
+Optional checkpoints (compressed state snapshots every N actions) let
+state_at() start near a position instead of replaying from the first action.
+
+    with RecordWriter("games.shvr") as out:
+        out.write(record_game(agents, seed=1))
+    for record in iter_records("games.shvr"):   # memory-mapped, lazy actions
+        print(record.winner, record.action_count)
+
+File layout (format version 1); every integer is an unsigned LEB128 varint:
+    b"SHVR" <version byte>, then per record: <length> <payload>
+Payload:
+    header       <length> UTF-8 JSON
+    deal         <length> one byte per CARD_POOL id
+    actions      <count> <length> encoded actions
+    checkpoints  <count>, then per checkpoint <action index> <length> zlib(JSON)
+An action is one byte (action code << 3 | seat) and its params in a tagged
+encoding where small ints, seats, suits and the usual keys are one byte each.
+ACTION_CODES and WORDS are part of the format: only ever append to them.
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .actions import apply_action
+from .agents import closing_agents
+from .models import CARD_POOL, GameState, Suit, game_from_deal
+from .rules import RuleSet
+from .simulation import DEFAULT_MAX_STEPS, new_game, run_game
+
+MAGIC = b"SHVR"
+FORMAT_VERSION = 1
+
+ACTION_CODES = ("draw", "discard", "play", "buy", "refresh", "tap", "gravedig", "action", "strike", "end")
+WORDS = (
+    "sources", "DECK", "DISCARD", "card_index", "character_index", "slot_index", "char_index", "is_free",
+    "target_info", "targets", "target_player_id", "target_char_index", "indices", "top_n_cards",
+    "action_suit", "dug_indices",
+)
+_ACTION_IDS = {name: i for i, name in enumerate(ACTION_CODES)}
+_WORD_IDS = {word: i for i, word in enumerate(WORDS)}
+_SUITS = list(Suit)
+_SUIT_IDS = {suit.value: i for i, suit in enumerate(_SUITS)}
+_CARD_IDS = {card.uid: i for i, card in enumerate(CARD_POOL)}
+
+# Value tags. Bytes below _SMALL are the ints themselves, bytes from _WORD are WORDS
+_SMALL = 0x60
+_NONE, _FALSE, _TRUE, _INT, _NEG, _STR, _LIST, _DICT, _SEAT, _SUIT = range(_SMALL, _SMALL + 10)
+_WORD = 0x80
+
+# (player_id, action_type, params)
+RecordedAction = Tuple[str, str, Optional[Dict[str, Any]]]
+
+def _put_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _get_varint(data, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+def _put_bytes(out: bytearray, data: bytes):
+    _put_varint(out, len(data))
+    out += data
+
+def _encode_value(out: bytearray, value: Any, seats: Dict[str, int]):
+    if value is None:
+        out.append(_NONE)
+    elif value is True or value is False:
+        out.append(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        if 0 <= value < _SMALL:
+            out.append(value)
+        else:
+            out.append(_INT if value >= 0 else _NEG)
+            _put_varint(out, abs(value))
+    elif isinstance(value, str):
+        if value in seats:
+            out += bytes((_SEAT, seats[value]))
+        elif value in _SUIT_IDS:
+            out += bytes((_SUIT, _SUIT_IDS[value]))
+        elif value in _WORD_IDS:
+            out.append(_WORD + _WORD_IDS[value])
+        else:
+            out.append(_STR)
+            _put_bytes(out, value.encode())
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _put_varint(out, len(value))
+        for item in value:
+            _encode_value(out, item, seats)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _put_varint(out, len(value))
+        for key, item in value.items():
+            _encode_value(out, key, seats)
+            _encode_value(out, item, seats)
+    else:
+        raise ValueError(f"Can't record action parameter {value!r}")
+
+def _decode_value(data, pos: int, players: Sequence[str]) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag < _SMALL:
+        return tag, pos
+    if tag >= _WORD:
+        return WORDS[tag - _WORD], pos
+    if tag == _NONE:
+        return None, pos
+    if tag in (_FALSE, _TRUE):
+        return tag == _TRUE, pos
+    if tag in (_INT, _NEG):
+        n, pos = _get_varint(data, pos)
+        return (n if tag == _INT else -n), pos
+    if tag == _SEAT:
+        return players[data[pos]], pos + 1
+    if tag == _SUIT:
+        return _SUITS[data[pos]], pos + 1
+    if tag == _STR:
+        n, pos = _get_varint(data, pos)
+        return bytes(data[pos:pos + n]).decode(), pos + n
+    if tag == _LIST:
+        n, pos = _get_varint(data, pos)
+        items = []
+        for _ in range(n):
+            item, pos = _decode_value(data, pos, players)
+            items.append(item)
+        return items, pos
+    if tag == _DICT:
+        n, pos = _get_varint(data, pos)
+        result = {}
+        for _ in range(n):
+            key, pos = _decode_value(data, pos, players)
+            result[key], pos = _decode_value(data, pos, players)
+        return result, pos
+    raise ValueError(f"Unknown value tag {tag:#x} in record")
+
+def encode_action(out: bytearray, seats: Dict[str, int], player_id: str, action_type: str,
+                  params: Optional[Dict[str, Any]]):
+    code = _ACTION_IDS.get(action_type)
+    if code is None:
+        raise ValueError(f"Unknown action: {action_type}")
+    seat = seats.get(player_id)
+    if seat is None:
+        raise ValueError(f"Player {player_id} not found")
+    out.append(code << 3 | seat)
+    _encode_value(out, params, seats)
+
+def decode_actions(data, count: int, players: Sequence[str]) -> List[RecordedAction]:
+    actions = []
+    pos = 0
+    for _ in range(count):
+        head = data[pos]
+        params, pos = _decode_value(data, pos + 1, players)
+        actions.append((players[head & 7], ACTION_CODES[head >> 3], params))
+    return actions
+
+class ShuffleRng:
+    """
+    The RNG a recorded game shuffles with. Shuffle n uses Random(seed, n), so a
+    position is resumed from (seed, count) alone and nothing else in the
+    process (agents, other games) can shift a game's shuffles.
+    """
+    __slots__ = ("seed", "count")
+
+    def __init__(self, seed: int, count: int = 0):
+        self.seed = seed
+        self.count = count
+
+    def shuffle(self, items: list):
+        random.Random(self.seed << 32 | self.count).shuffle(items)
+        self.count += 1
+
+def deal_of(state: GameState) -> bytes:
+    """The CARD_POOL permutation a freshly dealt state was built from (see models.game_from_deal)."""
+    cards = [c.uid for p in state.players for c in p.characters]
+    cards += [c.uid for c in state.deck] + [c.uid for c in state.shop_pile]
+    if len(cards) != len(CARD_POOL) or state.turn_count or state.shop_row:
+        raise ValueError("Recording has to start from a freshly dealt game")
+    try:
+        return bytes(_CARD_IDS[uid] for uid in cards)
+    except KeyError:
+        raise ValueError("Only games dealt from the card pool can be recorded")
+
+def _snapshot(state: GameState, rng: ShuffleRng) -> bytes:
+    body = {"shuffles": rng.count, "state": state.to_dict(exclude=("events",))}
+    return zlib.compress(json.dumps(body, separators=(",", ":")).encode())
+
+class GameRecord:
+    """
+    One game. Decoded records keep their actions encoded until `actions` is
+    first read, so scanning headers (players, winner, turns, meta) is cheap.
+    """
+    def __init__(self, players: Sequence[str], deal: bytes, shuffle_seed: int, rules: Optional[Dict[str, Any]] = None,
+                 names: Optional[Dict[str, str]] = None, actions: Optional[List[RecordedAction]] = None,
+                 checkpoints: Optional[List[Tuple[int, bytes]]] = None, winner: Optional[str] = None,
+                 turns: int = 0, meta: Optional[Dict[str, Any]] = None):
+        if not 2 <= len(players) <= 8:
+            raise ValueError("A record needs 2-8 players")
+        self.players = list(players)
+        self.deal = bytes(deal)
+        self.shuffle_seed = shuffle_seed
+        self.rules = rules or {}
+        self.names = names or {}
+        self.checkpoints = checkpoints or []
+        self.winner = winner
+        self.turns = turns
+        self.meta = meta or {}
+        self._actions = actions if actions is not None else []
+        self._encoded: Optional[bytes] = None
+        self._count = len(self._actions)
+
+    @property
+    def actions(self) -> List[RecordedAction]:
+        if self._actions is None:
+            self._actions = decode_actions(self._encoded, self._count, self.players)
+        return self._actions
+
+    @property
+    def action_count(self) -> int:
+        return self._count if self._actions is None else len(self._actions)
+
+    def _encoded_actions(self) -> bytes:
+        if self._actions is None:
+            return self._encoded
+        seats = {pid: i for i, pid in enumerate(self.players)}
+        out = bytearray()
+        for action in self._actions:
+            encode_action(out, seats, *action)
+        return bytes(out)
+
+    def header(self) -> Dict[str, Any]:
+        return {"players": self.players, "names": self.names, "rules": self.rules, "shuffle_seed": self.shuffle_seed,
+                "winner": self.winner, "turns": self.turns, "meta": self.meta}
+
+    def encode(self) -> bytes:
+        out = bytearray()
+        _put_bytes(out, json.dumps(self.header(), separators=(",", ":")).encode())
+        _put_bytes(out, self.deal)
+        _put_varint(out, self.action_count)
+        _put_bytes(out, self._encoded_actions())
+        _put_varint(out, len(self.checkpoints))
+        for index, snapshot in self.checkpoints:
+            _put_varint(out, index)
+            _put_bytes(out, snapshot)
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data) -> "GameRecord":
+        n, pos = _get_varint(data, 0)
+        header = json.loads(bytes(data[pos:pos + n]))
+        pos += n
+        n, pos = _get_varint(data, pos)
+        deal = bytes(data[pos:pos + n])
+        pos += n
+        count, pos = _get_varint(data, pos)
+        n, pos = _get_varint(data, pos)
+        encoded = bytes(data[pos:pos + n])
+        pos += n
+        checkpoints = []
+        k, pos = _get_varint(data, pos)
+        for _ in range(k):
+            index, pos = _get_varint(data, pos)
+            n, pos = _get_varint(data, pos)
+            checkpoints.append((index, bytes(data[pos:pos + n])))
+            pos += n
+        record = cls(header["players"], deal, header["shuffle_seed"], header["rules"], header["names"],
+                     None, checkpoints, header["winner"], header["turns"], header["meta"])
+        record._actions, record._encoded, record._count = None, encoded, count
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly form, for export and for tools that don't read the binary format."""
+        return {**self.header(), "deal": list(self.deal),
+                "actions": [[pid, action_type, params] for pid, action_type, params in self.actions]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameRecord":
+        actions = [(pid, action_type, params) for pid, action_type, params in data.get("actions", [])]
+        return cls(data["players"], bytes(data["deal"]), data["shuffle_seed"], data.get("rules"), data.get("names"),
+                   actions, None, data.get("winner"), data.get("turns", 0), data.get("meta"))
+
+    def new_state(self) -> GameState:
+        """The game as dealt, shuffling with the record's RNG."""
+        rules = RuleSet.from_dict(self.rules) if self.rules else None
+        state = game_from_deal(self.players, self.deal, self.names or None, rules)
+        state._rng = ShuffleRng(self.shuffle_seed)
+        return state
+
+    def state_at(self, index: Optional[int] = None) -> GameState:
+        """
+        The game after its first `index` actions (all of them by default),
+        starting from the nearest checkpoint. A state restored from a
+        checkpoint has no events from before it.
+        """
+        actions = self.actions
+        index = len(actions) if index is None else index
+        if not 0 <= index <= len(actions):
+            raise ValueError(f"Record has {len(actions)} actions, not {index}")
+        start, state = 0, None
+        for at, snapshot in self.checkpoints:
+            if start < at <= index:
+                start, state = at, self._restore(snapshot)
+        if state is None:
+            state = self.new_state()
+        for player_id, action_type, params in actions[start:index]:
+            apply_action(state, player_id, action_type, params)
+        return state
+
+    def _restore(self, snapshot: bytes) -> GameState:
+        data = json.loads(zlib.decompress(snapshot))
+        state = GameState.from_dict(data["state"])
+        state._rng = ShuffleRng(self.shuffle_seed, data["shuffles"])
+        return state
+
+    def replay(self) -> GameState:
+        """Replays every action from the deal, checking the result against the header."""
+        state = self.new_state()
+        for player_id, action_type, params in self.actions:
+            apply_action(state, player_id, action_type, params)
+        if state.winner_id != self.winner or state.turn_count != self.turns:
+            raise ValueError("Replay diverged from the recorded result")
+        return state
+
+class GameRecorder:
+    """
+    Records a game from its deal. attach() gives the state the recorder's
+    shuffle RNG and makes actions.apply_action report every applied action.
+    """
+    def __init__(self, state: GameState, shuffle_seed: Optional[int] = None, checkpoint_every: int = 0,
+                 meta: Optional[Dict[str, Any]] = None):
+        if shuffle_seed is None:
+            # Not from the global RNG, which seeded games and agents share
+            shuffle_seed = int.from_bytes(os.urandom(4), "little")
+        names = {p.id: p.name for p in state.players if p.name != f"Player {p.id}"}
+        self.record = GameRecord([p.id for p in state.players], deal_of(state), shuffle_seed,
+                                 state.rules.to_dict(exclude_defaults=True), names, meta=meta)
+        self.rng = ShuffleRng(shuffle_seed)
+        self.checkpoint_every = checkpoint_every
+        self._seats = {pid: i for i, pid in enumerate(self.record.players)}
+        self._encoded = bytearray()
+        self._count = 0
+
+    def attach(self, state: GameState) -> "GameRecorder":
+        """Also used to re-attach to a state restored from JSON (e.g. a hibernated room)."""
+        state._rng = self.rng
+        state._recorder = self
+        return self
+
+    def encode(self, player_id: str, action_type: str, params: Optional[Dict[str, Any]]) -> bytes:
+        """
+        The action's record bytes. Taken before the action is applied: callers may
+        reuse their params dicts, and a ValueError here leaves the game untouched.
+        """
+        out = bytearray()
+        encode_action(out, self._seats, player_id, action_type, params)
+        return bytes(out)
+
+    def on_action(self, state: GameState, encoded: bytes):
+        """Appends an action the engine accepted (bytes from encode)."""
+        self._encoded += encoded
+        self._count += 1
+        if self.checkpoint_every and self._count % self.checkpoint_every == 0 and not state.is_over:
+            self.record.checkpoints.append((self._count, _snapshot(state, self.rng)))
+
+    def finish(self, state: GameState) -> GameRecord:
+        """The record so far, with the state's result in its header; detaches from state."""
+        record = self.record
+        record.winner, record.turns = state.winner_id, state.turn_count
+        record._actions, record._encoded, record._count = None, bytes(self._encoded), self._count
+        if state._recorder is self:
+            state._recorder = None
+        return record
+
+def record_game(agents: Dict[str, Any], seed: Optional[int] = None, rules: Optional[Dict[str, Any]] = None,
+                max_steps: int = DEFAULT_MAX_STEPS, checkpoint_every: int = 0,
+                meta: Optional[Dict[str, Any]] = None) -> GameRecord:
+    """Plays one headless game like simulation.play_game and returns its record."""
+    state = new_game(list(agents), seed, rules)
+    recorder = GameRecorder(state, seed, checkpoint_every, meta).attach(state)
+    run_game(state, agents, max_steps)
+    return recorder.finish(state)
+
+def simulate_records(games: int, players: int = 3, agents: Sequence[str] = ("random",), seed: int = 0,
+                     rules: Optional[Dict[str, Any]] = None, checkpoint_every: int = 0) -> Iterator[GameRecord]:
+    """Records `games` seeded games (seed, seed+1, ...) with seats cycling through `agents`."""
+    # Imported here: the registry pulls in MCTS and multiprocessing, which the
+    # server and readers of record files never need
+    from .tournament import AGENT_REGISTRY
+
+    seats = {f"p{n + 1}": agents[n % len(agents)] for n in range(players)}
+    for i in range(games):
+        with closing_agents({pid: AGENT_REGISTRY[name]() for pid, name in seats.items()}) as bots:
+            record = record_game(bots, seed + i, rules, checkpoint_every=checkpoint_every,
+                                 meta={"source": "simulation", "seed": seed + i, "agents": list(seats.values())})
+        yield record
+
+class RecordWriter:
+    """Appends records to a file, writing the file header if it is new."""
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC + bytes((FORMAT_VERSION,)))
+        else:
+            with open(path, "rb") as f:
+                _check_magic(f.read(len(MAGIC) + 1), path)
+
+    def write(self, record: GameRecord):
+        data = record.encode()
+        out = bytearray()
+        _put_varint(out, len(data))
+        self.file.write(out)
+        self.file.write(data)
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _check_magic(head: bytes, path: str):
+    if head[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a game record file")
+    if head[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError(f"{path} has record format version {head[len(MAGIC)]}, expected {FORMAT_VERSION}")
+
+def write_records(path: str, records: Iterable[GameRecord]) -> int:
+    with RecordWriter(path) as out:
+        for record in records:
+            out.write(record)
+        return out.count
+
+def iter_records(path: str) -> Iterator[GameRecord]:
+    """Reads records one at a time from a memory-mapped file; actions are decoded on demand."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            _check_magic(data[:len(MAGIC) + 1], path)
+            pos, end = len(MAGIC) + 1, len(data)
+            while pos < end:
+                n, start = _get_varint(data, pos)
+                if start + n > end:
+                    raise ValueError(f"Truncated record at byte {pos} of {path}")
+                yield GameRecord.decode(data[start:start + n])
+                pos = start + n
+
+def export_jsonl(records: Iterable[GameRecord], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record.to_dict(), separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+def import_jsonl(path: str) -> Iterator[GameRecord]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield GameRecord.from_dict(json.loads(line))
+
+def scan(records: Iterable[GameRecord]) -> Dict[str, Any]:
+    """Header-level totals; actions are never decoded."""
+    games = actions = turns = 0
+    winners: Counter = Counter()
+    for record in records:
+        games += 1
+        actions += record.action_count
+        turns += record.turns
+        winners[record.players.index(record.winner) if record.winner in record.players else None] += 1
+    return {"games": games, "actions": actions, "mean_turns": turns / games if games else 0.0,
+            "wins_by_seat": {seat: n for seat, n in sorted(winners.items(), key=lambda kv: (kv[0] is None, kv[0] or 0))}}
+
+def main(argv: Optional[List[str]] = None):
+    from .tournament import AGENT_REGISTRY
+
+    parser = argparse.ArgumentParser(description="Create, convert and scan game record files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sim = commands.add_parser("simulate", help="Record simulated games")
+    sim.add_argument("output")
+    sim.add_argument("--games", type=int, default=100)
+    sim.add_argument("--players", type=int, default=3)
+    sim.add_argument("--agents", nargs="+", default=["random"], choices=sorted(AGENT_REGISTRY))
+    sim.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    sim.add_argument("--rules", default="{}", help="RuleSet overrides as JSON")
+    sim.add_argument("--checkpoint-every", type=int, default=0, help="Snapshot the state every N actions")
+    export = commands.add_parser("export", help="Convert a record file to JSON lines")
+    export.add_argument("input")
+    export.add_argument("output")
+    imp = commands.add_parser("import", help="Append JSON-lines records to a record file")
+    imp.add_argument("input")
+    imp.add_argument("output")
+    stats = commands.add_parser("stats", help="Scan a record file's headers")
+    stats.add_argument("input")
+    verify = commands.add_parser("verify", help="Replay every record and check its result")
+    verify.add_argument("input")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "simulate":
+        count = write_records(args.output, simulate_records(args.games, args.players, args.agents, args.seed,
+                                                            json.loads(args.rules), args.checkpoint_every))
+        size = os.path.getsize(args.output)
+        print(f"Recorded {count} games to {args.output} ({size} bytes, {size / max(count, 1):.0f} per game)")
+    elif args.command == "export":
+        count = export_jsonl(iter_records(args.input), args.output)
+        print(f"Exported {count} records to {args.output}")
+    elif args.command == "import":
+        count = write_records(args.output, import_jsonl(args.input))
+        print(f"Imported {count} records into {args.output}")
+    elif args.command == "stats":
+        totals = scan(iter_records(args.input))
+        elapsed = time.perf_counter() - started
+        print(json.dumps(totals, indent=2))
+        print(f"Scanned {totals['games']} records in {elapsed:.2f}s ({totals['games'] / elapsed:.0f}/s)")
+        return
+    elif args.command == "verify":
+        failures = 0
+        for i, record in enumerate(iter_records(args.input)):
+            try:
+                record.replay()
+            except ValueError as e:
+                failures += 1
+                print(f"Record {i}: {e}", file=sys.stderr)
+        print(f"Verified records in {time.perf_counter() - started:.2f}s, {failures} failed")
+        if failures:
+            sys.exit(1)
+        return
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
+
+# Seats a game can have, and the standard card pool every game is dealt from
+# (two 52-card decks; models.CARD_POOL). Rule sets must be playable at MAX_PLAYERS.
+MAX_PLAYERS = 4
+POOL_SIZE = 104
+FACE_CARDS = 24
+
+class CompiledRules:
+    """
+    Flat lookup tables built once per RuleSet. Engine hot paths index these
+    instead of rebuilding dict literals on every call.
+    """
+    __slots__ = (
+        "power", "shield", "face_price", "ace_price", "clubs_tap_damage",
+        "shop_pile_size", "gravedig_pool_size", "refresh_cost",
+    )
+
+    def __init__(self, rules: "RuleSet"):
+        # J/Q/K strength: Clubs hits, Diamonds free buys, Spades keeps, upgrade order
+        self.power: Dict[str, int] = dict(rules.face_power)
+        self.shield: Dict[str, int] = dict(rules.shield_values)
+        self.face_price: Dict[str, int] = dict(rules.face_prices)
+        self.ace_price = rules.ace_price
+        self.clubs_tap_damage = rules.clubs_tap_damage
+        self.shop_pile_size = rules.shop_pile_size
+        self.gravedig_pool_size = rules.gravedig_pool_size
+        self.refresh_cost = rules.refresh_cost
+
+    def price(self, card) -> int:
+        if card.is_face:
+            return self.face_price[card.face_rank]
+        return self.ace_price if card.is_ace else card.rank
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class RuleSet:
+    """
+    House rules for one game. Immutable, so a single instance can be shared by
+    many games; compiled() builds the engine's lookup tables on first use.
+    """
+    name: str = "standard"
+    face_power: Dict[str, int] = field(default_factory=lambda: {"J": 1, "Q": 2, "K": 3})
+    shield_values: Dict[str, int] = field(default_factory=lambda: {"J": 3, "Q": 5, "K": 10})
+    face_prices: Dict[str, int] = field(default_factory=lambda: {"J": 3, "Q": 4, "K": 5})
+    ace_price: int = 10
+    clubs_tap_damage: int = 10
+    starting_characters: int = 3
+    max_characters: int = 3
+    shop_size: int = 3
+    shop_pile_size: int = 20
+    gravedig_pool_size: int = 5
+    refresh_cost: int = 2
+
+    _compiled: Optional[CompiledRules] = field(default=None, init=False, repr=False, compare=False)
+
+    def compiled(self) -> CompiledRules:
+        if self._compiled is None:
+            object.__setattr__(self, "_compiled", CompiledRules(self))
+        return self._compiled
+
+    def to_dict(self, exclude_defaults: bool = False) -> Dict[str, Any]:
+        """The rules as plain data; with exclude_defaults, only the fields that differ from standard."""
+        data = {name: _copy_value(getattr(self, name)) for name in _FIELD_TYPES}
+        if exclude_defaults:
+            standard = STANDARD_RULES.to_dict()
+            data = {name: value for name, value in data.items() if value != standard[name]}
+        return data
+
+    @classmethod
+    def from_dict(cls, overrides: Dict[str, Any]) -> "RuleSet":
+        """Standard rules with the given fields replaced. Unknown or mistyped fields raise ValueError."""
+        if not isinstance(overrides, dict):
+            raise ValueError("Rules must be an object of field overrides")
+        for name, value in overrides.items():
+            expected = _FIELD_TYPES.get(name)
+            if expected is None:
+                raise ValueError(f"Unknown rule: {name}")
+            if not _is_instance(value, expected):
+                raise ValueError(f"Rule {name} must be {_TYPE_NAMES[expected]}")
+        rules = cls(**{name: _copy_value(value) for name, value in overrides.items()})
+        check_rules(rules.to_dict())
+        return rules
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        """Loads a JSON rules file; omitted fields keep their standard values."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+# Field name -> "str", "int" or "dict" (of str to int), in declaration order
+_FIELD_TYPES: Dict[str, str] = {
+    f.name: {str: "str", int: "int"}.get(f.type, "dict") for f in fields(RuleSet) if f.init
+}
+_TYPE_NAMES = {"str": "a string", "int": "an integer", "dict": "an object of integers"}
+
+def _is_instance(value: Any, expected: str) -> bool:
+    if expected == "str":
+        return isinstance(value, str)
+    if expected == "int":
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, dict) and all(
+        isinstance(k, str) and isinstance(v, int) and not isinstance(v, bool) for k, v in value.items()
+    )
+
+def check_rules(values: Dict[str, Any]):
+    """
+    Raises ValueError unless a complete, well-typed set of rule values can be
+    played: every face table covers exactly J/Q/K, no number is negative, the
+    shop and character rows hold at least one card, and a MAX_PLAYERS game can
+    be dealt from the pool. Shared by RuleSet.from_dict and the backend schema.
+    """
+    for name in ("face_power", "shield_values", "face_prices"):
+        if set(values[name]) != {"J", "Q", "K"}:
+            raise ValueError(f"Rule {name} must have exactly the keys J, Q and K")
+        if min(values[name].values()) < 0:
+            raise ValueError(f"Rule {name} can't have negative values")
+    for name, expected in _FIELD_TYPES.items():
+        if expected == "int" and values[name] < 0:
+            raise ValueError(f"Rule {name} can't be negative")
+    for name in ("shop_size", "max_characters", "starting_characters"):
+        if values[name] < 1:
+            raise ValueError(f"Rule {name} must be at least 1")
+    if values["starting_characters"] > values["max_characters"]:
+        raise ValueError("Rule starting_characters can't exceed max_characters")
+    dealt = MAX_PLAYERS * values["starting_characters"]
+    if dealt > FACE_CARDS:
+        raise ValueError(f"{MAX_PLAYERS} players can't each start with {values['starting_characters']} "
+                         f"characters: there are only {FACE_CARDS} face cards")
+    if dealt + values["shop_pile_size"] > POOL_SIZE:
+        raise ValueError(f"Rule shop_pile_size is too large: a {MAX_PLAYERS}-player deal leaves "
+                         f"{POOL_SIZE - dealt} cards")
+
+def _copy_value(value: Any) -> Any:
+    return dict(value) if isinstance(value, dict) else value
+
+STANDARD_RULES = RuleSet()
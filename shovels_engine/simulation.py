@@ -0,0 +1,47 @@
+import random
+from typing import Any, Dict, List, Optional, Union
+from .models import GameState, setup_game
+from .rules import RuleSet
+from .events import EventBus, attach_bus
+from .engine import get_current_player
+from .agents import Agent
+
+# Longest RandomAgent games take ~350 moves; anything past this is stuck.
+DEFAULT_MAX_STEPS = 5000
+
+def new_game(player_ids: List[str], seed: Optional[int] = None,
+             rules: Optional[Union[RuleSet, Dict[str, Any]]] = None,
+             bus: Optional[EventBus] = None, game_id: Optional[str] = None) -> GameState:
+    """
+    Seeds the global RNG (if given) and deals a game. rules is a RuleSet or a dict
+    of RuleSet overrides (e.g. {"max_characters": 4}). With a bus, the game's events
+    are streamed to it tagged with game_id (default: the seed).
+    """
+    if seed is not None:
+        random.seed(seed)
+    if isinstance(rules, dict):
+        rules = RuleSet.from_dict(rules)
+    state = setup_game(player_ids, rules=rules)
+    if bus is not None:
+        attach_bus(state, bus, game_id if game_id is not None else str(seed))
+    return state
+
+def run_game(state: GameState, agents: Dict[str, Agent], max_steps: int = DEFAULT_MAX_STEPS) -> GameState:
+    """Lets the agents play state to the end, or until max_steps moves have been made."""
+    steps = 0
+    while not state.is_over and steps < max_steps:
+        player_id = get_current_player(state).id
+        agents[player_id].act(state, player_id)
+        steps += 1
+    return state
+
+def play_game(agents: Dict[str, Agent], seed: Optional[int] = None, max_steps: int = DEFAULT_MAX_STEPS,
+              rules: Optional[Union[RuleSet, Dict[str, Any]]] = None,
+              bus: Optional[EventBus] = None, game_id: Optional[str] = None) -> GameState:
+    """
+    Plays one headless game. Seat order follows the order of `agents`
+    (the first seat opens Phase 1). Seeding the global RNG makes the deal and
+    any agent randomness reproducible. Returns the final state; if max_steps is
+    hit the game is left unfinished (state.is_over is False).
+    """
+    return run_game(new_game(list(agents), seed, rules, bus, game_id), agents, max_steps)
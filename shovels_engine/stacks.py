@@ -0,0 +1,112 @@
+from typing import List, Tuple
+from .models import Card, Character, Suit
+
+SUITS = list(Suit)
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+_ZERO = (0, 0, 0, 0)
+
+def action_rank(card: Card) -> int:
+    return 10 if card.is_ace else card.rank
+
+def _add(totals: Tuple[int, ...], i: int, amount: int) -> Tuple[int, ...]:
+    c, d, h, s = totals
+    if i == 0:
+        return c + amount, d, h, s
+    if i == 1:
+        return c, d + amount, h, s
+    if i == 2:
+        return c, d, h + amount, s
+    return c, d, h, s + amount
+
+class StackSummary:
+    """
+    Prefix aggregates over a character's stack, bottom up. Row i covers stack[:i],
+    so anything about the top n cards is row[len] minus row[len - n]:
+    sums[i]       per-suit action rank totals
+    counts[i]     per-suit card counts
+    last_heart[i] index of the highest Heart in stack[:i], or -1
+    push/pop keep the rows in step with the stack in O(1).
+    """
+    __slots__ = ("stack", "sums", "counts", "last_heart", "top")
+
+    def __init__(self, stack: List[Card]):
+        self.stack = stack
+        self.sums = [_ZERO]
+        self.counts = [_ZERO]
+        self.last_heart = [-1]
+        self.top = None
+        for card in stack:
+            self._extend(card)
+
+    def _extend(self, card: Card):
+        i = SUIT_INDEX[card.suit]
+        n = len(self.sums) - 1
+        self.sums.append(_add(self.sums[-1], i, action_rank(card)))
+        self.counts.append(_add(self.counts[-1], i, 1))
+        self.last_heart.append(n if card.suit == Suit.HEARTS else self.last_heart[-1])
+        self.top = card
+
+    def copy(self, stack: List[Card]) -> "StackSummary":
+        """This summary for a copy of the stack (rows are immutable tuples, so lists are sliced)."""
+        clone = StackSummary.__new__(StackSummary)
+        clone.stack = stack
+        clone.sums = self.sums[:]
+        clone.counts = self.counts[:]
+        clone.last_heart = self.last_heart[:]
+        clone.top = self.top
+        return clone
+
+    def is_current(self, stack: List[Card]) -> bool:
+        """Cheap staleness check against edits that bypassed push/pop."""
+        return (stack is self.stack and len(self.sums) == len(stack) + 1
+                and (stack[-1] if stack else None) is self.top)
+
+    def push(self, card: Card):
+        self.stack.append(card)
+        self._extend(card)
+
+    def pop(self) -> Card:
+        self.sums.pop()
+        self.counts.pop()
+        self.last_heart.pop()
+        card = self.stack.pop()
+        self.top = self.stack[-1] if self.stack else None
+        return card
+
+    def top_sum(self, n: int, suit: Suit) -> int:
+        """Action total for `suit` using the top n cards (n >= 1)."""
+        _check_top(n)
+        i = SUIT_INDEX[suit]
+        return self.sums[-1][i] - self.sums[-1 - n][i]
+
+    def top_has(self, n: int, suit: Suit) -> bool:
+        _check_top(n)
+        i = SUIT_INDEX[suit]
+        return self.counts[-1][i] > self.counts[-1 - n][i]
+
+    def top_suits(self, n: int) -> List[Suit]:
+        _check_top(n)
+        top, below = self.counts[-1], self.counts[-1 - n]
+        return [s for i, s in enumerate(SUITS) if top[i] > below[i]]
+
+    def nearest_heart(self) -> int:
+        """Index of the topmost Heart (the one damage is compared against), or -1."""
+        return self.last_heart[-1]
+
+def _check_top(n: int):
+    # A non-positive n would index the prefix rows from the wrong end
+    if n < 1:
+        raise ValueError("Must use at least one card from the top of the stack")
+
+def stack_summary(char: Character) -> StackSummary:
+    """The character's summary, rebuilt if its stack was replaced or edited directly."""
+    summary = char._stack_summary
+    if summary is None or not summary.is_current(char.stack):
+        summary = char._stack_summary = StackSummary(char.stack)
+    return summary
+
+def push_card(char: Character, card: Card):
+    stack_summary(char).push(card)
+
+def pop_card(char: Character) -> Card:
+    return stack_summary(char).pop()
@@ -0,0 +1,175 @@
+import argparse
+import math
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import combinations, combinations_with_replacement
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .agents import Agent, RandomAgent, HeuristicAgent, closing_agents
+from .mcts import MCTSAgent
+from .simulation import play_game, DEFAULT_MAX_STEPS
+
+AgentFactory = Callable[[], Agent]
+
+# Agents selectable from the command line
+AGENT_REGISTRY: Dict[str, AgentFactory] = {
+    "random": RandomAgent,
+    "heuristic": HeuristicAgent,
+    "mcts": partial(MCTSAgent, iterations=50),
+}
+
+BASE_RATING = 1500.0
+
+@dataclass(slots=True, kw_only=True)
+class MatchResult:
+    seed: int
+    seats: List[str]  # agent names in seat order
+    winner: Optional[str] = None  # None for a draw or an unfinished game
+    turn_count: int
+
+@dataclass(slots=True, kw_only=True)
+class Rating:
+    name: str
+    elo: float
+    low: float  # 95% bootstrap interval
+    high: float
+    games: int
+    wins: int
+
+def schedule(names: Sequence[str], player_counts: Iterable[int], seeds: Iterable[int]) -> List[Tuple[Tuple[str, ...], int]]:
+    """
+    Every lineup for each player count (copies of an agent may share a table, but
+    not all seats), in every distinct seat rotation, on the same seed set so agents
+    are compared on identical deals.
+    """
+    seeds = list(seeds)
+    games = []
+    for n in player_counts:
+        for lineup in combinations_with_replacement(names, n):
+            if len(set(lineup)) < 2:
+                continue
+            rotations = dict.fromkeys(lineup[r:] + lineup[:r] for r in range(n))
+            for seats in rotations:
+                games.extend((seats, seed) for seed in seeds)
+    return games
+
+def _run_match(factories: Dict[str, AgentFactory], seats: Tuple[str, ...], seed: int, max_steps: int) -> MatchResult:
+    # Seat-qualified ids so copies of one agent can share a table
+    player_ids = [f"{name}#{i}" for i, name in enumerate(seats)]
+    with closing_agents({pid: factories[name]() for pid, name in zip(player_ids, seats)}) as agents:
+        state = play_game(agents, seed=seed, max_steps=max_steps)
+    winner = None
+    if state.is_over and state.winner_id in player_ids:
+        winner = seats[player_ids.index(state.winner_id)]
+    return MatchResult(seed=seed, seats=list(seats), winner=winner, turn_count=state.turn_count)
+
+def run_matches(factories: Dict[str, AgentFactory], player_counts: Iterable[int] = (2, 3, 4),
+                seeds: Iterable[int] = range(10), workers: int = 1,
+                max_steps: int = DEFAULT_MAX_STEPS) -> List[MatchResult]:
+    games = schedule(list(factories), player_counts, seeds)
+    if workers <= 1:
+        return [_run_match(factories, seats, seed, max_steps) for seats, seed in games]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_match, factories, seats, seed, max_steps) for seats, seed in games]
+        return [f.result() for f in futures]
+
+def _pairwise(results: Sequence[MatchResult]) -> Dict[Tuple[str, str], float]:
+    """
+    Splits multiplayer games into pairwise outcomes: the winner beats every other
+    seat, everyone else draws with each other. Mirror pairings (an agent against a
+    copy of itself) carry no information and are skipped.
+    Returns score[(a, b)] = points a took off b.
+    """
+    score: Dict[Tuple[str, str], float] = defaultdict(float)
+    for r in results:
+        for a, b in combinations(r.seats, 2):
+            if a == b:
+                continue
+            if r.winner == a:
+                score[(a, b)] += 1.0
+            elif r.winner == b:
+                score[(b, a)] += 1.0
+            else:
+                score[(a, b)] += 0.5
+                score[(b, a)] += 0.5
+    return score
+
+def fit_elo(names: Sequence[str], results: Sequence[MatchResult], max_iterations: int = 1000, tol: float = 1e-9) -> Dict[str, float]:
+    """
+    Bradley-Terry maximum likelihood (MM updates) on the pairwise outcomes,
+    reported on the Elo scale and centred on BASE_RATING. Each agent gets one
+    virtual win and loss against a fixed BASE_RATING opponent so ratings stay
+    finite when an agent never wins.
+    """
+    score = _pairwise(results)
+    gamma = {n: 1.0 for n in names}
+    for _ in range(max_iterations):
+        updated = {}
+        for i in names:
+            wins = 1.0 + sum(score.get((i, j), 0.0) for j in names if j != i)
+            denom = 2.0 / (gamma[i] + 1.0)
+            for j in names:
+                if j == i:
+                    continue
+                n_ij = score.get((i, j), 0.0) + score.get((j, i), 0.0)
+                if n_ij:
+                    denom += n_ij / (gamma[i] + gamma[j])
+            updated[i] = wins / denom
+        converged = all(abs(updated[n] - gamma[n]) <= tol * gamma[n] for n in names)
+        gamma = updated
+        if converged:
+            break
+
+    elo = {n: 400.0 * math.log10(gamma[n]) for n in names}
+    shift = BASE_RATING - sum(elo.values()) / len(elo)
+    return {n: e + shift for n, e in elo.items()}
+
+def rate(names: Sequence[str], results: Sequence[MatchResult], bootstrap: int = 200, seed: int = 0) -> List[Rating]:
+    """Elo ratings with 95% confidence intervals from resampling games."""
+    point = fit_elo(names, results)
+    rng = random.Random(seed)
+    samples: Dict[str, List[float]] = {n: [] for n in names}
+    for _ in range(bootstrap):
+        resample = [rng.choice(results) for _ in results]
+        for n, e in fit_elo(names, resample).items():
+            samples[n].append(e)
+
+    ratings = []
+    for n in names:
+        s = sorted(samples[n]) or [point[n]]
+        ratings.append(Rating(
+            name=n,
+            elo=point[n],
+            low=s[int(0.025 * (len(s) - 1))],
+            high=s[int(0.975 * (len(s) - 1))],
+            games=sum(1 for r in results if n in r.seats),
+            wins=sum(1 for r in results if r.winner == n),
+        ))
+    return sorted(ratings, key=lambda r: r.elo, reverse=True)
+
+def format_ratings(ratings: Sequence[Rating]) -> str:
+    lines = [f"{'Agent':<16}{'Elo':>8}{'95% CI':>18}{'Games':>8}{'Wins':>7}"]
+    for r in ratings:
+        ci = f"[{r.low:.0f}, {r.high:.0f}]"
+        lines.append(f"{r.name:<16}{r.elo:>8.0f}{ci:>18}{r.games:>8}{r.wins:>7}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Round-robin agent tournament with Elo ratings.")
+    parser.add_argument("agents", nargs="+", choices=sorted(AGENT_REGISTRY), help="Agents to enter")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4], help="Player counts to schedule")
+    parser.add_argument("--seeds", type=int, default=10, help="Number of fixed seeds per seating")
+    parser.add_argument("--seed-offset", type=int, default=0, help="First seed of the seed set")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    factories = {name: AGENT_REGISTRY[name] for name in dict.fromkeys(args.agents)}
+    seeds = range(args.seed_offset, args.seed_offset + args.seeds)
+    results = run_matches(factories, args.players, seeds, workers=args.workers)
+    print(f"{len(results)} games played")
+    print(format_ratings(rate(list(factories), results)))
+
+if __name__ == "__main__":
+    main()
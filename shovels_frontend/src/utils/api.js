@@ -46,8 +46,9 @@ export const joinRoom = (roomId, playerId) => apiRequest(`/rooms/${roomId}/join?
     method: 'POST',
 });
 
-// WebSocket helper
-export const getWsUrl = (roomId) => {
+// WebSocket helper; version resumes from the last state seen before a drop
+export const getWsUrl = (roomId, version = null) => {
     const token = getAuthToken();
-    return `${WS_BASE_URL}/ws/room/${roomId}?token=${token}`;
+    const resume = version === null ? '' : `&version=${version}`;
+    return `${WS_BASE_URL}/ws/room/${roomId}?token=${token}${resume}`;
 };
@@ -0,0 +1,19 @@
+// Applies a state_delta's ops (see shovels_backend/deltas.py) to a copy of state.
+export const applyDelta = (state, ops) => {
+    let next = structuredClone(state);
+    for (const [op, path, value] of ops) {
+        if (path.length === 0) {
+            next = value;
+            continue;
+        }
+        let parent = next;
+        for (const key of path.slice(0, -1)) parent = parent[key];
+        const key = path[path.length - 1];
+        if (op === 'set') parent[key] = value;
+        else if (op === 'del') delete parent[key];
+        else if (op === 'extend') parent[key].push(...value);
+        else if (op === 'truncate') parent[key].length = value;
+        else throw new Error(`Unknown delta op: ${op}`);
+    }
+    return next;
+};
@@ -1,8 +1,9 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
-import { Users, Shield, ArrowLeft, Play, UserPlus } from 'lucide-react';
+import { Users, Shield, ArrowLeft, Play, UserPlus, Bot } from 'lucide-react';
 import Button from '../components/Button';
 import { getWsUrl } from '../utils/api';
+import { applyDelta } from '../utils/delta';
 import GameBoard from './GameBoard';
 import './LobbyRoom.css';
 
@@ -12,37 +13,57 @@ const LobbyRoom = ({ roomId, user, onLeave }) => {
     const ws = useRef(null);
 
     useEffect(() => {
-        const url = getWsUrl(roomId);
-        // Use a local variable to capture the instance for cleanup
-        const socket = new WebSocket(url);
-        ws.current = socket;
         let isMounted = true;
-
-        socket.onopen = () => {
-            if (isMounted) console.log('Connected to lobby WS');
-        };
-
-        socket.onmessage = (event) => {
-            if (!isMounted) return;
-            const msg = JSON.parse(event.data);
-            if (msg.type === 'state_update') {
-                setGameState(msg.state);
-                setError(null);
-            } else if (msg.type === 'error') {
-                setError(msg.message);
-            }
+        let socket = null;
+        let retryTimer = null;
+        // Last game state and its version, so a dropped socket can resume from it
+        let current = null;
+        let version = null;
+
+        const connect = () => {
+            // Use a local variable to capture the instance for cleanup
+            socket = new WebSocket(getWsUrl(roomId, version));
+            ws.current = socket;
+
+            socket.onopen = () => {
+                if (isMounted) console.log('Connected to lobby WS');
+            };
+
+            socket.onmessage = (event) => {
+                if (!isMounted) return;
+                const msg = JSON.parse(event.data);
+                if (msg.type === 'state_update') {
+                    current = msg.state;
+                    version = msg.version ?? null;
+                    setGameState(msg.state);
+                    setError(null);
+                } else if (msg.type === 'state_delta') {
+                    current = applyDelta(current, msg.ops);
+                    version = msg.version;
+                    setGameState(current);
+                    setError(null);
+                } else if (msg.type === 'error') {
+                    setError(msg.message);
+                }
+            };
+
+            socket.onerror = () => {
+                if (isMounted) setError('WebSocket connection error');
+            };
+
+            socket.onclose = () => {
+                if (!isMounted) return;
+                console.log('WS connection closed');
+                // Reconnect after a blip; the server replays only what we missed
+                if (version !== null) retryTimer = setTimeout(connect, 1000);
+            };
         };
 
-        socket.onerror = () => {
-            if (isMounted) setError('WebSocket connection error');
-        };
-
-        socket.onclose = () => {
-            if (isMounted) console.log('WS connection closed');
-        };
+        connect();
 
         return () => {
             isMounted = false;
+            clearTimeout(retryTimer);
             if (socket.readyState === WebSocket.OPEN || socket.readyState === WebSocket.CONNECTING) {
                 socket.close();
             }
@@ -57,6 +78,10 @@ const LobbyRoom = ({ roomId, user, onLeave }) => {
         sendMessage({ type: 'start_game' });
     };
 
+    const handleAddBot = () => {
+        sendMessage({ type: 'add_bot' });
+    };
+
     // Determine if we are in active game or lobby
     // LOBBY phase is represented by phase="LOBBY" in our mock broadcast_lobby_state
     // Real game phases are numbers (e.g., 1)
@@ -110,7 +135,7 @@ const LobbyRoom = ({ roomId, user, onLeave }) => {
                                 {player ? (
                                     <>
                                         <div className="player-avatar">
-                                            <Users size={32} />
+                                            {player.is_bot ? <Bot size={32} /> : <Users size={32} />}
                                         </div>
                                         <div className="player-info">
                                             <span className="player-name">
@@ -144,6 +169,16 @@ const LobbyRoom = ({ roomId, user, onLeave }) => {
                             ? "Waiting for at least one more player..."
                             : "Lobby full. Ready to start?"}
                     </p>
+                    {user.id === players[0]?.id && players.length < 4 && (
+                        <Button
+                            variant="secondary"
+                            size="large"
+                            onClick={handleAddBot}
+                        >
+                            <Bot size={20} />
+                            Add Bot
+                        </Button>
+                    )}
                     {user.id === players[0]?.id && (
                         <Button
                             variant="primary"
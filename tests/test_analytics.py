@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from shovels_engine.analytics import simulate_batch, report, save_tables, load_tables, win_rate_by_start_character
+from shovels_engine.simulation import new_game
+
+class TestAnalytics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = simulate_batch(6, player_counts=[2, 3])
+
+    def test_tables_are_columnar_and_aligned(self):
+        games = self.tables["games"]
+        self.assertEqual(len(games["seed"]), 12)
+        chars = self.tables["start_characters"]
+        # 3 starting characters per seat
+        self.assertEqual(len(chars["game"]), 3 * (6 * 2 + 6 * 3))
+        events = self.tables["events"]
+        lengths = {len(col) for col in events.values()}
+        self.assertEqual(len(lengths), 1)
+        self.assertTrue(all(isinstance(col, np.ndarray) for col in events.values()))
+
+    def test_report(self):
+        r = report(self.tables)
+        self.assertEqual(r["games"], 12)
+        self.assertEqual(set(r["game_length"]), {"2", "3"})
+        self.assertAlmostEqual(sum(r["seat_win_rate"]["2"]), 1.0)
+        shares = [v for k, v in r["deaths"].items() if k.endswith("_share") and k.startswith("deaths_")]
+        self.assertAlmostEqual(sum(shares), 1.0)
+        self.assertEqual(len(win_rate_by_start_character(self.tables)), 12)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "batch.npz")
+            save_tables(self.tables, path)
+            loaded = load_tables(path)
+        np.testing.assert_array_equal(loaded["events"]["event_type"], self.tables["events"]["event_type"])
+
+    def test_rules_override(self):
+        state = new_game(["p1", "p2"], seed=1, rules={"max_characters": 4, "shop_size": 5})
+        self.assertEqual(state.max_characters, 4)
+        self.assertEqual(state.shop_size, 5)
+        with self.assertRaises(ValueError):
+            new_game(["p1", "p2"], seed=1, rules={"no_such_rule": 1})
+
+if __name__ == "__main__":
+    unittest.main()
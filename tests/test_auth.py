@@ -1,7 +1,7 @@
 import pytest
 from datetime import timedelta
 from jose import jwt
-from shovels_backend.auth import create_access_token, ALGORITHM, SECRET_KEY, get_current_user
+from shovels_backend.auth import create_access_token, ALGORITHM, SECRET_KEY, get_current_user, get_oauth
 from fastapi import HTTPException
 import asyncio
 
@@ -41,3 +41,10 @@ async def test_get_current_user_missing_sub():
         await get_current_user(token)
     assert excinfo.value.status_code == 401
     assert excinfo.value.detail == "Invalid token"
+
+def test_oauth_client_registered_on_first_use():
+    import shovels_backend.auth as auth
+    oauth = get_oauth()
+    assert oauth.google is not None
+    assert get_oauth() is oauth
+    assert auth.oauth is oauth
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import pytest
 from fastapi.testclient import TestClient
 from shovels_backend.main import app
@@ -60,3 +63,29 @@ def test_join_room():
     assert room["player_count"] == 2
     
     app.dependency_overrides.clear()
+
+def test_create_variant_room():
+    app.dependency_overrides[get_current_user] = get_mock_user
+
+    response = client.post("/rooms", json={"name": "Variant", "rules": {"max_characters": 4}})
+    assert response.status_code == 200
+
+    for broken in [{"not_a_rule": 1}, {"face_power": {"J": 1}}, {"starting_characters": 7, "max_characters": 7},
+                   {"shop_size": -1}]:
+        response = client.post("/rooms", json={"name": "Broken", "rules": broken})
+        assert response.status_code == 400, broken
+
+    app.dependency_overrides.clear()
+
+def test_server_starts_with_a_record_file(tmp_path):
+    # Settings are read at import time, so the app is started in a fresh interpreter
+    path = tmp_path / "games.shvr"
+    script = ("from fastapi.testclient import TestClient\n"
+              "from shovels_backend.main import app, game_records\n"
+              "assert game_records is not None\n"
+              "with TestClient(app) as c:\n"
+              "    assert c.get('/health').status_code == 200\n")
+    env = {**os.environ, "RECORD_PATH": str(path)}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert path.read_bytes().startswith(b"SHVR")
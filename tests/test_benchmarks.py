@@ -0,0 +1,41 @@
+import unittest
+from shovels_engine.benchmarks import BENCHMARKS, build_fixtures, cases, measure, compare, import_times
+
+class TestBenchmarks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fixtures = build_fixtures()
+
+    def test_fixture_stages(self):
+        early, mid, late = (self.fixtures[s] for s in ["early", "mid", "late"])
+        self.assertEqual((early.phase, early.turn_count), (1, 0))
+        self.assertEqual(mid.phase, 1)
+        self.assertLess(len(mid.deck), len(early.deck))
+        self.assertEqual((late.phase, late.turn_subphase), (2, "BATTLE_ACTION"))
+
+    def test_every_case_runs(self):
+        all_cases = cases(self.fixtures)
+        self.assertEqual({name.split("[")[0] for name, *_ in all_cases},
+                         {name.split("[")[0] for name in BENCHMARKS})
+        for name, prepare, fixture, mutates in all_cases:
+            with self.subTest(name):
+                result = measure(prepare, fixture, mutates, number=2, repeat=1)
+                self.assertGreater(result["min_us"], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"a": {"min_us": 10.0}, "b": {"min_us": 10.0}}
+        current = {"a": {"min_us": 11.0}, "b": {"min_us": 14.0}, "c": {"min_us": 1.0}}
+        rows = {r["name"]: r for r in compare(current, baseline, threshold=0.25)}
+        self.assertFalse(rows["a"]["regressed"])
+        self.assertTrue(rows["b"]["regressed"])
+        self.assertIsNone(rows["c"]["ratio"])
+
+    def test_cold_imports_stay_light(self):
+        results = import_times(["shovels_engine.simulation", "shovels_backend.auth"], repeat=1)
+        engine, auth = results["shovels_engine.simulation"], results["shovels_backend.auth"]
+        self.assertGreater(engine["min_ms"], 0)
+        self.assertFalse({"pydantic", "asyncio", "sqlite3", "multiprocessing", "numpy"} & set(engine["heavy"]))
+        self.assertFalse({"authlib", "jose", "cryptography"} & set(auth["heavy"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import WebSocket
+from shovels_backend.manager import GameRoomManager
+from shovels_engine.agents import Agent
+from shovels_engine.engine import get_current_player
+
+@pytest.mark.asyncio
+async def test_bot_only_room_plays_to_completion():
+    manager = GameRoomManager()
+    room = manager.create_room("Bot Room")
+    room.add_bot()
+    room.add_bot()
+
+    # A watching human socket receives every bot move
+    ws = AsyncMock(spec=WebSocket)
+    room.connections["watcher"] = ws
+
+    await room.start_game()
+
+    assert room.state.is_over
+    assert ws.send_text.call_count > 1
+
+@pytest.mark.asyncio
+async def test_bot_replies_after_human_turn():
+    manager = GameRoomManager()
+    room = manager.create_room("Mixed Room")
+    manager.join_room(room.room_id, "human", "Human")
+    bot_id = room.add_bot()
+
+    await room.start_game()
+    # Human joined first, so they open Phase 1
+    assert get_current_player(room.state).id == "human"
+
+    await room.apply_action("human", "draw", {"sources": ["DECK", "DECK"]})
+    await room.apply_action("human", "discard", {"card_index": 0})
+    hand = room.state.players[0].hand
+    target = 0 if not hand[0].is_face else len(room.state.players[0].characters)
+    if target >= room.state.max_characters:
+        target = 0
+    await room.apply_action("human", "play", {"card_index": 0, "character_index": target})
+
+    # The bot took its whole turn in-process and handed control back
+    assert get_current_player(room.state).id == "human"
+    assert any(e["player_id"] == bot_id for e in room.state.events)
+
+def test_bots_do_not_keep_room_alive():
+    manager = GameRoomManager()
+    room = manager.create_room("Lonely")
+    room.add_bot()
+    assert room.is_empty()
+
+def test_room_caps_bots():
+    manager = GameRoomManager()
+    room = manager.create_room("Full")
+    for _ in range(4):
+        room.add_bot()
+    with pytest.raises(ValueError):
+        room.add_bot()
+
+class _StuckAgent(Agent):
+    def act(self, state, player_id):
+        pass
+
+@pytest.mark.asyncio
+async def test_stuck_bot_passes_its_turn():
+    manager = GameRoomManager()
+    room = manager.create_room("Stuck")
+    manager.join_room(room.room_id, "human", "Human")
+    room.add_bot(_StuckAgent())
+    ws = AsyncMock(spec=WebSocket)
+    room.connections["human"] = ws
+
+    await room.start_game()
+    room.state.current_turn_index = 1
+    turn = room.state.turn_count
+    await room.run_bots()
+    # The seat played legal moves for the bot until the human was on turn again
+    assert get_current_player(room.state).id == "human"
+    assert room.state.turn_count == turn + 1
+    assert ws.send_text.call_count > 1
+
+def test_only_the_host_adds_bots():
+    manager = GameRoomManager()
+    room = manager.create_room("Hosted")
+    manager.join_room(room.room_id, "host", "Host")
+    manager.join_room(room.room_id, "guest", "Guest")
+    with pytest.raises(ValueError):
+        room.add_bot(requested_by="guest")
+    room.add_bot(requested_by="host")
+    assert len(room.bots) == 1
+
+    # The host left the lobby: the next human seat takes over
+    room.disconnect("host")
+    assert room.host_id == "guest"
+    room.add_bot(requested_by="guest")
+    assert len(room.bots) == 2
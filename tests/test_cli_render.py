@@ -0,0 +1,114 @@
+import contextlib
+import io
+import re
+import unittest
+from shovels_engine.agents import RandomAgent
+from shovels_engine.cli_utils import BoardRenderer, board_lines, print_state
+from shovels_engine.engine import get_current_player
+from shovels_engine.simulation import new_game
+
+CSI = re.compile(r"\x1b\[([0-9;]*)([A-Za-z])")
+
+class Terminal:
+    """Just enough of a VT100 to replay BoardRenderer frames."""
+    def __init__(self):
+        self.rows = []
+        self.row = self.col = 0
+
+    def _put(self, text):
+        for ch in text:
+            if ch == "\n":
+                self.row, self.col = self.row + 1, 0
+                continue
+            while len(self.rows) <= self.row:
+                self.rows.append("")
+            line = self.rows[self.row].ljust(self.col)
+            self.rows[self.row] = line[:self.col] + ch + line[self.col + 1:]
+            self.col += 1
+
+    def feed(self, data):
+        pos = 0
+        for m in CSI.finditer(data):
+            self._put(data[pos:m.start()])
+            pos = m.end()
+            args, cmd = m.group(1), m.group(2)
+            if cmd == "H":
+                row, col = (args.split(";") + ["1"])[:2] if args else ("1", "1")
+                self.row, self.col = int(row) - 1, int(col) - 1
+            elif cmd == "J" and args == "2":
+                self.rows = []
+            elif cmd == "J":
+                self.rows = self.rows[:self.row] + ([self.rows[self.row][:self.col]] if self.row < len(self.rows) else [])
+            elif cmd == "K" and self.row < len(self.rows):
+                self.rows[self.row] = self.rows[self.row][:self.col]
+        self._put(data[pos:])
+
+    def screen(self):
+        rows = list(self.rows)
+        while rows and rows[-1] == "":
+            rows.pop()
+        return rows
+
+def _strip(lines):
+    lines = list(lines)
+    while lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+class TestBoardRenderer(unittest.TestCase):
+    def setUp(self):
+        self.state = new_game(["p1", "p2", "p3"], seed=4)
+        self.agent = RandomAgent()
+
+    def step(self):
+        self.agent.act(self.state, get_current_player(self.state).id)
+
+    def test_plain_frames_match_print_state(self):
+        out = io.StringIO()
+        renderer = BoardRenderer(out, ansi=False)
+        for _ in range(5):
+            renderer.draw(self.state)
+            self.step()
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            print_state(self.state)
+        renderer.draw(self.state)
+        self.assertTrue(out.getvalue().endswith(printed.getvalue()))
+
+    def test_incremental_frames_reproduce_the_board(self):
+        renderer = BoardRenderer(io.StringIO(), ansi=True)
+        terminal = Terminal()
+        events = []
+        while not self.state.is_over:
+            if self.state.turn_count % 5 == 0:
+                events = [f"turn {self.state.turn_count}"] + events[:3]
+            terminal.feed(renderer.frame(self.state, events))
+            expected = board_lines(self.state) + (["", "RECENT EVENTS:"] + [f"  {e}" for e in events] if events else [])
+            self.assertEqual(terminal.screen(), _strip(expected))
+            self.step()
+
+    def test_only_changed_lines_are_rewritten(self):
+        renderer = BoardRenderer(io.StringIO(), ansi=True)
+        first = renderer.frame(self.state)
+        self.assertTrue(first.startswith("\x1b[2J"))
+        idle = renderer.frame(self.state)
+        self.assertEqual(CSI.sub("", idle), "")
+
+        self.step()
+        update = renderer.frame(self.state)
+        self.assertLess(len(update), len(first) / 2)
+
+    def test_unchanged_components_are_reused(self):
+        renderer = BoardRenderer(io.StringIO(), ansi=True)
+        renderer.frame(self.state)
+        shop = renderer._cache["shop"][1]
+        others = [renderer._cache[f"player:{i}"][1] for i in (1, 2)]
+        # The first player drawing changes their hand, not the shop or the other players
+        self.step()
+        renderer.frame(self.state)
+        self.assertIs(renderer._cache["shop"][1], shop)
+        for i, lines in zip((1, 2), others):
+            self.assertIs(renderer._cache[f"player:{i}"][1], lines)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import numpy as np
+import pytest
+from shovels_engine.actions import apply_action, legal_actions
+from shovels_engine.agents import RandomAgent
+from shovels_engine.dataset import (ACTION_SPACE, OBS_FIELDS, OBS_SIZE, ShardDataset, build_dataset, card_code,
+                                    encode_observation, record_samples)
+from shovels_engine.engine import get_current_player
+from shovels_engine.models import clone_state
+from shovels_engine.records import ShuffleRng, iter_records, simulate_records, write_records
+from shovels_engine.simulation import new_game
+
+def _offset(name):
+    offset = 0
+    for field, width in OBS_FIELDS:
+        if field == name:
+            return offset
+        offset += width
+    raise KeyError(name)
+
+@pytest.fixture(scope="module")
+def records_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("records") / "games.shvr")
+    write_records(path, simulate_records(6, players=3, agents=["random", "heuristic"], seed=0))
+    write_records(path, simulate_records(4, players=2, seed=50))
+    return path
+
+def test_legal_actions_encode_and_decode():
+    state = new_game(["a", "b", "c"], seed=2)
+    agent = RandomAgent()
+    while not state.is_over:
+        player_id = get_current_player(state).id
+        actions = legal_actions(state, player_id)
+        indices = [ACTION_SPACE.encode(state, player_id, a) for a in actions]
+        assert min(indices) >= 0
+        assert len(set(indices)) == len(indices)
+        for action, index in zip(actions[:8], indices):
+            direct, decoded = clone_state(state), clone_state(state)
+            # Same shuffles (Spades taps) on both copies
+            for copy in (direct, decoded):
+                copy._rng = ShuffleRng(index)
+            apply_action(direct, player_id, *action)
+            apply_action(decoded, player_id, *ACTION_SPACE.decode(state, player_id, index))
+            assert decoded.to_dict() == direct.to_dict()
+        agent.act(state, player_id)
+
+def test_observation_is_actor_relative():
+    state = new_game(["a", "b"], seed=4)
+    apply_action(state, "a", "draw", {"sources": ["DECK", "DECK"]})
+    obs = encode_observation(state, "a")
+    assert obs.shape == (OBS_SIZE,) and obs.dtype == np.int16
+    hand = _offset("hand")
+    assert list(obs[hand:hand + 2]) == [card_code(c) for c in state.players[0].hand]
+    # b sees its own (empty) hand in the same slots, and only a's hand size
+    theirs = encode_observation(state, "b")
+    assert not theirs[hand:hand + 4].any()
+    assert not np.array_equal(obs, theirs)
+
+def test_build_is_deterministic_across_workers(records_file, tmp_path):
+    serial = build_dataset([records_file], str(tmp_path / "serial"), shards=3, workers=1, chunk_size=100)
+    parallel = build_dataset([records_file], str(tmp_path / "parallel"), shards=3, workers=2, chunk_size=100)
+    assert [e["chunks"] for e in serial["shards"]] == [e["chunks"] for e in parallel["shards"]]
+    assert sum(e["games"] for e in serial["shards"]) == 10
+    for entry in serial["shards"]:
+        for chunk in entry["chunks"]:
+            for field in ("obs", "action", "legal", "game"):
+                name = f"{chunk['name']}.{field}.npy"
+                a = np.load(os.path.join(tmp_path / "serial", name))
+                b = np.load(os.path.join(tmp_path / "parallel", name))
+                assert np.array_equal(a, b)
+
+def test_dataset_batches(records_file, tmp_path):
+    manifest = build_dataset([records_file], str(tmp_path / "data"), shards=2, chunk_size=200)
+    data = ShardDataset(str(tmp_path / "data"))
+    samples = sum(e["samples"] for e in manifest["shards"])
+    assert len(data) == samples > 0
+    seen = 0
+    for obs, action, mask, outcome in data.batches(64, seed=1):
+        assert obs.shape[1] == OBS_SIZE and mask.shape[1] == len(ACTION_SPACE)
+        assert mask[np.arange(len(action)), action].all()
+        assert set(np.unique(outcome)) <= {-1, 0, 1}
+        seen += len(action)
+    assert seen == samples
+    first = [a for _, a, _, _ in data.batches(64, seed=7)]
+    again = [a for _, a, _, _ in data.batches(64, seed=7)]
+    assert all(np.array_equal(x, y) for x, y in zip(first, again))
+
+def test_agent_filter_keeps_their_seats(records_file):
+    record = next(iter_records(records_file))
+    seats = {seat for *_, seat in record_samples(record, agents=["heuristic"])}
+    assert seats == {i for i, name in enumerate(record.meta["agents"]) if name == "heuristic"}
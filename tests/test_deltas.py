@@ -0,0 +1,83 @@
+import json
+import random
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import WebSocket
+from shovels_backend.deltas import StateHistory, apply_delta, diff
+from shovels_backend.manager import GameRoomManager
+from shovels_engine.actions import apply_action, legal_actions
+from shovels_engine.models import setup_game
+
+def _roundtrip(value):
+    return json.loads(json.dumps(value))
+
+def test_diff_ops():
+    old = {"a": 1, "pile": [1, 2, 3], "log": [1], "gone": True, "nested": {"x": [1, 2]}}
+    new = {"a": 2, "pile": [1, 2], "log": [1, 2, 3], "nested": {"x": [1, 5]}, "added": None}
+    ops = diff(old, new)
+    assert ["truncate", ["pile"], 2] in ops
+    assert ["extend", ["log"], [2, 3]] in ops
+    assert ["del", ["gone"], None] in ops
+    assert ["set", ["nested", "x", 1], 5] in ops
+    assert apply_delta(_roundtrip(old), _roundtrip(ops)) == new
+    assert diff(new, new) == []
+
+def test_history_replays_a_game():
+    random.seed(3)
+    state = setup_game(["p1", "p2"], {"p1": "One", "p2": "Two"})
+    history = StateHistory(maxlen=1000)
+    snapshots = [_roundtrip(state.to_dict())]
+    history.record(snapshots[0])
+    for _ in range(150):
+        if state.is_over:
+            break
+        pid = state.players[state.current_turn_index].id
+        apply_action(state, pid, *random.choice(legal_actions(state, pid)))
+        snapshots.append(_roundtrip(state.to_dict()))
+        history.record(snapshots[-1])
+
+    latest = snapshots[-1]
+    for version in (1, 10, len(snapshots) - 1, len(snapshots)):
+        ops = history.since(version)
+        assert apply_delta(_roundtrip(snapshots[version - 1]), _roundtrip(ops)) == latest
+
+def test_history_forgets_old_versions():
+    history = StateHistory(maxlen=3)
+    for n in range(10):
+        history.record({"n": n})
+    assert history.version == 10
+    assert history.since(10) == []
+    assert history.since(7) == [["set", ["n"], 7], ["set", ["n"], 8], ["set", ["n"], 9]]
+    assert history.since(6) is None
+    assert history.since(11) is None
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_from_version():
+    manager = GameRoomManager()
+    room = manager.create_room("Resume")
+    manager.join_room(room.room_id, "p1", "One")
+    manager.join_room(room.room_id, "p2", "Two")
+    ws = AsyncMock(spec=WebSocket)
+    await room.connect(ws, "p1")
+    await room.start_game()
+
+    seen = json.loads(ws.send_text.call_args.args[0])
+    assert seen["type"] == "state_update"
+    room.disconnect("p1")
+
+    current = room.state.players[room.state.current_turn_index].id
+    await room.apply_action(current, "draw", {"sources": ["DECK", "DECK"]})
+
+    again = AsyncMock(spec=WebSocket)
+    await room.connect(again, "p1", version=seen["version"])
+    message = again.send_json.call_args.args[0]
+    assert message["type"] == "state_delta"
+    assert message["from_version"] == seen["version"]
+    assert message["version"] == seen["version"] + 1
+    resumed = apply_delta(_roundtrip(seen["state"]), _roundtrip(message["ops"]))
+    assert resumed == _roundtrip(room.state.to_dict())
+
+    # Unknown versions fall back to the full state
+    fresh = AsyncMock(spec=WebSocket)
+    await room.connect(fresh, "p2", version=999)
+    assert fresh.send_json.call_args.args[0]["type"] == "state_update"
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from shovels_engine.agents import RandomAgent
+from shovels_engine.models import clone_state
+from shovels_engine.engine import get_current_player
+from shovels_engine.simulation import play_game, new_game
+from shovels_engine.events import (
+    EventBus, MemorySink, JsonlSink, SqliteSink, AsyncQueueSink, BackgroundSink, read_jsonl,
+)
+
+def _agents():
+    return {"p1": RandomAgent(), "p2": RandomAgent()}
+
+class TestEventBus(unittest.TestCase):
+    def test_memory_sink_sees_the_same_events(self):
+        sink = MemorySink()
+        state = play_game(_agents(), seed=4, bus=EventBus([sink]))
+        self.assertEqual(len(sink.records), len(state.events))
+        self.assertEqual(sink.records[-1]["event_type"], "GAME_OVER")
+        self.assertTrue(all(r["game_id"] == "4" for r in sink.records))
+
+    def test_streaming_without_retaining(self):
+        sink = MemorySink()
+        state = play_game(_agents(), seed=4, bus=EventBus([sink], retain=False))
+        self.assertEqual(state.events, [])
+        self.assertGreater(len(sink.records), 0)
+
+    def test_clones_are_not_attached(self):
+        sink = MemorySink()
+        state = new_game(["p1", "p2"], seed=1, bus=EventBus([sink]))
+        clone = clone_state(state)
+        RandomAgent().act(clone, get_current_player(clone).id)
+        self.assertEqual(len(sink.records), 0)
+
+    def test_file_sinks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl, db = os.path.join(tmp, "events.jsonl"), os.path.join(tmp, "events.db")
+            bus = EventBus([BackgroundSink(JsonlSink(jsonl, batch_size=7)), SqliteSink(db, batch_size=50)],
+                           retain=False)
+            for seed in range(3):
+                play_game(_agents(), seed=seed, bus=bus, game_id=f"g{seed}")
+            bus.close()
+
+            records = list(read_jsonl(jsonl))
+            self.assertEqual({r["game_id"] for r in records}, {"g0", "g1", "g2"})
+            with sqlite3.connect(db) as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM events").fetchone()[0], len(records))
+                over = conn.execute("SELECT COUNT(*) FROM events WHERE event_type = 'GAME_OVER'").fetchone()[0]
+            self.assertEqual(over, 3)
+
+    def test_async_queue_drops_oldest_when_full(self):
+        async def run():
+            sink = AsyncQueueSink(maxsize=2)
+            for i in range(5):
+                sink.write({"i": i})
+            return sink.dropped, [sink.queue.get_nowait()["i"] for _ in range(2)]
+        self.assertEqual(asyncio.run(run()), (3, [3, 4]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from shovels_engine.models import GameState, Card, Player, Character, Suit, clone_state
+from shovels_engine.engine import get_current_player, can_player_act, attack_heart
+from shovels_engine.exposure import exposure, invalidate_exposure, ExposureSummary
+from shovels_engine.agents import RandomAgent
+from shovels_engine.simulation import new_game
+
+def _counts(summary):
+    return summary.vulnerable_total, {pid: (e.stacked, e.untapped, e.vulnerable) for pid, e in summary.players.items()}
+
+class TestExposure(unittest.TestCase):
+    def _state(self):
+        p1 = Player(id="p1", name="P1", characters=[Character(rank="J", suit=Suit.CLUBS, is_tapped=True)])
+        p2 = Player(id="p2", name="P2", characters=[
+            Character(rank="Q", suit=Suit.SPADES, stack=[Card(rank=4, suit=Suit.HEARTS)]),
+        ])
+        return GameState(players=[p1, p2], phase=2, turn_subphase="BATTLE_ACTION")
+
+    def test_tapped_exposed_face_needs_a_target(self):
+        state = self._state()
+        self.assertFalse(can_player_act(state, "p1"))
+        # Breaking p2's only Heart exposes their face: p1 can now strike it
+        attack_heart(state, "p1", "p2", 0, 10)
+        self.assertEqual(exposure(state).opponent_targets("p1"), 1)
+        self.assertTrue(can_player_act(state, "p1"))
+
+    def test_hand_edits_need_invalidation(self):
+        state = self._state()
+        self.assertFalse(can_player_act(state, "p1"))
+        state.players[0].characters[0].is_tapped = False
+        invalidate_exposure(state, state.players[0])
+        self.assertTrue(can_player_act(state, "p1"))
+
+    def test_clones_do_not_share_summary(self):
+        state = self._state()
+        exposure(state)
+        clone = clone_state(state)
+        attack_heart(clone, "p1", "p2", 0, 10)
+        self.assertEqual(exposure(state).opponent_targets("p1"), 0)
+        self.assertEqual(exposure(clone).opponent_targets("p1"), 1)
+
+    def test_summary_matches_rebuild_during_play(self):
+        agent = RandomAgent()
+        for seed in range(5):
+            state = new_game(["p1", "p2", "p3"], seed)
+            exposure(state)
+            while not state.is_over:
+                agent.act(state, get_current_player(state).id)
+                self.assertEqual(_counts(exposure(state)), _counts(ExposureSummary(state)))
+
+if __name__ == "__main__":
+    unittest.main()
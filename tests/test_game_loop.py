@@ -1,6 +1,7 @@
 import unittest
-from shovels_engine.models import GameState, Card, Player, Character, Suit
+from shovels_engine.models import GameState, Card, Player, Character, Suit, setup_game
 from shovels_engine.engine import end_turn, can_player_act, check_win_condition
+from shovels_engine.actions import apply_action
 
 class TestGameLoop(unittest.TestCase):
     def test_can_player_act_with_stack(self):
@@ -80,5 +81,33 @@ class TestGameLoop(unittest.TestCase):
         event_types = [e['event_type'] for e in state.events]
         self.assertIn("PLAY_CARD", event_types)
 
+    def test_end_only_leaves_the_shop_or_passes(self):
+        state = setup_game(["p1", "p2"])
+        with self.assertRaises(ValueError):
+            apply_action(state, "p1", "end")  # skipping the draw
+        self.assertEqual((state.current_turn_index, state.turn_subphase), (0, "DRAW"))
+
+        p1 = Player(id="p1", name="P1", characters=[Character(rank="K", suit=Suit.SPADES)])
+        p2 = Player(id="p2", name="P2", characters=[Character(rank="J", suit=Suit.HEARTS, stack=[Card(rank=4, suit=Suit.HEARTS)])])
+        state = GameState(players=[p1, p2], phase=2, turn_subphase="BATTLE_ACTION",
+                          active_character_index=0, dug_cards=[Card(rank=3, suit=Suit.DIAMONDS)])
+        with self.assertRaises(ValueError):
+            apply_action(state, "p1", "end")  # walking off with the dug card
+        self.assertEqual(len(state.dug_cards), 1)
+
+        state.turn_subphase = "SHOPPING"
+        apply_action(state, "p1", "end")
+        self.assertEqual(state.current_turn_index, 1)
+
+    def test_unresolved_dig_cards_are_discarded(self):
+        p1 = Player(id="p1", name="P1", characters=[Character(rank="K", suit=Suit.SPADES)])
+        p2 = Player(id="p2", name="P2", characters=[Character(rank="J", suit=Suit.HEARTS, stack=[Card(rank=4, suit=Suit.HEARTS)])])
+        dug, pool = [Card(rank=3, suit=Suit.DIAMONDS)], [Card(rank=5, suit=Suit.CLUBS), Card(rank=6, suit=Suit.SPADES)]
+        state = GameState(players=[p1, p2], phase=2, turn_subphase="SHOPPING", action_taken_this_turn=True,
+                          dug_cards=list(dug), gravedig_pool=list(pool))
+        end_turn(state)
+        self.assertEqual((state.dug_cards, state.gravedig_pool), ([], []))
+        self.assertEqual(state.discard_pile, dug + pool)
+
 if __name__ == '__main__':
     unittest.main()
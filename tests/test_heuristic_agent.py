@@ -0,0 +1,59 @@
+import unittest
+import random
+from shovels_engine.models import GameState, Card, Player, Character, Suit, setup_game
+from shovels_engine.engine import get_current_player
+from shovels_engine.agents import RandomAgent, HeuristicAgent, attack_outcome, CARD_VALUE, SHOP_VALUE
+from shovels_engine.mcts import MCTSAgent
+
+class TestHeuristicAgent(unittest.TestCase):
+    def test_tables_cover_every_card(self):
+        # 4 suits x (9 numbers + ace + 3 faces)
+        self.assertEqual(len(CARD_VALUE), 52)
+        self.assertEqual(CARD_VALUE.keys(), SHOP_VALUE.keys())
+
+    def test_attack_outcome_matches_attack_heart(self):
+        char = Character(rank="Q", suit=Suit.SPADES, stack=[
+            Card(rank=7, suit=Suit.HEARTS), Card(rank=3, suit=Suit.CLUBS), Card(rank=9, suit=Suit.HEARTS)
+        ])
+        self.assertEqual(attack_outcome(char, 9), ("BREAK", 1))
+        # Only the topmost Heart is compared: it holds, so the weaker 7 below is safe
+        self.assertEqual(attack_outcome(char, 8), ("ABSORB", 0))
+        self.assertEqual(attack_outcome(char, 6), ("ABSORB", 0))
+        self.assertEqual(attack_outcome(Character(rank="J", suit=Suit.CLUBS), 1), ("KILL", 0))
+
+    def test_prefers_killing_strike(self):
+        p1 = Player(id="p1", name="P1", characters=[
+            Character(rank="J", suit=Suit.CLUBS, stack=[], is_tapped=True)
+        ])
+        p2 = Player(id="p2", name="P2", characters=[
+            Character(rank="K", suit=Suit.HEARTS, stack=[Card(rank=10, suit=Suit.HEARTS)]),
+            Character(rank="Q", suit=Suit.SPADES, stack=[]),
+        ])
+        state = GameState(players=[p1, p2], phase=2, turn_subphase="BATTLE_ACTION")
+        action = HeuristicAgent().choose_action(state, "p1")
+        self.assertEqual(action, ("strike", {"char_index": 0, "target_player_id": "p2", "target_char_index": 1}))
+
+    def test_beats_random_agent(self):
+        wins = 0
+        for seed in range(20):
+            random.seed(seed)
+            ids = ["h", "r"] if seed % 2 else ["r", "h"]
+            state = setup_game(ids)
+            agents = {"h": HeuristicAgent(), "r": RandomAgent()}
+            steps = 0
+            while not state.is_over and steps < 3000:
+                pid = get_current_player(state).id
+                agents[pid].act(state, pid)
+                steps += 1
+            wins += state.winner_id == "h"
+        self.assertGreaterEqual(wins, 14)
+
+    def test_usable_as_rollout_policy(self):
+        random.seed(3)
+        state = setup_game(["p1", "p2"])
+        agent = MCTSAgent(iterations=5, rollout_policy=HeuristicAgent(), seed=3)
+        agent.act(state, get_current_player(state).id)
+        self.assertEqual(state.turn_subphase, "DISCARD")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import asyncio
+import socket
+import pytest
+from shovels_backend.loadtest import percentiles, fan_out_times, start_server, run_load, ProcessSampler
+
+def test_percentiles():
+    stats = percentiles([i / 1000 for i in range(1, 101)])
+    assert stats["p50"] == 50.0
+    assert stats["p99"] == 99.0
+    assert stats["max"] == 100.0
+    assert percentiles([])["p50"] is None
+
+def test_fan_out_is_receive_spread():
+    receipts = [[1.0, 2.0, 3.0], [1.5, 2.1], [1.2, 2.4, 3.0]]
+    assert fan_out_times(receipts) == pytest.approx([0.5, 0.4])
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_load_run_plays_full_games():
+    port = _free_port()
+    server = start_server(port)
+    try:
+        report = asyncio.run(run_load(f"http://127.0.0.1:{port}", rooms=2, players=2, concurrency=2,
+                                      timeout=120, sampler=ProcessSampler(server.pid)))
+    finally:
+        server.terminate()
+        server.wait()
+    assert report["finished_games"] == 2
+    assert report["errors"] == 0
+    assert report["action_rtt_ms"]["p50"] > 0
+    assert report["broadcast_fan_out_ms"]["max"] is not None
@@ -0,0 +1,50 @@
+import io
+import json
+import logging
+import queue
+import pytest
+from shovels_backend.logs import DroppingQueueHandler, JsonFormatter, SamplingFilter, setup_logging
+
+def _record(msg="event", **extra):
+    record = logging.LogRecord("shovels.test", logging.INFO, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_records_carry_extra_fields():
+    line = JsonFormatter().format(_record("action", room_id="r1", user_id="u1", latency_ms=1.5, sampled=True))
+    entry = json.loads(line)
+    assert entry["event"] == "action" and entry["level"] == "INFO"
+    assert entry["room_id"] == "r1" and entry["user_id"] == "u1" and entry["latency_ms"] == 1.5
+    assert "sampled" not in entry and "lineno" not in entry
+
+def test_sampling_only_applies_to_marked_records():
+    sampler = SamplingFilter(0.1, seed=1)
+    kept = sum(sampler.filter(_record(sampled=True)) for _ in range(2000))
+    assert 100 < kept < 300
+    assert all(sampler.filter(_record()) for _ in range(100))
+    with pytest.raises(ValueError):
+        SamplingFilter(2.0)
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(_record())
+    assert handler.dropped == 3
+
+def test_setup_logging_writes_json_off_thread():
+    stream = io.StringIO()
+    listener = setup_logging("INFO", stream=stream)
+    try:
+        log = logging.getLogger("shovels.test")
+        log.debug("hidden")
+        log.info("joined %s", "room", extra={"room_id": "abc"})
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            log.exception("failed")
+    finally:
+        listener.stop()
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e["event"] for e in entries] == ["joined room", "failed"]
+    assert entries[0]["room_id"] == "abc"
+    assert "RuntimeError: boom" in entries[1]["exc"]
@@ -0,0 +1,128 @@
+import gc
+import os
+import tempfile
+import unittest
+import random
+import time
+from shovels_engine.models import setup_game
+from shovels_engine.engine import get_current_player
+from shovels_engine.actions import legal_actions, apply_action, action_key
+from shovels_engine.agents import RandomAgent
+from shovels_engine.events import EventBus, JsonlSink
+from shovels_engine.simulation import new_game
+from shovels_engine.mcts import MCTSAgent, determinize
+
+class TestLegalActions(unittest.TestCase):
+    def test_random_legal_play_never_raises(self):
+        for seed in range(20):
+            random.seed(seed)
+            state = setup_game(["p1", "p2", "p3"])
+            steps = 0
+            while not state.is_over and steps < 3000:
+                pid = get_current_player(state).id
+                apply_action(state, pid, *random.choice(legal_actions(state, pid)))
+                steps += 1
+            self.assertTrue(state.is_over)
+
+    def test_off_turn_player_has_no_actions(self):
+        state = setup_game(["p1", "p2"])
+        self.assertEqual(legal_actions(state, "p2"), [])
+
+class TestMCTS(unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.state = setup_game(["p1", "p2"])
+
+    def test_determinize_keeps_observer_view(self):
+        agent = RandomAgent()
+        for _ in range(10):
+            agent.act(self.state, get_current_player(self.state).id)
+        det = determinize(self.state, "p1", random.Random(0))
+
+        self.assertEqual([c.uid for c in det.players[0].hand], [c.uid for c in self.state.players[0].hand])
+        self.assertEqual(len(det.deck), len(self.state.deck))
+        self.assertEqual(len(det.players[1].hand), len(self.state.players[1].hand))
+        hidden = lambda s: sorted(c.uid for c in s.deck + s.shop_pile + s.players[1].hand)
+        self.assertEqual(hidden(det), hidden(self.state))
+        # The real game is untouched
+        det.deck.clear()
+        self.assertTrue(self.state.deck)
+
+    def test_choose_action_is_legal(self):
+        agent = MCTSAgent(iterations=20, seed=1)
+        pid = get_current_player(self.state).id
+        action = agent.choose_action(self.state, pid)
+        legal = [action_key(a) for a in legal_actions(self.state, pid)]
+        self.assertIn(action_key(action), legal)
+
+    def test_time_budget(self):
+        agent = MCTSAgent(time_limit=0.2, seed=1)
+        start = time.perf_counter()
+        agent.choose_action(self.state, get_current_player(self.state).id)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_tree_reused_within_turn(self):
+        agent = MCTSAgent(iterations=30, seed=1)
+        pid = get_current_player(self.state).id
+        apply_action(self.state, pid, "draw", {"sources": ["DECK", "DECK"]})
+        agent.act(self.state, pid)  # DISCARD, searched
+        self.assertEqual(self.state.turn_subphase, "PLAY")
+        turn, subtree = agent._reusable[pid]
+        self.assertEqual(turn, self.state.turn_count)
+        self.assertGreater(subtree.visits, 0)
+        self.assertIs(agent._take_root(self.state, pid), subtree)
+
+    def test_plays_full_game(self):
+        agents = {"p1": MCTSAgent(iterations=5, seed=2), "p2": RandomAgent()}
+        steps = 0
+        while not self.state.is_over and steps < 2000:
+            pid = get_current_player(self.state).id
+            agents[pid].act(self.state, pid)
+            steps += 1
+        self.assertTrue(self.state.is_over)
+
+    def test_seed_makes_search_reproducible(self):
+        pid = get_current_player(self.state).id
+        apply_action(self.state, pid, "draw", {"sources": ["DECK", "DECK"]})
+        visits = []
+        for global_seed in (1, 2):
+            random.seed(global_seed)  # must not leak into a seeded search
+            agent = MCTSAgent(iterations=40, seed=5)
+            agent.choose_action(self.state, pid)
+            _, subtree = agent._reusable[pid]
+            visits.append([(k, c.visits, c.reward) for k, c in subtree.children.items()])
+        self.assertTrue(visits[0])
+        self.assertEqual(visits[0], visits[1])
+
+    def test_workers_search_a_game_streaming_events(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bus = EventBus([JsonlSink(os.path.join(tmp, "events.jsonl"))])
+            state = new_game(["p1", "p2"], seed=4, bus=bus)
+            agents = {"p1": MCTSAgent(iterations=8, workers=2, seed=1), "p2": RandomAgent()}
+            with agents["p1"]:
+                for _ in range(30):
+                    pid = get_current_player(state).id
+                    agents[pid].act(state, pid)
+            bus.close()
+        self.assertGreater(len(state.events), 0)
+
+    def test_worker_pool_is_shut_down(self):
+        pid = get_current_player(self.state).id
+        apply_action(self.state, pid, "draw", {"sources": ["DECK", "DECK"]})
+        with MCTSAgent(iterations=10, workers=2, seed=1) as agent:
+            agent.choose_action(self.state, pid)
+            pool = agent._executor
+            self.assertIsNotNone(pool)
+        self.assertIsNone(agent._executor)
+        self.assertTrue(pool._shutdown_thread)
+
+        # An agent nobody closes still takes its pool down when it is collected
+        agent = MCTSAgent(iterations=10, workers=2, seed=1)
+        agent.choose_action(self.state, pid)
+        pool = agent._executor
+        del agent
+        gc.collect()
+        self.assertTrue(pool._shutdown_thread)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import WebSocket
+from fastapi.testclient import TestClient
+from shovels_backend.metrics import Registry, ACTION_SECONDS, ACTION_ERRORS, BROADCAST_BYTES
+from shovels_backend.manager import GameRoomManager
+from shovels_backend.main import app
+
+def test_histogram_rendering():
+    registry = Registry()
+    hist = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), labelnames=("kind",))
+    hist.labels("a").observe(0.05)
+    hist.labels("a").observe(0.1)
+    hist.labels("a").observe(5)
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{kind="a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{kind="a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{kind="a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{kind="a"} 3' in text
+
+def test_gauge_reads_callback_and_escapes_labels():
+    registry = Registry()
+    gauge = registry.gauge("things", "Things.", labelnames=("name",))
+    gauge.set_function(lambda: {('say "hi"',): 2})
+    assert 'things{name="say \\"hi\\""} 2' in registry.render()
+    with pytest.raises(ValueError):
+        registry.gauge("things", "Again.")
+    with pytest.raises(ValueError):
+        registry.counter("other", "Other.", labelnames=("a",)).labels("x", "y")
+
+@pytest.mark.asyncio
+async def test_room_records_actions_and_broadcasts():
+    manager = GameRoomManager()
+    room = manager.create_room("Metered")
+    manager.join_room(room.room_id, "p1", "One")
+    manager.join_room(room.room_id, "p2", "Two")
+    await room.connect(AsyncMock(spec=WebSocket), "p1")
+    await room.start_game()
+
+    draws = ACTION_SECONDS.labels("draw").count
+    sent = BROADCAST_BYTES.count
+    current = room.state.players[room.state.current_turn_index].id
+    await room.apply_action(current, "draw", {"sources": ["DECK", "DECK"]})
+    assert ACTION_SECONDS.labels("draw").count == draws + 1
+    assert BROADCAST_BYTES.count == sent + 1
+
+    errors = ACTION_ERRORS.labels("unknown").value
+    with pytest.raises(ValueError):
+        await room.apply_action(current, "no_such_action", {})
+    assert ACTION_ERRORS.labels("unknown").value == errors + 1
+    assert ("no_such_action",) not in ACTION_SECONDS._children
+
+def test_metrics_endpoint():
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ("shovels_action_seconds", "shovels_broadcast_serialize_seconds", "shovels_broadcast_bytes",
+                 "shovels_ws_send_seconds", "shovels_ws_connections", "shovels_rooms",
+                 "shovels_event_loop_lag_seconds"):
+        assert f"# TYPE {name} " in response.text
+    assert 'shovels_rooms{state="lobby"}' in response.text
+    assert 'shovels_ws_connections{kind="spectator"}' in response.text
@@ -1,6 +1,9 @@
 import unittest
 import json
-from shovels_engine.models import Suit, Card, Character, Player, GameState, initialize_full_pool, setup_game
+from shovels_engine.models import Suit, Card, Character, Player, GameState, initialize_full_pool, setup_game, face_card, CARDS_BY_UID
+from shovels_engine.models import CARD_POOL, game_from_deal
+from shovels_engine.rules import RuleSet
+from shovels_engine.engine import buy_card
 
 class TestModels(unittest.TestCase):
     def test_deck_initialization(self):
@@ -32,14 +35,58 @@ class TestModels(unittest.TestCase):
         state = setup_game(player_ids)
         
         # Serialize
-        json_data = state.model_dump_json()
+        json_data = json.dumps(state.to_dict())
         self.assertIsInstance(json_data, str)
         
         # Deserialize
-        new_state = GameState.model_validate_json(json_data)
+        new_state = GameState.from_dict(json.loads(json_data))
         self.assertEqual(new_state.players[0].id, "p1")
         self.assertEqual(len(new_state.players[0].characters), 3)
         self.assertEqual(len(new_state.deck), 104 - 3 - 20)
 
+    def test_undealable_setups_rejected(self):
+        # Built directly, so RuleSet.from_dict's checks don't get a say
+        with self.assertRaises(ValueError):
+            setup_game(["p1", "p2", "p3", "p4"], rules=RuleSet(starting_characters=7, max_characters=7))
+        with self.assertRaises(ValueError):
+            setup_game(["p1", "p2"], rules=RuleSet(shop_pile_size=200))
+
+    def test_deal_must_be_a_pool_permutation(self):
+        faces = [i for i, c in enumerate(CARD_POOL) if c.is_face]
+        numbers = [i for i, c in enumerate(CARD_POOL) if not c.is_face]
+        deal = faces + numbers
+        self.assertEqual(len(game_from_deal(["p1", "p2"], deal).deck), len(CARD_POOL) - 6 - 20)
+        for bad in (deal[:-1], deal[:-1] + [0], deal + [104], numbers + faces):
+            with self.subTest(bad[:3]), self.assertRaises(ValueError):
+                game_from_deal(["p1", "p2"], bad)
+
+    def test_cards_are_interned(self):
+        a, b = setup_game(["p1", "p2"]), setup_game(["p1", "p2"])
+        cards_a = {c.uid: c for c in a.deck + a.shop_pile}
+        for card in b.deck + b.shop_pile:
+            if card.uid in cards_a:
+                self.assertIs(card, cards_a[card.uid])
+        with self.assertRaises(Exception):
+            a.deck[0].rank = 3
+        # Every card is dealt exactly once
+        dealt = [c.uid for c in a.deck + a.shop_pile] + [ch.uid for p in a.players for ch in p.characters]
+        self.assertEqual(sorted(dealt), sorted(CARDS_BY_UID))
+
+    def test_upgrade_discards_the_pooled_face(self):
+        state = setup_game(["p1", "p2"])
+        state.phase, state.turn_subphase = 2, "SHOPPING"
+        char = state.players[0].characters[0]
+        old_face = face_card(char)
+        self.assertIs(old_face, CARDS_BY_UID[char.uid])
+        char.rank = "J"
+        old_face = face_card(char)  # no longer matches the pool card
+        self.assertEqual((old_face.face_rank, old_face.suit), ("J", char.suit))
+
+        king = next(c for c in CARDS_BY_UID.values() if c.face_rank == "K")
+        state.shop_row = [king]
+        buy_card(state, "p1", 0, 0, is_free=True)
+        self.assertEqual(char.uid, king.uid)
+        self.assertIs(face_card(char), king)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock
 from shovels_backend.manager import GameRoom, GameRoomManager
 from fastapi import WebSocket
@@ -31,15 +32,15 @@ async def test_lobby_join_broadcasts_update():
     await room.connect(ws2, "p2")
     
     # 5. Verify P1 received an update about P2 joining
-    # ws1.send_json should have been called with a message containing 2 players
+    # ws1 should have been sent a message containing 2 players
     
-    # Collect all calls to send_json for P1
-    p1_calls = ws1.send_json.call_args_list
+    # Collect all broadcasts to P1 (encoded once, sent as text)
+    p1_calls = ws1.send_text.call_args_list
     
     found_p2_update = False
     for call in p1_calls:
         args, _ = call
-        msg = args[0]
+        msg = json.loads(args[0])
         if msg.get("type") == "state_update" and "players" in msg.get("state", {}):
             players = msg["state"]["players"]
             if len(players) == 2:
@@ -51,11 +52,11 @@ async def test_lobby_join_broadcasts_update():
     assert found_p2_update, "Player 1 did not receive a lobby update with 2 players when Player 2 joined"
     
     # 6. Verify P2 received the initial state with 2 players as well
-    p2_calls = ws2.send_json.call_args_list
+    p2_calls = ws2.send_text.call_args_list
     found_initial_state = False
     for call in p2_calls:
         args, _ = call
-        msg = args[0]
+        msg = json.loads(args[0])
         if msg.get("type") == "state_update" and "players" in msg.get("state", {}):
             players = msg["state"]["players"]
             if len(players) == 2:
@@ -0,0 +1,46 @@
+import pytest
+from play_cli import main, play_headless
+
+def test_headless_games_are_reproducible():
+    first = play_headless(games=3, players=3, seed=7)
+    second = play_headless(games=3, players=3, seed=7)
+    assert first["unfinished"] == 0
+    assert sum(first["wins"].values()) + first["draws"] == 3
+    assert first["wins"] == second["wins"]
+    assert first["moves"] == second["moves"]
+    assert first["mean_turns"] == second["mean_turns"]
+
+def test_headless_cycles_agents_over_seats():
+    summary = play_headless(games=1, players=3, agents=["random", "heuristic"], seed=1)
+    assert summary["seats"] == {"p1": "random", "p2": "heuristic", "p3": "random"}
+
+def test_headless_renders_on_events_only(capsys):
+    play_headless(games=1, players=2, seed=3, events=["GAME_OVER"])
+    out = capsys.readouterr().out
+    assert out.count("GAME_OVER") == 1
+    assert "TURN_START" not in out
+    assert "SHOP ROW" not in out
+
+def test_headless_renders_every_n_turns(capsys):
+    summary = play_headless(games=1, players=2, seed=3, render_every=10)
+    out = capsys.readouterr().out
+    assert out.count("SHOP ROW") == int(summary["mean_turns"]) // 10
+
+def test_headless_rejects_bad_player_count():
+    with pytest.raises(ValueError):
+        play_headless(players=5)
+
+def test_main_prints_summary(capsys, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *a: pytest.fail("headless mode must not prompt"))
+    main(["--headless", "--games", "2", "--players", "4", "--seed", "5"])
+    out = capsys.readouterr().out
+    assert "HEADLESS SUMMARY" in out
+    assert "Games: 2" in out
+    assert "p4 (random)" in out
+
+def test_headless_watch_draws_every_move(capsys):
+    summary = play_headless(games=1, players=2, seed=3, watch=0)
+    out = capsys.readouterr().out
+    # stdout is not a terminal here, so every frame is printed in full
+    assert out.count("SHOP ROW") == summary["moves"]
+    assert "GAME_OVER" in out
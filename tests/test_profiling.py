@@ -0,0 +1,48 @@
+import pytest
+from shovels_engine import engine, stacks
+from shovels_engine.actions import ACTION_HANDLERS
+from shovels_engine.agents import RandomAgent
+from shovels_engine.profiling import EngineProfiler, profile_games, main
+from shovels_engine.simulation import play_game
+
+def test_profiler_counts_engine_calls():
+    profiler = profile_games(2, players=2, seed=5)
+    stats = profiler.stats
+    assert stats["end_turn"].calls > 0
+    assert stats["log_event"].calls > stats["end_turn"].calls
+    # Handlers reached through actions.ACTION_HANDLERS are counted too
+    assert stats["draw_cards"].calls > 0
+    for s in stats.values():
+        if s.calls:
+            assert s.self_time <= s.total + 1e-9
+            assert s.percentile(50) <= s.percentile(99)
+    assert "end_turn" in profiler.report()
+
+def test_disabled_profiler_leaves_engine_untouched():
+    originals = (engine.end_turn, engine.log_event, dict(ACTION_HANDLERS))
+    with EngineProfiler():
+        assert engine.end_turn is not originals[0]
+        assert ACTION_HANDLERS["draw"] is not originals[2]["draw"]
+    assert (engine.end_turn, engine.log_event, dict(ACTION_HANDLERS)) == originals
+
+def test_profiling_does_not_change_games():
+    plain = play_game({"a": RandomAgent(), "b": RandomAgent()}, seed=11)
+    with EngineProfiler((engine, stacks)):
+        profiled = play_game({"a": RandomAgent(), "b": RandomAgent()}, seed=11)
+    assert profiled.to_dict() == plain.to_dict()
+
+def test_only_one_profiler_at_a_time():
+    with EngineProfiler():
+        with pytest.raises(ValueError):
+            EngineProfiler().enable()
+
+def test_folded_stacks(tmp_path):
+    out = tmp_path / "engine.folded"
+    main(["--games", "1", "--players", "2", "--modules", "engine", "stacks", "--folded", str(out)])
+    lines = out.read_text().splitlines()
+    assert lines
+    for line in lines:
+        path, micros = line.rsplit(" ", 1)
+        assert int(micros) > 0
+        assert all(frame for frame in path.split(";"))
+    assert any(";stacks." in line for line in lines)
@@ -0,0 +1,133 @@
+import json
+import random
+import pytest
+from shovels_engine.actions import apply_action, legal_actions
+from shovels_engine.agents import HeuristicAgent, RandomAgent
+from shovels_engine.engine import get_current_player
+from shovels_engine.models import Suit, game_from_deal, setup_game
+from shovels_engine.records import (GameRecord, GameRecorder, RecordWriter, _decode_value, _encode_value,
+                                    deal_of, export_jsonl, import_jsonl, iter_records, record_game,
+                                    simulate_records, write_records)
+from shovels_backend.manager import GameRoomManager
+
+def _board(state):
+    return state.to_dict(exclude=("events",))
+
+def test_values_round_trip():
+    players = ["p1", "p2"]
+    value = {"sources": ["DECK", "DISCARD"], "n": [0, 95, 96, 300, -4], "flag": True, "off": False,
+             "none": None, "target_info": {"target_player_id": "p2", "target_char_index": 1},
+             "action_suit": Suit.CLUBS, "label": "héllo"}
+    out = bytearray()
+    _encode_value(out, value, {pid: i for i, pid in enumerate(players)})
+    decoded, end = _decode_value(out, 0, players)
+    assert decoded == value and end == len(out)
+    assert decoded["action_suit"] is Suit.CLUBS
+    with pytest.raises(ValueError):
+        _encode_value(bytearray(), {"x": 1.5}, {})
+
+def test_deal_round_trip():
+    random.seed(3)
+    state = setup_game(["a", "b", "c"])
+    assert game_from_deal(["a", "b", "c"], deal_of(state)).to_dict() == state.to_dict()
+    RandomAgent().act(state, "a")
+    state.turn_count += 1
+    with pytest.raises(ValueError):
+        deal_of(state)
+
+def test_recorded_game_replays_exactly():
+    record = record_game({"p1": RandomAgent(), "p2": HeuristicAgent(), "p3": RandomAgent()}, seed=11)
+    data = record.encode()
+    # Replaying doesn't depend on the global RNG the agents and the deal used
+    random.seed(12345)
+    replayed = GameRecord.decode(data).replay()
+    assert replayed.is_over
+    assert replayed.winner_id == record.winner
+    # ~6x smaller than the same record as JSON
+    assert len(data) * 4 < len(json.dumps(record.to_dict()))
+
+def test_unrecordable_action_is_refused():
+    random.seed(4)
+    state = setup_game(["p1", "p2"])
+    recorder = GameRecorder(state, shuffle_seed=1).attach(state)
+    state.phase, state.turn_subphase = 2, "SHOPPING"
+    state.shop_row = [state.shop_pile.pop()]
+    before = _board(state)
+    with pytest.raises(ValueError):
+        apply_action(state, "p1", "buy", {"slot_index": 0, "char_index": 0, "is_free": 1.5})
+    assert _board(state) == before
+    params = {"slot_index": 0, "char_index": 0, "is_free": True}
+    apply_action(state, "p1", "buy", params)
+    record = recorder.finish(state)
+    assert record.action_count == 1 and record.actions == [("p1", "buy", params)]
+
+def test_checkpoints_resume_mid_game():
+    record = next(simulate_records(1, players=2, seed=5, checkpoint_every=20))
+    assert record.checkpoints and all(i % 20 == 0 for i, _ in record.checkpoints)
+    plain = GameRecord.decode(record.encode())
+    plain.checkpoints = []
+    for index in (0, 20, 33, record.action_count):
+        assert _board(record.state_at(index)) == _board(plain.state_at(index))
+    with pytest.raises(ValueError):
+        record.state_at(record.action_count + 1)
+
+def test_files_append_and_read_lazily(tmp_path):
+    path = str(tmp_path / "games.shvr")
+    records = list(simulate_records(3, players=3, seed=0))
+    assert write_records(path, records[:2]) == 2
+    with RecordWriter(path) as out:
+        out.write(records[2])
+    read = list(iter_records(path))
+    assert [r.meta["seed"] for r in read] == [0, 1, 2]
+    assert read[1]._actions is None
+    assert read[1].action_count == records[1].action_count
+    assert read[1].actions == records[1].actions
+    assert [r.winner for r in read] == [r.winner for r in records]
+
+def test_bad_files_are_rejected(tmp_path):
+    bad = tmp_path / "bad.shvr"
+    bad.write_bytes(b"nope!")
+    with pytest.raises(ValueError):
+        list(iter_records(str(bad)))
+    path = str(tmp_path / "games.shvr")
+    write_records(path, simulate_records(1, seed=0))
+    with open(path, "ab") as f:
+        f.write(b"\x80\x10partial")
+    with pytest.raises(ValueError, match="Truncated"):
+        list(iter_records(path))
+    empty = tmp_path / "empty.shvr"
+    empty.touch()
+    assert list(iter_records(str(empty))) == []
+
+def test_jsonl_export_and_import(tmp_path):
+    records = list(simulate_records(2, players=2, seed=8, rules={"max_characters": 4}))
+    jsonl = str(tmp_path / "games.jsonl")
+    assert export_jsonl(records, jsonl) == 2
+    imported = list(import_jsonl(jsonl))
+    assert [r.encode() for r in imported] == [r.encode() for r in records]
+    assert imported[0].new_state().max_characters == 4
+    imported[1].replay()
+
+@pytest.mark.asyncio
+async def test_server_games_are_recorded_across_hibernation(tmp_path):
+    path = str(tmp_path / "server.shvr")
+    writer = RecordWriter(path)
+    manager = GameRoomManager(records=writer)
+    room = manager.create_room("Recorded")
+    manager.join_room(room.room_id, "u1", "Ann")
+    room.add_bot()
+    await room.start_game()
+    rng = random.Random(0)
+    moves = 0
+    while not room.state.is_over:
+        player_id = get_current_player(room.state).id
+        await room.apply_action(player_id, *rng.choice(legal_actions(room.state, player_id)))
+        moves += 1
+        if moves % 25 == 0:
+            assert room.hibernate()
+    writer.close()
+    assert room.restores > 0
+    (record,) = iter_records(path)
+    assert record.meta["room_id"] == room.room_id
+    assert record.names["u1"] == "Ann"
+    assert _board(record.replay()) == _board(room.state)
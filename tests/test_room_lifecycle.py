@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import WebSocket
+from shovels_backend.manager import GameRoomManager
+
+async def _started_room(manager, name="Room"):
+    room = manager.create_room(name)
+    manager.join_room(room.room_id, "p1", "One")
+    manager.join_room(room.room_id, "p2", "Two")
+    await room.start_game()
+    return room
+
+@pytest.mark.asyncio
+async def test_started_room_empties_when_connections_drop():
+    manager = GameRoomManager()
+    room = await _started_room(manager)
+    ws = AsyncMock(spec=WebSocket)
+    await room.connect(ws, "p1")
+    assert not room.is_empty()
+    room.disconnect("p1")
+    # Seats stay taken, but nobody is there
+    assert room.player_ids == ["p1", "p2"]
+    assert room.is_empty()
+
+@pytest.mark.asyncio
+async def test_idle_rooms_are_evicted():
+    manager = GameRoomManager(idle_timeout=60)
+    stale = await _started_room(manager, "Stale")
+    fresh = await _started_room(manager, "Fresh")
+    watched = await _started_room(manager, "Watched")
+    await watched.connect(AsyncMock(spec=WebSocket), "p1")
+    stale.last_active -= 120
+    watched.last_active -= 120
+
+    assert manager.sweep()["evicted"] == 1
+    assert manager.get_room(stale.room_id) is None
+    assert manager.get_room(fresh.room_id) is fresh
+    assert manager.get_room(watched.room_id) is watched
+
+@pytest.mark.asyncio
+async def test_finished_games_are_reaped():
+    manager = GameRoomManager(finished_ttl=10)
+    room = manager.create_room("Bots")
+    room.add_bot()
+    room.add_bot()
+    await room.start_game()
+    assert room.state.is_over and room.finished_at is not None
+
+    assert manager.sweep(now=room.finished_at + 5)["reaped"] == 0
+    assert manager.sweep(now=room.finished_at + 10)["reaped"] == 1
+    assert manager.metrics()["reaped_total"] == 1
+    assert not manager.rooms
+
+@pytest.mark.asyncio
+async def test_budget_hibernates_least_recent_rooms():
+    manager = GameRoomManager()
+    rooms = [await _started_room(manager, f"Room {i}") for i in range(3)]
+    for i, room in enumerate(rooms):
+        room.last_active = i
+    snapshot = rooms[0].state.to_dict()
+    version = rooms[0].history.version
+    manager.memory_budget = sum(r.approx_bytes() for r in rooms) - 1
+
+    assert manager.sweep(now=10)["hibernated"] == 1
+    assert rooms[0].is_hibernated and not rooms[1].is_hibernated
+    metrics = manager.metrics()
+    assert metrics["rooms_live"] == 2 and metrics["rooms_hibernated"] == 1
+    assert metrics["estimated_bytes"] <= manager.memory_budget
+    assert rooms[0].is_started
+
+    # Touching the room brings it back unchanged
+    ws = AsyncMock(spec=WebSocket)
+    await rooms[0].connect(ws, "p1", version=version)
+    assert not rooms[0].is_hibernated
+    assert rooms[0].state.to_dict() == snapshot
+    message = ws.send_json.call_args.args[0]
+    assert message["type"] == "state_update" and message["version"] > version
+    assert manager.metrics()["restored_total"] == 1
+
+    # A restored game keeps playing
+    current = rooms[0].state.players[rooms[0].state.current_turn_index].id
+    await rooms[0].apply_action(current, "draw", {"sources": ["DECK", "DECK"]})
+    assert rooms[0].state.turn_subphase == "DISCARD"
+
+@pytest.mark.asyncio
+async def test_watched_rooms_are_not_hibernated():
+    manager = GameRoomManager(memory_budget=1)
+    room = await _started_room(manager)
+    await room.connect_spectator(AsyncMock(spec=WebSocket))
+    manager.sweep()
+    assert not room.is_hibernated
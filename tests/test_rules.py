@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from shovels_engine.models import GameState, Card, Player, Character, Suit, setup_game
+from shovels_engine.engine import tap_hero_power, buy_card
+from shovels_engine.rules import RuleSet, STANDARD_RULES
+
+class TestRuleSet(unittest.TestCase):
+    def test_standard_rules_match_card_price(self):
+        self.assertEqual(Card(rank=0, suit=Suit.CLUBS, is_face=True, face_rank="K").price, 5)
+        self.assertEqual(Card(rank=10, suit=Suit.CLUBS, is_ace=True).price, 10)
+        self.assertEqual(Card(rank=7, suit=Suit.CLUBS).price, 7)
+
+    def test_compiled_once(self):
+        rules = RuleSet.from_dict({"refresh_cost": 3})
+        self.assertIs(rules.compiled(), rules.compiled())
+        self.assertEqual(rules.compiled().refresh_cost, 3)
+
+    def test_unknown_rule_rejected(self):
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({"shop_szie": 4})
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({"shop_size": "4"})
+
+    def test_unplayable_rules_rejected(self):
+        cases = {
+            "missing face": {"face_power": {"J": 1}},
+            "extra face": {"face_prices": {"J": 3, "Q": 4, "K": 5, "A": 1}},
+            "negative shield": {"shield_values": {"J": 3, "Q": -5, "K": 10}},
+            "negative price": {"ace_price": -1},
+            "negative pile": {"gravedig_pool_size": -2},
+            "empty shop": {"shop_size": 0},
+            "negative shop": {"shop_size": -1},
+            "no character slots": {"max_characters": 0, "starting_characters": 0},
+            "too many starters": {"starting_characters": 4},
+            "not enough faces": {"starting_characters": 7, "max_characters": 7},
+            "shop pile too big": {"shop_pile_size": 200},
+        }
+        for label, overrides in cases.items():
+            with self.subTest(label), self.assertRaises(ValueError):
+                RuleSet.from_dict(overrides)
+
+    def test_limits_still_allowed(self):
+        rules = RuleSet.from_dict({"starting_characters": 6, "max_characters": 6, "shop_pile_size": 80})
+        state = setup_game(["p1", "p2", "p3", "p4"], rules=rules)
+        self.assertTrue(all(len(p.characters) == 6 for p in state.players))
+        self.assertEqual(len(state.deck), 0)
+
+    def test_pool_constants_match_models(self):
+        from shovels_engine.models import CARD_POOL
+        from shovels_engine.rules import FACE_CARDS, POOL_SIZE
+        self.assertEqual(POOL_SIZE, len(CARD_POOL))
+        self.assertEqual(FACE_CARDS, sum(c.is_face for c in CARD_POOL))
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "variant.json")
+            with open(path, "w") as f:
+                json.dump({"name": "big-shop", "shop_size": 5, "shop_pile_size": 30}, f)
+            rules = RuleSet.from_file(path)
+        self.assertEqual(rules.name, "big-shop")
+        self.assertEqual(rules.max_characters, STANDARD_RULES.max_characters)
+
+    def test_setup_uses_rules(self):
+        rules = RuleSet.from_dict({"starting_characters": 2, "shop_pile_size": 30, "max_characters": 4})
+        state = setup_game(["p1", "p2"], rules=rules)
+        self.assertTrue(all(len(p.characters) == 2 for p in state.players))
+        self.assertEqual(len(state.shop_pile), 30)
+        self.assertEqual(state.max_characters, 4)
+        self.assertIs(state.rules, rules)
+
+    def test_variant_shield_and_price(self):
+        rules = RuleSet.from_dict({"shield_values": {"J": 1, "Q": 1, "K": 1}, "face_prices": {"J": 1, "Q": 1, "K": 1}})
+        p1 = Player(id="p1", name="P1", characters=[Character(rank="J", suit=Suit.HEARTS)])
+        state = GameState(players=[p1], phase=2, turn_subphase="BATTLE_ACTION", rules=rules)
+        tap_hero_power(state, "p1", 0)
+        self.assertEqual(p1.characters[0].shield, 1)
+
+        # Tapping ended the turn (and emptied the purse); shop on the next one
+        state.turn_subphase = "SHOPPING"
+        p1.coins = 1
+        state.shop_row = [Card(rank=0, suit=Suit.SPADES, is_face=True, face_rank="K")]
+        buy_card(state, "p1", 0, 0)
+        self.assertEqual(p1.characters[0].rank, "K")
+        self.assertEqual(p1.coins, 0)
+
+    def test_rules_survive_serialization(self):
+        rules = RuleSet.from_dict({"name": "variant", "refresh_cost": 1})
+        state = setup_game(["p1", "p2"], rules=rules)
+        restored = GameState.from_dict(json.loads(json.dumps(state.to_dict())))
+        self.assertEqual(restored.rules, rules)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import WebSocket
+from fastapi.testclient import TestClient
+from shovels_backend.manager import GameRoomManager
+from shovels_backend.spectators import SpectatorChannel, public_state
+from shovels_backend.main import app, room_manager
+from shovels_backend.auth import create_access_token, get_current_user
+from shovels_engine.models import setup_game
+from shovels_engine.actions import apply_action
+
+def _watcher():
+    return AsyncMock(spec=WebSocket)
+
+def _frames(ws):
+    return [json.loads(call.args[0]) for call in ws.send_text.call_args_list]
+
+def test_public_state_hides_hidden_cards():
+    state = setup_game(["p1", "p2"], {"p1": "One", "p2": "Two"})
+    apply_action(state, "p1", "draw", {"sources": ["DECK", "DECK"]})
+    view = public_state(state)
+
+    assert all(p["hand"] == [] for p in view["players"])
+    assert view["players"][0]["hand_count"] == 2
+    assert view["deck"] == [] and view["deck_count"] == len(state.deck)
+    assert view["shop_pile"] == [] and view["shop_pile_count"] == len(state.shop_pile)
+    draw = next(e for e in view["events"] if e["event_type"] == "DRAW")
+    assert draw["data"]["drawn"] == [None, None]
+    # The state itself is untouched
+    assert len(state.events[-1]["data"]["drawn"]) == 2 and state.events[-1]["data"]["drawn"][0] is not None
+    json.dumps(view)
+
+def test_phase_one_characters_are_face_down():
+    state = setup_game(["p1", "p2"])
+    apply_action(state, "p1", "draw", {"sources": ["DECK", "DECK"]})
+    apply_action(state, "p1", "discard", {"card_index": 0})
+    apply_action(state, "p1", "play", {"card_index": 0, "character_index": 0})
+    view = public_state(state)
+    for player, dumped in zip(state.players, view["players"]):
+        assert [c["stack_count"] for c in dumped["characters"]] == [len(c.stack) for c in player.characters]
+        assert all(c["uid"] is None and c["rank"] is None and c["stack"] == [] for c in dumped["characters"])
+    played = [e for e in state.events if e["event_type"] == "PLAY_CARD"]
+    assert played[0]["data"]["card"] is not None
+    assert [e["data"]["card"] for e in view["events"] if e["event_type"] == "PLAY_CARD"] == [None]
+
+    # Characters are turned over for Phase 2
+    state.phase = 2
+    view = public_state(state)
+    assert view["players"][0]["characters"][0]["rank"] == state.players[0].characters[0].rank
+
+@pytest.mark.asyncio
+async def test_one_encoding_for_all_watchers():
+    channel = SpectatorChannel()
+    watchers = [_watcher() for _ in range(50)]
+    for ws in watchers:
+        await channel.add(ws)
+
+    channel.publish({"type": "state_update", "n": 1})
+    await asyncio.sleep(0.01)
+
+    frames = [ws.send_text.call_args.args[0] for ws in watchers]
+    assert all(f is frames[0] for f in frames)
+    assert json.loads(frames[0])["n"] == 1
+
+@pytest.mark.asyncio
+async def test_idle_channel_skips_updates():
+    channel = SpectatorChannel()
+    channel.publish({"n": 1})
+    assert not channel.frames and channel._task is None
+
+@pytest.mark.asyncio
+async def test_delay_holds_frames_back():
+    channel = SpectatorChannel(delay=0.05)
+    ws = _watcher()
+    await channel.add(ws)
+    channel.publish({"n": 1})
+
+    await asyncio.sleep(0.01)
+    assert ws.send_text.call_count == 0
+    await asyncio.sleep(0.1)
+    assert [f["n"] for f in _frames(ws)] == [1]
+
+    # A late joiner starts from the last delayed frame, not the live game
+    late = _watcher()
+    await channel.add(late)
+    assert [f["n"] for f in _frames(late)] == [1]
+
+@pytest.mark.asyncio
+async def test_fast_updates_are_coalesced():
+    channel = SpectatorChannel(min_interval=0.05)
+    ws = _watcher()
+    await channel.add(ws)
+    for n in range(10):
+        channel.publish({"n": n})
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.2)
+
+    sent = [f["n"] for f in _frames(ws)]
+    assert sent[-1] == 9
+    assert sent == sorted(sent)
+    assert len(sent) < 10
+    assert channel.coalesced == 10 - len(sent)
+
+@pytest.mark.asyncio
+async def test_every_frame_sent_without_interval():
+    channel = SpectatorChannel()
+    ws = _watcher()
+    await channel.add(ws)
+    for n in range(5):
+        channel.publish({"n": n})
+    await asyncio.sleep(0.01)
+    assert [f["n"] for f in _frames(ws)] == [0, 1, 2, 3, 4]
+
+@pytest.mark.asyncio
+async def test_broken_watchers_are_dropped():
+    channel = SpectatorChannel()
+    good, bad = _watcher(), _watcher()
+    bad.send_text.side_effect = RuntimeError("closed")
+    await channel.add(good)
+    await channel.add(bad)
+    channel.publish({"n": 1})
+    await asyncio.sleep(0.01)
+    assert channel.watchers == {good}
+
+def test_negative_settings_rejected():
+    with pytest.raises(ValueError):
+        SpectatorChannel(delay=-1)
+
+@pytest.mark.asyncio
+async def test_spectator_watches_bot_game():
+    manager = GameRoomManager()
+    room = manager.create_room("Bot Room")
+    room.add_bot()
+    room.add_bot()
+    ws = _watcher()
+    await room.connect_spectator(ws)
+
+    await room.start_game()
+    await asyncio.sleep(0.05)
+
+    frames = _frames(ws)
+    assert frames[0]["state"]["phase"] == "LOBBY"
+    assert all(f["spectator"] for f in frames)
+    last = frames[-1]["state"]
+    assert last["is_over"]
+    assert all(p["hand"] == [] for p in last["players"])
+    # Player sockets are never touched by the spectator stream
+    assert not ws.send_json.called
+
+    manager.delete_room(room.room_id)
+    assert not room.spectators.watchers
+
+def test_spectate_endpoint_is_read_only():
+    client = TestClient(app)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "host", "email": "host@example.com", "name": "Host"}
+    try:
+        room_id = client.post("/rooms", json={"name": "Watched"}).json()["room_id"]
+    finally:
+        app.dependency_overrides.clear()
+    token = create_access_token({"sub": "fan", "email": "fan@example.com", "name": "Fan"})
+
+    with client.websocket_connect(f"/ws/room/{room_id}/spectate?token={token}") as ws:
+        message = ws.receive_json()
+        assert message["spectator"] and message["state"]["phase"] == "LOBBY"
+        ws.send_json({"type": "start_game"})  # ignored
+    assert room_manager.get_room(room_id).state is None
@@ -0,0 +1,73 @@
+import random
+import unittest
+from shovels_engine.models import GameState, Card, Player, Character, Suit
+from shovels_engine.engine import attack_heart, perform_action
+from shovels_engine.stacks import StackSummary, stack_summary, push_card, pop_card, SUITS
+
+def _brute(stack, n, suit):
+    top = stack[len(stack) - n:]
+    return sum(10 if c.is_ace else c.rank for c in top if c.suit == suit), any(c.suit == suit for c in top)
+
+class TestStackSummary(unittest.TestCase):
+    def test_matches_scan_through_pushes_and_pops(self):
+        rng = random.Random(3)
+        char = Character(rank="K", suit=Suit.SPADES)
+        for _ in range(300):
+            if char.stack and rng.random() < 0.4:
+                pop_card(char)
+            else:
+                push_card(char, Card(rank=rng.randint(2, 10), suit=rng.choice(SUITS), is_ace=rng.random() < 0.1))
+            summary = stack_summary(char)
+            for n in range(1, len(char.stack) + 1):
+                for suit in SUITS:
+                    self.assertEqual((summary.top_sum(n, suit), summary.top_has(n, suit)), _brute(char.stack, n, suit))
+            hearts = [i for i, c in enumerate(char.stack) if c.suit == Suit.HEARTS]
+            self.assertEqual(summary.nearest_heart(), hearts[-1] if hearts else -1)
+
+    def test_direct_edits_are_detected(self):
+        char = Character(rank="J", suit=Suit.CLUBS, stack=[Card(rank=4, suit=Suit.HEARTS)])
+        self.assertEqual(stack_summary(char).nearest_heart(), 0)
+        char.stack = [Card(rank=4, suit=Suit.CLUBS)]
+        self.assertEqual(stack_summary(char).nearest_heart(), -1)
+        char.stack[-1] = Card(rank=6, suit=Suit.DIAMONDS)
+        self.assertEqual(stack_summary(char).top_sum(1, Suit.DIAMONDS), 6)
+
+    def test_attack_compares_topmost_heart_only(self):
+        target = Character(rank="Q", suit=Suit.SPADES, stack=[
+            Card(rank=3, suit=Suit.HEARTS), Card(rank=9, suit=Suit.HEARTS), Card(rank=2, suit=Suit.CLUBS),
+        ])
+        p1 = Player(id="p1", name="P1", characters=[Character(rank="J", suit=Suit.CLUBS)])
+        p2 = Player(id="p2", name="P2", characters=[target])
+        state = GameState(players=[p1, p2], phase=2, turn_subphase="BATTLE_ACTION")
+        attack_heart(state, "p1", "p2", 0, 5)
+        self.assertEqual(len(target.stack), 3)
+        attack_heart(state, "p1", "p2", 0, 9)
+        self.assertEqual([c.rank for c in target.stack], [3])
+
+    def test_invalid_action_leaves_stack_untouched(self):
+        char = Character(rank="J", suit=Suit.CLUBS, stack=[Card(rank=4, suit=Suit.HEARTS), Card(rank=5, suit=Suit.CLUBS)])
+        p1 = Player(id="p1", name="P1", characters=[char])
+        p2 = Player(id="p2", name="P2", characters=[Character(rank="J", suit=Suit.HEARTS)])
+        state = GameState(players=[p1, p2], phase=2, turn_subphase="BATTLE_ACTION")
+        with self.assertRaises(ValueError):
+            perform_action(state, "p1", 0, 1, Suit.HEARTS)
+        self.assertEqual(len(char.stack), 2)
+        self.assertEqual(state.discard_pile, [])
+
+    def test_top_n_must_be_positive(self):
+        char = Character(rank="J", suit=Suit.CLUBS, stack=[Card(rank=5, suit=Suit.DIAMONDS), Card(rank=7, suit=Suit.DIAMONDS)])
+        p1 = Player(id="p1", name="P1", characters=[char])
+        p2 = Player(id="p2", name="P2", characters=[Character(rank="J", suit=Suit.HEARTS)])
+        state = GameState(players=[p1, p2], phase=2, turn_subphase="BATTLE_ACTION")
+        for n in (0, -1):
+            with self.assertRaises(ValueError):
+                perform_action(state, "p1", 0, n, Suit.DIAMONDS)
+            with self.assertRaises(ValueError):
+                stack_summary(char).top_sum(n, Suit.DIAMONDS)
+            with self.assertRaises(ValueError):
+                stack_summary(char).top_has(n, Suit.DIAMONDS)
+        self.assertEqual((len(char.stack), p1.coins, state.turn_subphase), (2, 0, "BATTLE_ACTION"))
+        self.assertEqual(state.discard_pile, [])
+
+if __name__ == "__main__":
+    unittest.main()
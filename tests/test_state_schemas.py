@@ -0,0 +1,54 @@
+import dataclasses
+import pytest
+from pydantic import ValidationError
+from shovels_engine.actions import apply_action
+from shovels_engine.agents import HeuristicAgent, RandomAgent
+from shovels_engine.models import CARD_POOL, Card, Character, GameState, Player
+from shovels_engine.records import record_game
+from shovels_engine.rules import STANDARD_RULES, RuleSet
+from shovels_backend.state_schemas import (CardSchema, CharacterSchema, GameStateSchema, PlayerSchema,
+                                           RuleSetSchema)
+
+def _through_schema(state: GameState) -> GameState:
+    """The backend's path: engine -> validated schema -> JSON -> schema -> engine."""
+    text = GameStateSchema.from_engine(state).model_dump_json()
+    restored = GameStateSchema.model_validate_json(text).to_engine()
+    restored._rng = state._rng
+    return restored
+
+@pytest.mark.parametrize("seed", [3, 11])
+def test_schema_path_plays_the_same_game(seed):
+    record = record_game({"p1": RandomAgent(), "p2": HeuristicAgent(), "p3": RandomAgent()}, seed=seed,
+                         rules={"shop_size": 4})
+    direct, via_schema = record.new_state(), record.new_state()
+    for player_id, action_type, params in record.actions:
+        apply_action(direct, player_id, action_type, params)
+        via_schema = _through_schema(via_schema)
+        apply_action(via_schema, player_id, action_type, params)
+        assert via_schema.to_dict() == direct.to_dict()
+    assert (direct.winner_id, direct.turn_count) == (record.winner, record.turns)
+
+def test_schemas_mirror_the_engine():
+    for schema, engine_type in [(CardSchema, Card), (CharacterSchema, Character), (PlayerSchema, Player),
+                                (RuleSetSchema, RuleSet), (GameStateSchema, GameState)]:
+        public = [f.name for f in dataclasses.fields(engine_type) if f.init]
+        assert list(schema.model_fields) == public, engine_type.__name__
+    assert RuleSetSchema().model_dump() == STANDARD_RULES.to_dict()
+
+def test_pool_cards_come_back_interned():
+    card = CARD_POOL[17]
+    assert CardSchema.from_engine(card).to_engine() is card
+    assert Card.from_dict(card.to_dict()) is card
+    assert Card.from_dict({**card.to_dict(), "rank": 3}) is not card
+
+def test_rules_are_validated_at_the_boundary():
+    rules = RuleSetSchema.model_validate({"name": "variant", "refresh_cost": 1}).to_engine()
+    assert rules == RuleSet.from_dict({"name": "variant", "refresh_cost": 1})
+    with pytest.raises(ValidationError):
+        RuleSetSchema.model_validate({"shop_szie": 4})
+    with pytest.raises(ValidationError):
+        RuleSetSchema.model_validate({"face_power": {"J": 1}})
+    with pytest.raises(ValidationError):
+        RuleSetSchema.model_validate({"starting_characters": 7, "max_characters": 7})
+    with pytest.raises(ValidationError):
+        GameStateSchema.model_validate({"players": [{"id": "p1"}]})
@@ -0,0 +1,41 @@
+import unittest
+from shovels_engine.agents import RandomAgent, HeuristicAgent
+from shovels_engine.simulation import play_game
+from shovels_engine.tournament import MatchResult, schedule, run_matches, fit_elo, rate, BASE_RATING
+
+class TestTournament(unittest.TestCase):
+    def test_play_game_is_reproducible(self):
+        a = play_game({"p1": RandomAgent(), "p2": RandomAgent()}, seed=11)
+        b = play_game({"p1": RandomAgent(), "p2": RandomAgent()}, seed=11)
+        self.assertTrue(a.is_over)
+        self.assertEqual(a.winner_id, b.winner_id)
+        self.assertEqual(a.events, b.events)
+
+    def test_schedule_rotates_seats(self):
+        games = schedule(["a", "b"], [2, 3], seeds=[1, 2])
+        seatings = {seats for seats, _ in games}
+        self.assertIn(("a", "b"), seatings)
+        self.assertIn(("b", "a"), seatings)
+        # 3 seats from 2 agents: (a,a,b) and (a,b,b) in 3 rotations each
+        self.assertEqual(len([s for s in seatings if len(s) == 3]), 6)
+        # Every seating is played on every seed
+        self.assertEqual(len(games), len(seatings) * 2)
+
+    def test_elo_is_centred_and_ordered(self):
+        results = [MatchResult(seed=i, seats=["a", "b"], winner="a", turn_count=10) for i in range(8)]
+        results += [MatchResult(seed=i, seats=["b", "a"], winner="b", turn_count=10) for i in range(2)]
+        elo = fit_elo(["a", "b"], results)
+        self.assertAlmostEqual(sum(elo.values()) / 2, BASE_RATING)
+        self.assertGreater(elo["a"], elo["b"])
+
+    def test_heuristic_rates_above_random(self):
+        factories = {"random": RandomAgent, "heuristic": HeuristicAgent}
+        results = run_matches(factories, player_counts=[2], seeds=range(10))
+        self.assertEqual(len(results), 20)
+        ratings = rate(list(factories), results, bootstrap=20)
+        self.assertEqual(ratings[0].name, "heuristic")
+        for r in ratings:
+            self.assertLessEqual(r.low, r.high)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import WebSocket
+from fastapi.testclient import TestClient
+from shovels_backend.tracing import Tracer, TRACER, FileSpanExporter, InMemorySpanExporter, span
+from shovels_backend.manager import GameRoomManager
+from shovels_backend.main import app
+from shovels_backend.auth import create_access_token, get_current_user
+
+@pytest.fixture
+def spans():
+    exporter = InMemorySpanExporter()
+    TRACER.configure(exporter, batch_size=10)
+    try:
+        yield exporter
+    finally:
+        TRACER.shutdown()
+
+def test_disabled_tracer_is_a_noop():
+    tracer = Tracer()
+    with tracer.span("anything", a=1) as s:
+        s.set_attribute("b", 2)
+    assert not tracer.enabled
+
+def test_spans_nest_and_record_errors(spans):
+    with span("outer", room_id="r1"):
+        with span("inner"):
+            pass
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError("bad move")
+    TRACER.flush()
+    by_name = {s.name: s for s in spans.spans}
+    outer = by_name["outer"]
+    assert outer.parent_id is None
+    assert by_name["inner"].parent_id == outer.span_id
+    assert {s.trace_id for s in spans.spans} == {outer.trace_id}
+    assert by_name["failing"].error == "ValueError: bad move"
+    assert by_name["failing"].to_otlp()["status"]["code"] == 2
+
+@pytest.mark.asyncio
+async def test_room_action_spans(spans):
+    manager = GameRoomManager()
+    room = manager.create_room("Traced")
+    manager.join_room(room.room_id, "p1", "One")
+    manager.join_room(room.room_id, "p2", "Two")
+    await room.connect(AsyncMock(spec=WebSocket), "p1")
+    await room.connect(AsyncMock(spec=WebSocket), "p2")
+    await room.start_game()
+    TRACER.flush()
+    spans.spans.clear()
+
+    current = room.state.players[room.state.current_turn_index].id
+    with span("ws.frame"):
+        await room.apply_action(current, "draw", {"sources": ["DECK", "DECK"]})
+    TRACER.flush()
+    names = [s.name for s in spans.spans]
+    for name in ("engine.apply_action", "state.to_dict", "state.delta", "broadcast.encode"):
+        assert names.count(name) == 1
+    assert names.count("ws.send") == 2
+    root = next(s for s in spans.spans if s.name == "ws.frame")
+    assert all(s.parent_id == root.span_id for s in spans.spans if s is not root)
+    assert next(s for s in spans.spans if s.name == "broadcast.encode").attributes["bytes"] > 0
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer()
+    tracer.configure(FileSpanExporter(str(path)))
+    with tracer.span("ws.frame", room_id="abc", retries=2):
+        pass
+    tracer.shutdown()
+    request = json.loads(path.read_text().splitlines()[0])
+    resource = request["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "shovels-backend"}}
+    exported = resource["scopeSpans"][0]["spans"][0]
+    assert exported["name"] == "ws.frame"
+    assert len(exported["traceId"]) == 32 and len(exported["spanId"]) == 16
+    assert {"key": "retries", "value": {"intValue": "2"}} in exported["attributes"]
+    assert int(exported["endTimeUnixNano"]) >= int(exported["startTimeUnixNano"])
+
+class _FlakyExporter(InMemorySpanExporter):
+    """Raises on every other batch."""
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def export(self, spans):
+        self.calls += 1
+        if self.calls % 2:
+            raise RuntimeError("collector down")
+        super().export(spans)
+
+def test_exporter_errors_do_not_stop_the_writer():
+    exporter = _FlakyExporter()
+    tracer = Tracer()
+    tracer.configure(exporter, batch_size=1)
+    for name in ("a", "b", "c", "d"):
+        with tracer.span(name):
+            pass
+        tracer.flush()
+    tracer.shutdown()
+    assert tracer.export_failures == 2
+    assert [s.name for s in exporter.spans] == ["b", "d"]
+
+def test_websocket_frame_is_traced(spans):
+    client = TestClient(app)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "tracer", "email": "t@example.com", "name": "T"}
+    try:
+        room_id = client.post("/rooms", json={"name": "Frames"}).json()["room_id"]
+    finally:
+        app.dependency_overrides.clear()
+    token = create_access_token({"sub": "tracer", "email": "t@example.com", "name": "T"})
+    with client.websocket_connect(f"/ws/room/{room_id}?token={token}") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "action", "data": {"action_type": "draw", "params": {}}})
+        assert ws.receive_json()["type"] == "error"
+    TRACER.flush()
+    frame = next(s for s in spans.spans if s.name == "ws.frame")
+    assert frame.attributes["room_id"] == room_id and frame.attributes["message.type"] == "action"
+    children = {s.name for s in spans.spans if s.parent_id == frame.span_id}
+    assert {"ws.parse", "ws.validate"} <= children
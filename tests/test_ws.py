@@ -80,3 +80,26 @@ def test_ws_game_flow():
                 assert update2["state"]["turn_subphase"] == "DISCARD"
     
     app.dependency_overrides.clear()
+
+def test_ws_add_bot_is_host_only():
+    app.dependency_overrides[get_current_user] = get_mock_user_1
+    room_id = client.post("/rooms", json={"name": "Bot Room"}).json()["room_id"]
+    app.dependency_overrides[get_current_user] = get_mock_user_2
+    client.post(f"/rooms/{room_id}/join?player_id=user2")
+    app.dependency_overrides.clear()
+
+    token1 = create_access_token({"sub": "user1", "email": "user1@example.com", "name": "User One"})
+    token2 = create_access_token({"sub": "user2", "email": "user2@example.com", "name": "User Two"})
+    with client.websocket_connect(f"/ws/room/{room_id}?token={token1}") as ws1:
+        with client.websocket_connect(f"/ws/room/{room_id}?token={token2}") as ws2:
+            ws1.receive_json()
+            ws1.receive_json()
+            ws2.receive_json()
+
+            ws2.send_json({"type": "add_bot"})
+            error = ws2.receive_json()
+            assert error["type"] == "error" and "host" in error["message"]
+
+            ws1.send_json({"type": "add_bot"})
+            lobby = ws1.receive_json()
+            assert sum(p["is_bot"] for p in lobby["state"]["players"]) == 1